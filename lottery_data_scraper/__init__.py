@@ -3,29 +3,133 @@ Configure logging for the entire package.
 
 You can specify a log level with the environment variable
 PY_LOG_LVL=[debug|info|warning|error|critical]
+
+Set PY_LOG_JSON=True to log one JSON object per line instead of plain text.
+
+Records are handed to a queue and written to stderr by a background thread,
+so a thread that's fetching or parsing never waits on a slow terminal or
+pipe. Only the message is put together before a record is queued, so the
+logging thread never touches an argument, like a BeautifulSoup tag, that
+another thread could be using by then.
+
+The same warning can come up over and over, like when a daemon runs into the
+same broken page every run. After `LOG_REPEATS` (10) of one message in
+`LOG_REPEAT_WINDOW` (60) seconds, the rest are dropped, and the next one
+that gets through says how many were. Errors always get through.
 """
+import atexit
+import copy
+import json
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
+import threading
+import time
 
 
 # Prefix the basic format with a timestamp, file pathname, and line number.
 # See: https://docs.python.org/3/library/logging.html#logrecord-attributes
 LOG_FORMAT = "%(asctime)s %(pathname)s %(lineno)s {}".format(logging.BASIC_FORMAT)
 
+LOG_REPEATS = int(os.environ.get("LOG_REPEATS", 10))
+LOG_REPEAT_WINDOW = float(os.environ.get("LOG_REPEAT_WINDOW", 60))
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a JSON object, including anything passed in `extra`."""
+
+    # Attributes every record has. Anything else came from `extra`.
+    _STANDARD = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pathname": record.pathname,
+            "lineno": record.lineno,
+            "thread": record.threadName,
+        }
+        for name, value in vars(record).items():
+            if name not in self._STANDARD:
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `repeats` records with the same logger, level and
+    message every `window` seconds. Errors and worse always pass.
+
+    Records are told apart by their formatted message, so
+    `logger.warning("Unable to parse %s", url)` for a hundred different games
+    is a hundred different warnings, all of which get through.
+    """
+
+    def __init__(self, repeats=LOG_REPEATS, window=LOG_REPEAT_WINDOW):
+        super().__init__()
+        self.repeats = repeats
+        self.window = window
+        self._lock = threading.Lock()
+        # (name, level, message) -> [window start, records seen, records dropped]
+        self._seen = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is None or now - seen[0] >= self.window:
+                dropped = seen[2] if seen else 0
+                seen = self._seen[key] = [now, 0, 0]
+                if dropped:
+                    record.msg = "{} ({} similar messages suppressed)".format(
+                        record.msg, dropped
+                    )
+            seen[1] += 1
+            if seen[1] > self.repeats:
+                seen[2] += 1
+                return False
+        return True
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Puts the message together before queueing a record, but leaves the rest,
+    like the timestamp and the traceback, to the logging thread. The standard
+    QueueHandler runs the whole formatter first, and the JSON formatter would
+    get a traceback baked into the message.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
 log_level = getattr(logging, os.environ.get("PY_LOG_LVL", "WARNING").upper())
+log_queue = queue.SimpleQueue()
 logging_config = {
     "version": 1,
-    "formatters": {
-        "standard": {
-            "format": LOG_FORMAT,
+    "filters": {
+        "rate_limit": {
+            "()": RateLimitFilter,
         },
     },
     "handlers": {
         "default": {
+            "()": QueueHandler,
+            "queue": log_queue,
             "level": log_level,
-            "formatter": "standard",
-            "class": "logging.StreamHandler",
+            "filters": ["rate_limit"],
         },
     },
     "loggers": {
@@ -38,3 +142,17 @@ logging_config = {
 }
 
 logging.config.dictConfig(logging_config)
+
+# The thread that writes what's on the queue. Stopping it at exit writes
+# whatever's left.
+stderr_handler = logging.StreamHandler()
+stderr_handler.setLevel(log_level)
+if os.environ.get("PY_LOG_JSON"):
+    stderr_handler.setFormatter(JsonFormatter())
+else:
+    stderr_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+log_listener = logging.handlers.QueueListener(
+    log_queue, stderr_handler, respect_handler_level=True
+)
+log_listener.start()
+atexit.register(log_listener.stop)
@@ -0,0 +1,100 @@
+"""
+Add up prizes across many games, exactly and quickly.
+
+Prize values are summed as whole cents in int64 numpy arrays. Integer sums
+don't pick up the rounding error that adding up millions of float dollars
+does, and numpy adds them up without a Python loop.
+
+    >>> games = [{"price": 1, "num_tx_initial": 4, "prizes": [
+    ...     {"value": 2, "available": 1, "claimed": 0},
+    ...     {"value": 0.5, "available": 1, "claimed": 1}]}]
+    >>> remaining_prize_cents(games)
+    array([250])
+    >>> original_ev(games)
+    array([0.75])
+
+Games can be dicts straight from a state module or loaded with
+`GameSchema`. Either way, `value_cents` and `price_cents` are used when
+they're there and worked out from `value` and `price` when they aren't.
+
+A single game's prizes add up to far less than int64's 92 quadrillion
+dollars, so sums can't overflow.
+"""
+import numpy as np
+
+from lottery_data_scraper.parsing import to_cents
+
+
+def cents(obj, name):
+    """`obj["<name>_cents"]`, or `obj[name]` converted to cents."""
+    value = obj.get(name + "_cents")
+    if value is not None:
+        return value
+    return to_cents(obj.get(name))
+
+
+def pack(games):
+    """
+    Every prize tier of every game, as int64 arrays.
+
+    Returns `(offsets, value_cents, available, claimed)`. The tiers of
+    `games[i]` are at `offsets[i]:offsets[i + 1]` in the other three arrays.
+    Tiers without a value, like a prize that isn't cash, are worth 0 cents,
+    the same way a missing `available` or `claimed` counts as 0.
+    """
+    tiers = [prize for game in games for prize in game.get("prizes") or []]
+    sizes = [len(game.get("prizes") or []) for game in games]
+    offsets = np.zeros(len(games) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    value_cents = np.fromiter(
+        (cents(prize, "value") or 0 for prize in tiers),
+        dtype=np.int64,
+        count=len(tiers),
+    )
+    available = np.fromiter(
+        (prize.get("available") or 0 for prize in tiers),
+        dtype=np.int64,
+        count=len(tiers),
+    )
+    claimed = np.fromiter(
+        (prize.get("claimed") or 0 for prize in tiers),
+        dtype=np.int64,
+        count=len(tiers),
+    )
+    return offsets, value_cents, available, claimed
+
+
+def _per_game(offsets, tier_totals):
+    """Sum `tier_totals` for each game's range of tiers."""
+    running = np.zeros(len(tier_totals) + 1, dtype=np.int64)
+    np.cumsum(tier_totals, out=running[1:])
+    return running[offsets[1:]] - running[offsets[:-1]]
+
+
+def remaining_prize_cents(games):
+    """The value of each game's unclaimed prizes, in cents."""
+    offsets, value_cents, available, _ = pack(games)
+    return _per_game(offsets, value_cents * available)
+
+
+def original_ev(games):
+    """
+    Each game's expected value when it was printed: the value of every prize
+    divided by the cost of every ticket. See `pennsylvania.calculate_original_ev`.
+
+    The sums are exact. Only the final division is floating point.
+    Games without a ticket count or price come out as nan.
+    """
+    offsets, value_cents, available, claimed = pack(games)
+    prize_cents = _per_game(offsets, value_cents * (available + claimed))
+    cost_cents = np.array(
+        [
+            int(game.get("num_tx_initial") or 0) * (cents(game, "price") or 0)
+            for game in games
+        ],
+        dtype=np.int64,
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ev = prize_cents / cost_cents
+    ev[cost_cents == 0] = np.nan
+    return ev
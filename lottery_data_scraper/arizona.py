@@ -1,8 +1,6 @@
 import logging
 import os
 import re
-import traceback
-from selenium import webdriver
 from datetime import datetime, date
 
 
@@ -10,7 +8,8 @@ from bs4 import BeautifulSoup as bs
 import requests
 import json
 
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.parsing import count, money, odds
+from lottery_data_scraper.util import browser, fetch_html, fetch_soup, wants
 from lottery_data_scraper.schemas import GameSchema
 
 logger = logging.getLogger(__name__)
@@ -21,8 +20,7 @@ INDEX_URL = "https://www.arizonalottery.com/scratchers/#all"
 
 # TODO: add how to play. It uses lottery symbols. Not just straight text
 def get_games(site_url):
-    html = fetch_html(site_url)
-    soup = bs(html, "lxml")
+    soup = fetch_soup(site_url)
 
     games_soup = soup.find_all("div", class_="col-md-6 col-lg-3 g")
     game_urls = [BASE_URL + game.find_next("a")["href"] for game in games_soup]
@@ -30,13 +28,11 @@ def get_games(site_url):
     return game_urls
 
 
-def process_game(game_url):
+def process_game(game_url, fields=None):
     """
     Using Selenium to run JavaScript
     """
-    options = webdriver.chrome.options.Options()
-    options.headless = True
-    driver = webdriver.Chrome(options=options)
+    driver = browser("chrome")
     driver.get(game_url)
     html = driver.page_source
     soup = bs(html, "lxml")
@@ -45,27 +41,21 @@ def process_game(game_url):
 
     name = (soup.find("h1").text).split(" #")[0]
 
-    price = int(re.search(r"\d+", soup.find("div", class_="info").text).group(0))
+    price = count(soup.find("div", class_="info").text)
 
     prizes = [
         {
             "prize": field[0].text.replace("$", ""),
-            "value": int(field[0].text.replace("$", "").replace(",", ""))
-            if "Million" not in field[0].text
-            else float(field[0].text.replace("$", "").split(" ")[0]) * 100000,
-            "available": int((field[2].text.split("of")[0]).replace(",", "")),
-            "claimed": int((field[2].text.split("of")[1]).replace(",", "")),
+            "value": money(field[0].text),
+            "available": count(field[2].text.split("of")[0]),
+            "claimed": count(field[2].text.split("of")[1]),
         }
         for field in [row.find_all("td") for row in soup.find_all("tr")[1:-1]]
     ]
 
-    odds = float(
-        (soup.find("table", id="prize-odd-chart").find_next("p").text).split("in")[1]
-    )
-
-    num_of_tix = int(sum(row["available"] for row in prizes) * odds)
+    overall_odds = odds(soup.find("table", id="prize-odd-chart").find_next("p").text)
 
-    image_urls = f"{BASE_URL}{soup.find('div', class_='card gameTicket').find_next('img')['src']}"
+    num_of_tix = int(sum(row["available"] for row in prizes) * overall_odds)
 
     game = {
         "game_id": game_id,
@@ -75,23 +65,25 @@ def process_game(game_url):
         "price": price,
         "num_tx_initial": num_of_tix,
         "prizes": prizes,
-        "image_urls": [image_urls],
     }
 
+    if wants(fields, "image_urls"):
+        image_urls = f"{BASE_URL}{soup.find('div', class_='card gameTicket').find_next('img')['src']}"
+        game["image_urls"] = [image_urls]
+
     return game
 
 
-def main():
+def main(fields=None):
     game_urls = get_games(INDEX_URL)
     games = []
 
     for url in game_urls:
         try:
-            game = process_game(url)
-        except Exception as e:
-            logger.error(f"Unable to process game: {url}")
-            logger.warning(e)
-            traceback.print_exception(e)
+            game = process_game(url, fields=fields)
+        except Exception:
+            logger.exception("Unable to process game: %s", url)
+            continue
         games.append(game)
     return games
 
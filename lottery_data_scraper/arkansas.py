@@ -5,31 +5,36 @@ from xmlrpc import client
 
 from bs4 import BeautifulSoup as bs
 import pandas as pd
-import requests
+from lottery_data_scraper import crawl
+from lottery_data_scraper.cache import memoize_parse
 from lottery_data_scraper.schemas import GameSchema 
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.util import fetch_page
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://www.myarkansaslottery.com"
 INDEX_URL = "https://www.myarkansaslottery.com/games/instant?amount=All"
 
+PARSER_VERSION = 1
 
-def game_urls():
-    index = requests.get(INDEX_URL).text
-    soup = bs(index, "lxml")
+
+def page_urls(index_html):
+    soup = bs(index_html, "lxml")
     page_hrefs = soup.find_all("a", title=re.compile("Go to page"))
-    page_links = [BASE_URL + l.attrs["href"] for l in page_hrefs]
-    page_htmls = [index] + [requests.get(page_link).text for page_link in page_links]
-    game_links = []
-    for page_html in page_htmls:
-        page_soup = bs(page_html, "lxml")
-        game_hrefs = page_soup.select(
-            'article[class~="node-instant-game"] \
-            div[class~="field-name-title-field"] a'
-        )
-        game_links += [BASE_URL + l.attrs["href"] for l in game_hrefs]
-    return game_links
+    return [BASE_URL + l.attrs["href"] for l in page_hrefs]
+
+
+def page_game_urls(page_html):
+    page_soup = bs(page_html, "lxml")
+    game_hrefs = page_soup.select(
+        'article[class~="node-instant-game"] \
+        div[class~="field-name-title-field"] a'
+    )
+    return [BASE_URL + l.attrs["href"] for l in game_hrefs]
+
+
+def game_urls():
+    return crawl.discover(INDEX_URL, page_urls, page_game_urls)
 
 
 def num_tickets(soup):
@@ -41,9 +46,11 @@ def num_tickets(soup):
     return num_winning_tx * odds
 
 
-def parse_game(url, html):
-    logger.debug(f"Parsing {url}")
-    soup = bs(html, "lxml")
+@memoize_parse(PARSER_VERSION)
+def parse_game(url, html, encoding=None):
+    """`html` is str, or bytes in `encoding`."""
+    logger.debug("Parsing %s", url)
+    soup = bs(html, "lxml", from_encoding=encoding)
     price = soup.find(class_="field-name-field-ticket-price").text.split("$")[1].strip()
     name = soup.find("div", class_="field-name-title-field").text.strip()
     num = soup.find(class_="field-name-field-game-number").text.split("No.")[1].strip()
@@ -76,14 +83,13 @@ def parse_game(url, html):
 
 
 def main():
-    urls = game_urls()
-    url_htmls = zip(urls, [fetch_html(url) for url in urls])
+    url_pages = crawl.crawl(INDEX_URL, page_urls, page_game_urls, fetch=fetch_page)
     games = []
-    for url, html in url_htmls:
+    for url, (content, encoding) in url_pages:
         try:
-            game = parse_game(url, html)
+            game = parse_game(url, content, encoding)
         except Exception as e:
-            logger.error("Unable to parse {}.\n>{}".format(url, e))
+            logger.error("Unable to parse %s.\n>%s", url, e)
             continue
         games.append(game)
     return games
@@ -0,0 +1,121 @@
+"""
+Skip re-parsing pages that haven't changed since the last run.
+
+Most of the prize tables we scrape change a few times a day at most.
+If we fetch a game page and its bytes are exactly what they were last time,
+then so is the game we parse out of it.
+
+Decorate a parse function with `memoize_parse` and its results are remembered
+by a hash of its arguments (the url and the html, usually), its name and a
+parser version.
+
+The last `PARSE_MEMO_SIZE` (1024) results are always remembered for the life
+of the process, least recently used first out, so a long-running daemon
+doesn't pile up a result for every version of every page it has ever seen.
+Set `PARSE_CACHE=True` to also remember them between runs, in the same store
+as the page cache. Processes on the same host share each other's results.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from lottery_data_scraper.store import store
+from lottery_data_scraper.util import content_hash
+
+logger = logging.getLogger(__name__)
+
+PARSE_MEMO_SIZE = int(os.environ.get("PARSE_MEMO_SIZE", 1024))
+
+# key -> serialized result, least recently used first.
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _get(key):
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+    if os.environ.get("PARSE_CACHE", False):
+        serialized = store().get("games", key)
+        if serialized is not None:
+            _remember(key, serialized)
+            return serialized
+    return None
+
+
+def _remember(key, serialized):
+    with _memo_lock:
+        _memo[key] = serialized
+        _memo.move_to_end(key)
+        while len(_memo) > PARSE_MEMO_SIZE:
+            _memo.popitem(last=False)
+
+
+def _set(key, serialized):
+    _remember(key, serialized)
+    if os.environ.get("PARSE_CACHE", False):
+        store().set("games", key, serialized)
+
+
+def _encode(arg):
+    if isinstance(arg, (str, bytes)):
+        return arg
+    # Marked, so the string "[1]" and the list [1] hash differently.
+    return "\0json:" + json.dumps(arg, sort_keys=True, default=sorted)
+
+
+def memoize_parse(version):
+    """
+    Decorator for parse functions whose result depends only on their arguments.
+
+        @memoize_parse(PARSER_VERSION)
+        def parse_game(url, html):
+            ...
+
+    `version` is part of the key. Each module passes its `PARSER_VERSION`.
+    Bump it whenever you change what the parser returns, or you'll keep
+    getting the old results back.
+
+    Results are stored as JSON, so every call gets its own copy of the game
+    and callers are free to modify it.
+
+    Arguments other than str and bytes are hashed as JSON, with sets sorted,
+    so the key is the same in every process. A call with an argument that
+    can't be is parsed without caching.
+    """
+
+    def decorator(parse):
+        name = "{}.{}".format(parse.__module__, parse.__qualname__)
+
+        @functools.wraps(parse)
+        def wrapper(*args, **kwargs):
+            try:
+                key = content_hash(
+                    name,
+                    str(version),
+                    *[_encode(arg) for arg in args],
+                    _encode(kwargs),
+                )
+            except TypeError as e:
+                logger.warning("Not caching result of %s: %s", name, e)
+                return parse(*args, **kwargs)
+            serialized = _get(key)
+            if serialized is not None:
+                logger.debug("Unchanged since last parse: %s", name)
+                return json.loads(serialized)
+            game = parse(*args, **kwargs)
+            try:
+                serialized = json.dumps(game)
+            except TypeError as e:
+                logger.warning("Not caching result of %s: %s", name, e)
+                return game
+            _set(key, serialized)
+            return json.loads(serialized)
+
+        return wrapper
+
+    return decorator
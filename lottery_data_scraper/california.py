@@ -1,20 +1,12 @@
-import locale
 import logging
 import json
 import operator
-import html2text
 
+from lottery_data_scraper.parsing import format_money
 from lottery_data_scraper.schemas import GameSchema
-from lottery_data_scraper.util import fetch_html
-
-# Set local for currency conversion and formatting
-# because California only gives prize values and our schema
-# expects a string representation of the prize.
-# https://docs.python.org/3/library/locale.html
-locale.setlocale(locale.LC_ALL, "en_US.utf8")
+from lottery_data_scraper.util import html_to_text, iter_json, wants
 
 logger = logging.getLogger(__name__)
-h = html2text.HTML2Text()
 
 BASE_URL = "https://www.calottery.com"
 SCRATCHER_URL = "https://www.calottery.com/api/games/scratchers"
@@ -25,39 +17,46 @@ def num_tx_initial(game):
     return grand_prize["odds"] * grand_prize["totalNumberOfPrizes"]
 
 
-def fetch_games():
-    response = json.loads(fetch_html(SCRATCHER_URL))
+def fetch_games(fields=None):
     games = []
-    for game_ in response["games"]:
+    # Decoded one game at a time so we never hold the whole response.
+    for game_ in iter_json(SCRATCHER_URL, "games"):
         prizes = []
         for prize_ in game_["prizeTiers"]:
             prize = {
                 "available": prize_["numberOfPrizesPending"],
                 "claimed": prize_["numberOfPrizesCashed"],
                 "value": prize_["value"],
-                "prize": locale.currency(prize_["value"], grouping=True)[
-                    :-3
-                ],  # -3 to drop the cents
+                # California only gives prize values and our schema
+                # expects a string representation of the prize.
+                "prize": format_money(prize_["value"], cents=False),
             }
             prizes.append(prize)
         grand_prize = sorted(game_["prizeTiers"], key=operator.itemgetter("value"))[-1]
         game = {
             "game_id": game_["gameNumber"],
             "name": game_["name"],
-            "desription": h.handle(game_["description"]),
-            "image_urls": [game_["unScratchedImage"], game_["scratchedImage"]],
-            "how_to_play": h.handle(game_["howToPlay"]),
             "num_tx_initial": num_tx_initial(game_),
             "price": game_["price"],
             "prizes": prizes,
             "state": "tx",
             "url": BASE_URL + game_["productPage"],
         }
+        if wants(fields, "description"):
+            game["description"] = html_to_text(game_["description"])
+        if wants(fields, "image_urls"):
+            game["image_urls"] = [game_["unScratchedImage"], game_["scratchedImage"]]
+        if wants(fields, "how_to_play"):
+            game["how_to_play"] = html_to_text(game_["howToPlay"])
         games.append(game)
     return games
 
 
+def main(fields=None):
+    return fetch_games(fields=fields)
+
+
 if __name__ == "__main__":
-    games = fetch_games()
+    games = main()
     schema = GameSchema(many=True)
     print(schema.dumps(games))
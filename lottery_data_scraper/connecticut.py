@@ -2,19 +2,21 @@ import logging
 import re
 
 from bs4 import BeautifulSoup as bs
-import html2text
+from lottery_data_scraper import crawl
+from lottery_data_scraper.cache import memoize_parse
 from lottery_data_scraper.schemas import GameSchema
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.strainer import strain, with_class
+from lottery_data_scraper.util import fetch_page, html_to_text, wants
 
 logger = logging.getLogger(__name__)
 
-h = html2text.HTML2Text()
-h.ignore_links = True
 
 BASE = "https://www.ctlottery.org"
 
 INDEX = "https://ctlottery.org/ScratchGamesTable"
 
+PARSER_VERSION = 1
+
 
 headers = {
     "X-Requested-With": "XMLHttpRequest",
@@ -23,22 +25,41 @@ headers = {
 }
 
 
-def get_games_urls(url):
-    html = fetch_html(url)
-    soup = bs(html, "lxml")
+def parse_index(html):
+    soup = bs(strain(html, "(//table)[1]"), "lxml")
     table = soup.find("table")
     game_hrefs = table.select("tr > td > a")
     game_urls = list(map(lambda x: BASE + x.attrs["href"], game_hrefs))
     return game_urls
 
 
-def parse_game(game_url):
+def get_games_urls(url):
+    # The whole index is on one page. No pagination.
+    return crawl.discover(url, lambda html: [], parse_index)
+
+
+def parse_game(game_url, fields=None):
+    content, encoding = fetch_page(game_url)
+    return parse_game_html(game_url, content, fields=fields, encoding=encoding)
+
+
+@memoize_parse(PARSER_VERSION)
+def parse_game_html(game_url, game_html, fields=None, encoding=None):
+    """`game_html` is str, or bytes in `encoding`."""
     # Each game page has two tables
     #   Table 1: Ticket Price, Num_Tx_remaining, Odds
     #   Table 2: Prize Table
-
-    game_html = fetch_html(game_url)
-    game_soup = bs(game_html, "lxml")
+    parts = [
+        "(//h2)[1]",
+        with_class("heading-sub-info"),
+        with_class("img-detail-block"),
+        with_class("unclaimed-prize-wrap"),
+    ]
+    if wants(fields, "how_to_play"):
+        parts.append(with_class("play-text-wrap"))
+    if wants(fields, "image_urls"):
+        parts.append("//*[@id='ticket_image']")
+    game_soup = bs(strain(game_html, *parts, encoding=encoding), "lxml")
 
     name = game_soup.find("h2").text
     game_id = re.match(
@@ -81,15 +102,6 @@ def parse_game(game_url):
             }
         )
 
-    how_to_play_soup = game_soup.find(class_="play-text-wrap")
-    # remove heading and button tags
-    how_to_play_soup.h3.extract()
-    how_to_play_soup.a.extract()
-
-    how_to_play = h.handle(how_to_play_soup.text)
-
-    image_urls = BASE + game_soup.find(id="ticket_image").attrs["src"]
-
     game = {
         "state": "ct",
         "game_id": game_id,
@@ -99,20 +111,31 @@ def parse_game(game_url):
         "url": game_url,
         "prizes": prizes,
         "num_tx_initial": num_tx_initial,
-        "how_to_play": how_to_play,
-        "image_urls": [image_urls],
     }
+
+    if wants(fields, "how_to_play"):
+        how_to_play_soup = game_soup.find(class_="play-text-wrap")
+        # remove heading and button tags
+        how_to_play_soup.h3.extract()
+        how_to_play_soup.a.extract()
+
+        game["how_to_play"] = html_to_text(how_to_play_soup.text, ignore_links=True)
+
+    if wants(fields, "image_urls"):
+        image_urls = BASE + game_soup.find(id="ticket_image").attrs["src"]
+        game["image_urls"] = [image_urls]
+
     return game
 
 
-def main():
-    games_urls = get_games_urls(INDEX)
+def main(fields=None):
+    url_pages = crawl.crawl(INDEX, lambda html: [], parse_index, fetch=fetch_page)
     games = []
-    for game in games_urls:
+    for url, (content, encoding) in url_pages:
         try:
-            game = parse_game(game)
+            game = parse_game_html(url, content, fields=fields, encoding=encoding)
         except Exception as e:
-            logger.error("Unable to parse game {}.\n{}".format(game, e))
+            logger.error("Unable to parse game %s.\n%s", url, e)
             continue
         games.append(game)
     return games
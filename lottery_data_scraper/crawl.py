@@ -0,0 +1,131 @@
+"""
+Discover game pages from a state's index.
+
+Most states list their games on an index page, sometimes split across several
+pages of pagination. Walking that index used to be the slow, serial part at
+the start of every run: fetch the index, then each pagination page in turn,
+and only then start on the game pages.
+
+`crawl` fetches all of the pagination pages at once and starts fetching game
+pages as soon as the links to them show up, while later index pages are still
+loading.
+
+The list of game urls we discover is cached in the shared store for a short
+while (`CRAWL_TTL` seconds, default 600). Games are added to an index every
+few weeks, not every few minutes, so back-to-back runs can skip the index
+entirely. Set `CRAWL_TTL=0` to always walk the index.
+"""
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from lottery_data_scraper.store import store
+from lottery_data_scraper.util import MAX_WORKERS, fetch_html, with_pruning
+
+logger = logging.getLogger(__name__)
+
+CRAWL_TTL = int(os.environ.get("CRAWL_TTL", 600))
+
+
+def _read_urls(key, ttl):
+    """Returns the cached urls for `key`, or None if they're missing or stale."""
+    if ttl <= 0:
+        return None
+    urls = store().get("urls", key, max_age=ttl)
+    return None if urls is None else json.loads(urls)
+
+
+def _write_urls(key, urls):
+    store().set("urls", key, json.dumps(urls))
+
+
+def cached_urls(key, find_urls, ttl=CRAWL_TTL):
+    """
+    Return `find_urls()`, cached on disk under `key` for `ttl` seconds.
+
+    Useful on its own for indexes we can't fetch with `fetch_html`,
+    like the ones we have to render with Selenium.
+    """
+    urls = _read_urls(key, ttl)
+    if urls is None:
+        urls = find_urls()
+        if ttl > 0:
+            _write_urls(key, urls)
+    return urls
+
+
+def crawl(index_url, find_page_urls, find_game_urls, ttl=CRAWL_TTL, fetch=None):
+    """
+    Fetch every game page linked from an index.
+
+    `find_page_urls(html)` returns the urls of the other pages of the index,
+    given the html of the first one. Return an empty list if there's no pagination.
+    `find_game_urls(html)` returns the game urls linked from one index page.
+
+    Returns a list of (game url, game html) tuples, in the order the games
+    appear in the index. Game pages that can't be fetched are logged and
+    left out, so one bad page doesn't cost us the rest of the state.
+
+    Game pages are fetched with `fetch`, `fetch_html` by default. Pass
+    `fetch=fetch_page` to get (game url, (content, encoding)) tuples instead.
+    """
+    fetch_game = with_pruning(fetch or fetch_html)
+    fetch_index = with_pruning(fetch_html)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        game_futures = {}
+
+        def fetch_games(urls):
+            for url in urls:
+                if url not in game_futures:
+                    game_futures[url] = pool.submit(fetch_game, url)
+            return urls
+
+        game_urls = _read_urls(index_url, ttl)
+        if game_urls is not None:
+            fetch_games(game_urls)
+        else:
+            index_html = fetch_html(index_url)
+            page_futures = {
+                pool.submit(fetch_index, url): i
+                for i, url in enumerate(find_page_urls(index_html), start=1)
+            }
+            # Pages finish loading in whatever order the server feels like.
+            # Keep each page's links in its own slot so the final list
+            # is in index order regardless.
+            pages = {0: fetch_games(find_game_urls(index_html))}
+            for future in as_completed(page_futures):
+                pages[page_futures[future]] = fetch_games(
+                    find_game_urls(future.result())
+                )
+            game_urls = list(
+                dict.fromkeys(url for i in sorted(pages) for url in pages[i])
+            )
+            if ttl > 0:
+                _write_urls(index_url, game_urls)
+
+        logger.debug("Found %s games from %s", len(game_urls), index_url)
+        url_htmls = []
+        for url in game_urls:
+            try:
+                url_htmls.append((url, game_futures[url].result()))
+            except Exception as e:
+                logger.error("Unable to fetch %s.\n%s", url, e)
+        return url_htmls
+
+
+def discover(index_url, find_page_urls, find_game_urls, ttl=CRAWL_TTL):
+    """
+    Like `crawl`, but only returns the game urls. Doesn't fetch any game pages.
+    """
+
+    def find_urls():
+        index_html = fetch_html(index_url)
+        page_urls = find_page_urls(index_html)
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            fetch = with_pruning(fetch_html)
+            page_htmls = [index_html] + list(pool.map(fetch, page_urls))
+        urls = [url for html in page_htmls for url in find_game_urls(html)]
+        return list(dict.fromkeys(urls))
+
+    return cached_urls(index_url, find_urls, ttl)
@@ -0,0 +1,62 @@
+"""
+Cache API keys that we have to scrape before we can use an API.
+
+Some states' APIs want a key that the state's own website embeds in its
+pages. Getting the key costs a page fetch, and the key can rotate at any time.
+
+A `Credential` fetches the key the first time it's needed and keeps it in the
+shared store (see lottery_data_scraper.store) for `ttl` seconds, so most runs
+never fetch it at all. When the API rejects a key, call `refresh` with the key
+that was rejected to get a new one.
+
+    api_key = Credential("oregon", lambda: get_api_key(INDEX_URL))
+    headers = {"Ocp-Apim-Subscription-Key": api_key.get()}
+"""
+import logging
+import threading
+
+from lottery_data_scraper.store import store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 24 * 60 * 60
+
+
+class Credential:
+    def __init__(self, name, fetch, ttl=DEFAULT_TTL):
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._value is None:
+                self._value = store().get("credentials", self.name, max_age=self.ttl)
+            if self._value is None:
+                self._refresh()
+            return self._value
+
+    def refresh(self, stale=None):
+        """
+        Fetch a new value.
+
+        Pass the value that was rejected as `stale`. If some other thread or
+        process has already replaced it, we use theirs instead of fetching
+        again, so a batch of requests that fail together only causes one refresh.
+        """
+        with self._lock:
+            if stale is not None:
+                stored = store().get("credentials", self.name, max_age=self.ttl)
+                if stored not in (None, stale):
+                    self._value = stored
+                    return self._value
+            if stale is None or self._value in (None, stale):
+                self._refresh()
+            return self._value
+
+    def _refresh(self):
+        logger.info("Fetching a new %s credential", self.name)
+        self._value = self.fetch()
+        store().set("credentials", self.name, self._value)
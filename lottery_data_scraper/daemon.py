@@ -0,0 +1,134 @@
+"""
+Keep scraping states on a schedule, in one long-running process.
+
+    python3 -m lottery_data_scraper.daemon --out /var/lib/lottery pa=900 tx=3600 ar
+
+scrapes Pennsylvania every 15 minutes, Texas every hour and Arkansas every
+`DEFAULT_INTERVAL` seconds, and writes each state's games to `<out>/<state>.json`
+after every run.
+
+Running each state from cron pays for starting Python, importing pandas and
+Selenium, starting browsers and opening connections, every single time.
+Here, state modules stay imported, HTTP sessions and browsers stay open in
+the worker threads, and in-process caches stay warm between runs.
+
+Each run is scheduled up to `JITTER` (a fraction of the interval) early or
+late so states that share an interval don't all hit the network at once.
+A state is never run twice at the same time. If a run takes longer than its
+interval, the next one starts when it finishes. If a state's site is broken
+and the runner gives up on it (see `runner.CircuitBreaker`), its last good
+games are left in place.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lottery_data_scraper import runner
+from lottery_data_scraper.schemas import GameSchema
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 3600
+JITTER = 0.1
+
+
+def parse_schedule(specs, default_interval=DEFAULT_INTERVAL):
+    """Turn ["pa=900", "tx"] into {"pa": 900, "tx": default_interval}."""
+    schedule = {}
+    for spec in specs:
+        state, _, interval = spec.partition("=")
+        if state not in runner.SCRAPERS:
+            raise ValueError("unknown state: {}".format(state))
+        schedule[state] = int(interval) if interval else default_interval
+    return schedule
+
+
+def next_run_at(interval, jitter=JITTER, now=None):
+    now = time.time() if now is None else now
+    return now + interval * (1 + random.uniform(-jitter, jitter))
+
+
+def write_games(out, state, games):
+    path = os.path.join(out, "{}.json".format(state))
+    tmp_path = "{}.{}".format(path, os.getpid())
+    with open(tmp_path, "w+") as f:
+        f.write(GameSchema(many=True).dumps(games))
+    os.replace(tmp_path, path)
+
+
+def run_state(state, out, fields=None):
+    started = time.time()
+    games = runner.run(state, fields=fields)
+    write_games(out, state, games)
+    logger.info(
+        "Scraped %s games for %s in %.1fs", len(games), state, time.time() - started
+    )
+
+
+def serve(schedule, out, poll_interval=1, fields=None):
+    # Spread the first runs out a little, too.
+    due = {
+        state: time.time() + random.uniform(0, JITTER * interval)
+        for state, interval in schedule.items()
+    }
+    running = {}
+    with ThreadPoolExecutor(max_workers=len(schedule)) as pool:
+        while True:
+            now = time.time()
+            for state, interval in schedule.items():
+                future = running.get(state)
+                if future is not None:
+                    if not future.done():
+                        continue
+                    del running[state]
+                    error = future.exception()
+                    if isinstance(error, runner.StateFailed):
+                        logger.error(
+                            "Gave up on %s: %s", state, json.dumps(error.report)
+                        )
+                    elif error is not None:
+                        logger.error("Unable to scrape %s.\n%s", state, error)
+                if due[state] <= now:
+                    running[state] = pool.submit(run_state, state, out, fields)
+                    due[state] = next_run_at(interval, now=now)
+            time.sleep(poll_interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "states",
+        nargs="+",
+        help="state codes with an optional interval in seconds, like pa=900 tx",
+    )
+    parser.add_argument("--out", default=".", help="directory to write games to")
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=DEFAULT_INTERVAL,
+        help="seconds between runs for states without their own interval",
+    )
+    parser.add_argument(
+        "--fields",
+        type=runner.parse_fields,
+        help="optional fields to include, like how_to_play,image_urls (default: all)",
+    )
+    args = parser.parse_args(argv)
+    try:
+        schedule = parse_schedule(args.states, args.interval)
+    except ValueError as e:
+        parser.error(str(e))
+    os.makedirs(args.out, exist_ok=True)
+    try:
+        serve(schedule, args.out, fields=args.fields)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
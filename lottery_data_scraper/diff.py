@@ -0,0 +1,209 @@
+"""
+Find what changed between two runs.
+
+Most runs only change a handful of prize counts. Rather than re-ingest every
+game, downstream systems can read the stream of changes instead.
+
+    python3 -m lottery_data_scraper.runner pa \\
+        | python3 -m lottery_data_scraper.diff /var/lib/lottery/pa.json
+
+reads the current games from stdin, compares them to the snapshot at the
+given path, prints the changes as a JSON list and saves the current games as
+the new snapshot. The first run, with no snapshot, reports every game as added.
+
+A state with no games in the current run probably failed to scrape, not
+sold out of every game at once. Its games aren't reported as removed, and
+they're carried forward into the new snapshot as they were.
+
+The changes are:
+
+    {"change": "game_added", "state": ..., "game_id": ..., "game": {...}}
+    {"change": "game_removed", "state": ..., "game_id": ...}
+    {"change": "tier_added", "state": ..., "game_id": ..., "prize": ..., "value": ...,
+     "available": ..., "claimed": ...}
+    {"change": "tier_removed", "state": ..., "game_id": ..., "prize": ..., "value": ...}
+    {"change": "tier_changed", "state": ..., "game_id": ..., "prize": ..., "value": ...,
+     "available": ..., "claimed": ..., "previous": {"available": ..., "claimed": ...}}
+    {"change": "top_prize_claimed", "state": ..., "game_id": ..., "prize": ...,
+     "value": ..., "available": ..., "claimed": ..., "newly_claimed": ...}
+
+Each game in a snapshot is stored with a digest of its contents,
+so a game that hasn't changed costs one hash comparison.
+"""
+import argparse
+import json
+import os
+import sys
+
+from lottery_data_scraper.util import content_hash
+
+# Fields that change every run without the game changing.
+VOLATILE_FIELDS = {"id", "created_at", "updated_at"}
+
+
+def game_key(game):
+    return "{}:{}".format(game.get("state"), game.get("game_id"))
+
+
+def digest(game):
+    return content_hash(
+        json.dumps(
+            {k: v for k, v in game.items() if k not in VOLATILE_FIELDS},
+            sort_keys=True,
+        )
+    )
+
+
+def snapshot(games):
+    """Index games by (state, game_id), along with a digest of each one."""
+    return {game_key(g): {"digest": digest(g), "game": g} for g in games}
+
+
+def _states(snapshot_):
+    return {entry["game"].get("state") for entry in snapshot_.values()}
+
+
+def carry_forward(previous_snapshot, current_snapshot):
+    """
+    The current snapshot, plus the previous one's games for states
+    that have no games in the current one.
+    """
+    scraped = _states(current_snapshot)
+    merged = {
+        key: entry
+        for key, entry in previous_snapshot.items()
+        if entry["game"].get("state") not in scraped
+    }
+    merged.update(current_snapshot)
+    return merged
+
+
+def _tiers(game):
+    """
+    Index a game's prizes by tier.
+
+    A tier is identified by its prize description and value. A few games have
+    more than one tier with the same prize, so those are numbered in order.
+    """
+    tiers = {}
+    for prize in game.get("prizes") or []:
+        tier = (prize.get("prize"), prize.get("value"))
+        n = 0
+        while tier + (n,) in tiers:
+            n += 1
+        tiers[tier + (n,)] = prize
+    return tiers
+
+
+def _tier_change(change, game, prize):
+    return {
+        "change": change,
+        "state": game.get("state"),
+        "game_id": game.get("game_id"),
+        "prize": prize.get("prize"),
+        "value": prize.get("value"),
+        "available": prize.get("available"),
+        "claimed": prize.get("claimed"),
+    }
+
+
+def diff_game(previous, current):
+    """Returns the tier changes between two versions of the same game."""
+    changes = []
+    previous_tiers = _tiers(previous)
+    current_tiers = _tiers(current)
+    values = [t[1] for t in current_tiers if isinstance(t[1], (int, float))]
+    top_value = max(values) if values else None
+    for tier, prize in current_tiers.items():
+        old = previous_tiers.get(tier)
+        if old is None:
+            changes.append(_tier_change("tier_added", current, prize))
+            continue
+        counts = (prize.get("available"), prize.get("claimed"))
+        old_counts = (old.get("available"), old.get("claimed"))
+        if counts == old_counts:
+            continue
+        change = _tier_change("tier_changed", current, prize)
+        change["previous"] = {"available": old_counts[0], "claimed": old_counts[1]}
+        changes.append(change)
+        newly_claimed = (prize.get("claimed") or 0) - (old.get("claimed") or 0)
+        if tier[1] == top_value and newly_claimed > 0:
+            change = _tier_change("top_prize_claimed", current, prize)
+            change["newly_claimed"] = newly_claimed
+            changes.append(change)
+    for tier, prize in previous_tiers.items():
+        if tier not in current_tiers:
+            change = _tier_change("tier_removed", previous, prize)
+            del change["available"], change["claimed"]
+            changes.append(change)
+    return changes
+
+
+def diff(previous_snapshot, current_snapshot):
+    """
+    Returns the changes from one snapshot to the next.
+
+    Games are only reported as removed from states that have games in
+    `current_snapshot`.
+    """
+    changes = []
+    scraped = _states(current_snapshot)
+    for key, entry in current_snapshot.items():
+        old = previous_snapshot.get(key)
+        game = entry["game"]
+        if old is None:
+            changes.append(
+                {
+                    "change": "game_added",
+                    "state": game.get("state"),
+                    "game_id": game.get("game_id"),
+                    "game": game,
+                }
+            )
+        elif old["digest"] != entry["digest"]:
+            changes += diff_game(old["game"], game)
+    for key, entry in previous_snapshot.items():
+        if key not in current_snapshot and entry["game"].get("state") in scraped:
+            changes.append(
+                {
+                    "change": "game_removed",
+                    "state": entry["game"].get("state"),
+                    "game_id": entry["game"].get("game_id"),
+                }
+            )
+    return changes
+
+
+def load_snapshot(path):
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_snapshot(path, snapshot_):
+    tmp_path = "{}.{}".format(path, os.getpid())
+    with open(tmp_path, "w+") as f:
+        json.dump(snapshot_, f)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("snapshot", help="path to the previous run's snapshot")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print the changes but don't update the snapshot",
+    )
+    args = parser.parse_args(argv)
+    previous = load_snapshot(args.snapshot)
+    current = snapshot(json.load(sys.stdin))
+    changes = diff(previous, current)
+    if not args.dry_run:
+        save_snapshot(args.snapshot, carry_forward(previous, current))
+    return changes
+
+
+if __name__ == "__main__":
+    print(json.dumps(main(sys.argv[1:])))
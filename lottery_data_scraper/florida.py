@@ -4,30 +4,50 @@ import os
 import re
 
 from bs4 import BeautifulSoup as bs
-import html2text
 import requests
 
+from lottery_data_scraper.cache import memoize_parse
+from lottery_data_scraper.parsing import count, odds, prize_value
 from lottery_data_scraper.schemas import GameSchema
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.strainer import strain, with_class
+from lottery_data_scraper.util import (
+    fetch_many,
+    fetch_page,
+    fetch_soup,
+    html_to_text,
+    wants,
+)
 
 logger = logging.getLogger(__name__)
 
 BASE = "https://flalottery.com/"
 INDEX = "https://flalottery.com/remainingPrizes"
-h = html2text.HTML2Text()
 
+PARSER_VERSION = 2
 
-def parse_game(url):
-    html = fetch_html(url)
-    soup = bs(html, 'lxml')
 
-    title = soup.select("#scratch-offs > h1")[0].text
+def parse_game(url, fields=None):
+    content, encoding = fetch_page(url)
+    return parse_game_html(url, content, fields=fields, encoding=encoding)
+
+
+@memoize_parse(PARSER_VERSION)
+def parse_game_html(url, html, fields=None, encoding=None):
+    """`html` is str, or bytes in `encoding`."""
+    parts = [
+        "//*[@id='scratch-offs']/h1",
+        with_class("ticketDetailsContent", "div"),
+        with_class("scratchOdds", "table"),
+    ]
+    if wants(fields, "image_urls"):
+        parts.append(with_class("ticketPicture", "img"))
+    soup = bs(strain(html, *parts, encoding=encoding), "lxml")
+
+    title = soup.find("h1").text
     uid, name = title[1:].split(" – ")
 
     details_content = soup.find("div", "ticketDetailsContent")
 
-    how_to_play = h.handle(str(details_content.find_all("p")[1]))
-
     price_paragraph = details_content.find(
         string=re.compile(r"Ticket Price:")
     ).parent.parent
@@ -37,54 +57,49 @@ def parse_game(url):
 
     # Some FL tickets are $X/Year for life.
     # "Life" in Florida is 20 years.
-    def get_value(prize):
-        if re.search(r"(Year|Yr)", prize, re.IGNORECASE):
-            return float(re.sub(r'[^\d\.]', '', prize)) * 20
-        elif re.search(r"(Week|Wk)", prize, re.IGNORECASE):
-            return float(re.sub(r'[^\d\.]', '', prize)) * 52 * 20
-        else:
-            return float(re.sub(r'[^\d\.]', '', prize))
-
     prizes = [
         {
             "prize": row[0].text,
-            "value": get_value(row[0].text),
-            "available": int(row[3].text.replace(",", "")),
-            "claimed": int(row[2].text.replace(",", "")) - int(row[3].text.replace(",", "")),
+            "value": prize_value(row[0].text, years=20),
+            "available": count(row[3].text),
+            "claimed": count(row[2].text) - count(row[3].text),
         }
         for row in [row.find_all("td") for row in prize_rows]
     ]
-    top_prize_odds = float(
-        prize_rows[0].find_all("td")[1].text.split("-in-")[1].replace(",", "")
-    )
+    top_prize_odds = odds(prize_rows[0].find_all("td")[1].text)
     num_tx_initial = (prizes[0]["available"] + prizes[0]["claimed"]) * top_prize_odds
-    image_url = soup.find("img", "ticketPicture").attrs["src"]
     
     game = {
         "name": name,
         "game_id": uid,
-        "how_to_play": how_to_play,
         "price": price,
         "state": "fl",
         "num_tx_initial": num_tx_initial,
-        "image_urls": [image_url],
         "url": url,
         "prizes": prizes,
     }
+    if wants(fields, "how_to_play"):
+        game["how_to_play"] = html_to_text(str(details_content.find_all("p")[1]))
+    if wants(fields, "image_urls"):
+        game["image_urls"] = [soup.find("img", "ticketPicture").attrs["src"]]
     return game
 
 
-def main():
-    index = fetch_html(INDEX)
-    soup = bs(index, "lxml")
-    game_urls = [BASE + t["href"] for t in soup.select(".gameNameLink > a")]
+def get_game_urls(url):
+    soup = fetch_soup(url)
+    return [BASE + t["href"] for t in soup.select(".gameNameLink > a")]
+
+
+def main(fields=None):
+    game_urls = get_game_urls(INDEX)
     games = []
 
-    for url in game_urls:
+    for url, (content, encoding) in fetch_many(game_urls, fetch=fetch_page):
         try:
-            game = parse_game(url)
+            game = parse_game_html(url, content, fields=fields, encoding=encoding)
         except Exception as e:
-            logger.error("Unable to process {}.\n{}".format(url, e))
+            logger.error("Unable to process %s.\n%s", url, e)
+            continue
         games.append(game)
     return games
 
@@ -2,37 +2,46 @@ import logging
 import re
 
 from bs4 import BeautifulSoup as bs
-import html2text
 
+from lottery_data_scraper.cache import memoize_parse
 from lottery_data_scraper.schemas import GameSchema 
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.util import (
+    fetch_many,
+    fetch_page,
+    fetch_soup,
+    html_to_text,
+    wants,
+)
 
 logger = logging.getLogger(__name__)
 
-h = html2text.HTML2Text()
-h.ignore_links = True
 
 BASE = "https://www.idaholottery.com"
 INDEX = "https://www.idaholottery.com/games/scratch"
 
+PARSER_VERSION = 1
+
 def get_games(url):
-    html = fetch_html(url)
-    soup = bs(html, "lxml")
+    soup = fetch_soup(url)
     game_urls = [BASE + n.attrs["href"] for n in soup.select(".game__inner a.image-link")]
 
     return game_urls
 
-def parse_game(url):
-    game_html = fetch_html(url)
-    game_soup = bs(game_html, "lxml")
+def parse_game(url, fields=None):
+    content, encoding = fetch_page(url)
+    return parse_game_html(url, content, fields=fields, encoding=encoding)
+
+
+@memoize_parse(PARSER_VERSION)
+def parse_game_html(url, game_html, fields=None, encoding=None):
+    """`game_html` is str, or bytes in `encoding`."""
+    game_soup = bs(game_html, "lxml", from_encoding=encoding)
 
     name = game_soup.select(".section-game h5")[0].text
 
     image_url = game_soup.select(".section__image-holder img")[0].attrs["src"]
 
     game_id = image_url.split("/")[-1].split("_")[0]
-   
-    how_to_play = h.handle(str(game_soup.find(id="tab2")))
 
     price_str = game_soup.select(".list-badgets h4")[1].text
     price = float(price_str.replace("$", ""))
@@ -90,25 +99,30 @@ def parse_game(url):
     game = {
         "name": name,
         "url": url,
-        "image_urls": [image_url],
         "state": "id",
         "game_id": game_id,
-        "how_to_play": how_to_play,
         "price": price,
         "num_tx_initial": num_tx_initial,
         "prizes": prizes
     }
+    if wants(fields, "how_to_play"):
+        game["how_to_play"] = html_to_text(
+            str(game_soup.find(id="tab2")), ignore_links=True
+        )
+    if wants(fields, "image_urls"):
+        game["image_urls"] = [image_url]
     
     return game
 
-def main():
+def main(fields=None):
     game_urls = get_games(INDEX)
     games = []
-    for url in game_urls:
+    for url, (content, encoding) in fetch_many(game_urls, fetch=fetch_page):
         try:
-            game = parse_game(url)
+            game = parse_game_html(url, content, fields=fields, encoding=encoding)
         except Exception as e:
-            logger.error("Unable to parse {}.\n{}".format(url, e))
+            logger.error("Unable to parse %s.\n%s", url, e)
+            continue
         games.append(game)
     return games
 
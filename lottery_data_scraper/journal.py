@@ -0,0 +1,165 @@
+"""
+Keep track of a run's finished games on disk, so a run that dies partway
+can pick up where it left off.
+
+    python3 -m lottery_data_scraper.runner pa tx ar
+    # ...killed halfway through tx...
+    python3 -m lottery_data_scraper.runner pa tx ar --resume
+
+The journal is a file of JSON lines in `JOURNAL_DIR`, appended to as the run
+goes: a header with the run's states and fields, one line with a state's game
+keys once they've been discovered, then one line per game as it's scraped.
+Writes are flushed right away, so the journal has every game that finished
+before the process died, wherever it died. A line cut off halfway by the
+crash is ignored.
+
+Each combination of states and fields gets its own journal file, so runners
+for different states don't get in each other's way. Two runners for the same
+states and fields would, so the second one to start refuses to.
+
+On `--resume`, states whose keys are in the journal aren't discovered again,
+and games that are in it aren't scraped again. They're read back instead.
+A run without `--resume` starts a new journal, and so does resuming a run
+that finished without giving up on any state.
+
+States that are scraped all at once (see `runner.SCRAPERS`) are journaled as
+a single game, so they're either done or started over.
+"""
+import json
+import logging
+import os
+import threading
+from tempfile import gettempdir
+
+from lottery_data_scraper.util import content_hash
+
+try:
+    import fcntl
+except ImportError:
+    # Not on Windows. Nothing stops two runners from sharing a journal there.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIR = os.environ.get("JOURNAL_DIR", gettempdir())
+
+
+class JournalInUse(Exception):
+    """Another runner has the journal open."""
+
+
+class JournalMismatch(Exception):
+    """Resuming a journal that was written for different states or fields."""
+
+
+def _key(key):
+    return json.dumps(key, sort_keys=True)
+
+
+def _header(states, fields):
+    return {
+        "states": None if states is None else list(states),
+        "fields": None if fields is None else sorted(fields),
+    }
+
+
+def journal_path(states=None, fields=None):
+    """Where the journal for a run of `states` with `fields` goes."""
+    header = json.dumps(_header(states, fields), sort_keys=True)
+    return os.path.join(
+        JOURNAL_DIR,
+        "lottery_data_scraper-journal-{}.jsonl".format(content_hash(header)),
+    )
+
+
+class Journal:
+    def __init__(self, path=None, resume=False, states=None, fields=None):
+        self.path = path or journal_path(states, fields)
+        self._lock = threading.Lock()
+        # state -> keys from discovery
+        self._keys = {}
+        # (state, key as JSON) -> games
+        self._games = {}
+        # Open without truncating, so we don't clobber the journal of a
+        # runner that's already using it before finding out that one is.
+        self._file = open(self.path, "a+", encoding="utf-8")
+        try:
+            self._take()
+            header = _header(states, fields)
+            if resume and self._file.tell() > 0 and self._load(header):
+                logger.info("Resuming with %s finished games", len(self._games))
+            else:
+                self._keys, self._games = {}, {}
+                self._file.truncate(0)
+                self._write({"header": header})
+        except Exception:
+            self._file.close()
+            raise
+
+    def _take(self):
+        if fcntl is None:
+            return
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise JournalInUse("Another runner is using {}".format(self.path)) from None
+
+    def _load(self, header):
+        """Read the journal back. Returns False if its run already finished."""
+        self._file.seek(0)
+        lines = iter(self._file)
+        try:
+            found = json.loads(next(lines)).get("header")
+        except (StopIteration, ValueError, AttributeError):
+            found = None
+        if found != header:
+            raise JournalMismatch(
+                "{} was written for {}, not {}".format(self.path, found, header)
+            )
+        line = ""
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                logger.warning("Skipping a partly written journal entry")
+                continue
+            if entry.get("finished"):
+                logger.info("The last run finished. Starting over.")
+                return False
+            if "keys" in entry:
+                self._keys[entry["state"]] = entry["keys"]
+            else:
+                self._games[entry["state"], _key(entry["key"])] = entry["games"]
+        if not line.endswith("\n"):
+            # Don't tack the next entry onto a line the crash cut off.
+            self._file.write("\n")
+        return True
+
+    def _write(self, entry):
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def keys(self, state):
+        """The keys discovered for `state`, or None if it wasn't."""
+        return self._keys.get(state)
+
+    def games(self, state, key):
+        """The games scraped for `key`, or None if it wasn't."""
+        return self._games.get((state, _key(key)))
+
+    def discovered(self, state, keys):
+        self._keys[state] = keys
+        self._write({"state": state, "keys": keys})
+
+    def scraped(self, state, key, games):
+        self._games[state, _key(key)] = games
+        self._write({"state": state, "key": key, "games": games})
+
+    def finished(self):
+        """Mark the run as done, so resuming it starts over."""
+        self._write({"finished": True})
+
+    def close(self):
+        self._file.close()
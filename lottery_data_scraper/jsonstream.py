@@ -0,0 +1,128 @@
+"""
+Decode the items of a big JSON array one at a time, as the response arrives.
+
+Several states' APIs return every game in one response. `response.json()`
+holds the whole body and every decoded game in memory at once, and then we
+build our own games from them on top of that. Streaming the array means only
+one API game is decoded at a time, however big the response gets.
+
+    >>> list(iter_json_array(['{"count": 2, "games": [{"id"', ': 1}, {"id": 2}]}'], "games"))
+    [{'id': 1}, {'id': 2}]
+
+This only handles the shapes the lottery APIs actually use: an array at the
+top of the document, or an array that's the value of a key in the top-level
+object. Values before the array are decoded and thrown away.
+
+Each value is decoded by `json.JSONDecoder.raw_decode`, in C, as soon as the
+buffer holds all of it. A value that's cut off at the end of the buffer is
+decoded again once more has arrived. The buffer at least doubles each time,
+so that never costs more than a few times the work of decoding it once.
+"""
+import json
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Text from an iterator of chunks, with a cursor into it."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.text = ""
+        self.pos = 0
+
+    def more(self):
+        """
+        Read at least as much again as is left to read.
+        Returns False if there wasn't anything left.
+        """
+        # Drop what we've already read so the buffer doesn't grow
+        # to the size of the whole response.
+        self.text = self.text[self.pos :]
+        self.pos = 0
+        wanted = max(2 * len(self.text), 1)
+        chunks = [self.text]
+        size = len(self.text)
+        for chunk in self.chunks:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= wanted:
+                break
+        if size == len(self.text):
+            return False
+        self.text = "".join(chunks)
+        return True
+
+    def peek(self):
+        """The next character that isn't whitespace."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.more():
+                raise ValueError("JSON ended early")
+
+    def expect(self, c):
+        if self.peek() != c:
+            raise ValueError(
+                "expected {!r} but found {!r}".format(c, self.text[self.pos])
+            )
+        self.pos += 1
+
+    def value(self):
+        """The next JSON value, decoded."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except ValueError as e:
+                # Probably cut off at the end of the buffer.
+                error, end = e, None
+            # A number or true/false/null at the very end of the buffer
+            # might go on in the next chunk.
+            complete = end is not None and (
+                end < len(self.text) or self.text[self.pos] in '{["'
+            )
+            if not complete and self.more():
+                continue
+            if end is None:
+                raise error
+            self.pos = end
+            return value
+
+
+def _find_key(reader, key):
+    """Move the reader to the value of `key` in the top-level object."""
+    reader.expect("{")
+    while reader.peek() != "}":
+        name = reader.value()
+        reader.expect(":")
+        if name == key:
+            return
+        reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+    raise KeyError(key)
+
+
+def iter_json_array(chunks, key=None):
+    """
+    Yield each item of a JSON array.
+
+    `chunks` is an iterable of str, like `response.iter_content(decode_unicode=True)`.
+    If `key` is given, the array is the value of that key in the top-level
+    object. Otherwise the whole document is the array.
+    """
+    reader = _Reader(chunks)
+    if key is not None:
+        _find_key(reader, key)
+    reader.expect("[")
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.value()
+        if reader.peek() == "]":
+            return
+        reader.expect(",")
@@ -0,0 +1,130 @@
+"""
+What we know about which games are still around, across every state.
+
+Games end. Their pages get taken down, or an API says when they stopped
+selling. Nothing's gained by requesting those again every run, so this keeps
+a record per game in the shared store. Games are identified by state and by
+their key from lottery_data_scraper.runner, or their game number for states
+that are scraped all at once. We remember:
+
+    when it went on sale, stopped selling, and stops being redeemable,
+    for states that tell us (`record_dates`),
+
+    and whether its page has gone missing, with a 404 or 410 (`tombstone`).
+
+`prune` drops the games that are known to be closed, or whose pages went
+missing recently, from a list of keys before anything is fetched. A missing
+page is tried again after `RETRY_MIN` seconds, then twice that, and so on up
+to `RETRY_MAX`, in case it comes back. A page that does come back is
+forgotten about with `revive`.
+
+    keys = lifecycle.prune("pa", runner.discover("pa"))
+"""
+import json
+import logging
+import time
+from datetime import date
+
+import requests
+
+from lottery_data_scraper.store import store
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before trying a missing page again, the first time and at most.
+RETRY_MIN = 24 * 60 * 60
+RETRY_MAX = 30 * 24 * 60 * 60
+
+
+def _key(state, game):
+    return "{}:{}".format(state, json.dumps(game, sort_keys=True))
+
+
+def get(state, game):
+    """Everything we know about a game, as a dict."""
+    value = store().get("lifecycle", _key(state, game))
+    return json.loads(value) if value is not None else {}
+
+
+def _set(state, game, entry):
+    store().set("lifecycle", _key(state, game), json.dumps(entry))
+
+
+def record_dates(state, game, start=None, end=None, validation_end=None):
+    """
+    Remember when a game went on sale, stopped selling, and stops being
+    redeemable. Dates are ISO 8601 strings. Only the date part is kept.
+    """
+    entry = get(state, game)
+    dates = {
+        "start": start and start[:10],
+        "end": end and end[:10],
+        "validation_end": validation_end and validation_end[:10],
+    }
+    if all(entry.get(name) == value for name, value in dates.items()):
+        return
+    entry.update(dates)
+    _set(state, game, entry)
+
+
+def ended(end, today=None):
+    """Whether a game that stops selling on `end`, an ISO 8601 date, has."""
+    today = today or date.today().isoformat()
+    # ISO 8601 dates sort as strings, so there's nothing to parse.
+    return end is not None and end[:10] < today
+
+
+def gone(error):
+    """Whether `error` says a page isn't there anymore."""
+    return (
+        isinstance(error, requests.HTTPError)
+        and error.response is not None
+        and error.response.status_code in (404, 410)
+    )
+
+
+def tombstone(state, game, reason):
+    """Remember that a game's page has gone missing, and why."""
+    entry = get(state, game)
+    missing = entry.get("missing") or {"reason": reason, "since": time.time()}
+    missing["misses"] = missing.get("misses", 0) + 1
+    missing["checked"] = time.time()
+    entry["missing"] = missing
+    _set(state, game, entry)
+    logger.info("%s game %s is missing: %s", state, game, reason)
+
+
+def revive(state, game):
+    """Forget that a game's page went missing, now that it's back."""
+    entry = get(state, game)
+    if entry.pop("missing", None) is not None:
+        _set(state, game, entry)
+
+
+def skip_reason(state, game, now=None):
+    """Why not to fetch a game right now, or None if it should be fetched."""
+    entry = get(state, game)
+    if ended(entry.get("end")):
+        return "ended {}".format(entry["end"])
+    missing = entry.get("missing")
+    if missing:
+        retry = min(RETRY_MIN * 2 ** (missing["misses"] - 1), RETRY_MAX)
+        if (now or time.time()) - missing["checked"] < retry:
+            return "missing: {}".format(missing["reason"])
+    return None
+
+
+def prune(state, games):
+    """`games`, without the ones we know not to fetch."""
+    kept = []
+    for game in games:
+        reason = skip_reason(state, game)
+        if reason is None:
+            kept.append(game)
+        else:
+            logger.debug("Skipping %s game %s, %s", state, game, reason)
+    if len(kept) < len(games):
+        logger.info(
+            "Skipping %s ended or missing %s games", len(games) - len(kept), state
+        )
+    return kept
@@ -0,0 +1,39 @@
+"""
+Remember where a game's other pages are.
+
+Some states make us fetch one page just to find the url of another.
+Pennsylvania's game page links to its rules page, and the rules page has the
+prize structure. Oregon's game pages are only linked from a grid that takes a
+browser to render, and the only way to tell which game a page is for is to
+fetch it. Those urls don't change once a game is out, so once we've found
+one, it's kept in the shared store. Later runs can start fetching both pages
+at once, or skip the page that was only there to find the other.
+
+    rules_url = links.get("pa", game_id, "rules")
+    if rules_url is None:
+        rules_url = find_complete_game_rules_url(fetch_html(game_url))
+        links.remember("pa", game_id, "rules", rules_url)
+
+Links are kept for `LINKS_TTL` seconds, 30 days by default. Whatever finds a
+link the long way should `remember` it again, so one that does change is
+fixed by the next run that looks.
+"""
+import os
+
+from lottery_data_scraper.store import store
+
+LINKS_TTL = float(os.environ.get("LINKS_TTL", 30 * 24 * 60 * 60))
+
+
+def _key(state, game_id, kind):
+    return "{}:{}:{}".format(state, kind, game_id)
+
+
+def get(state, game_id, kind):
+    """The url of a game's `kind` of page, or None if we don't know it yet."""
+    return store().get("links", _key(state, game_id, kind), max_age=LINKS_TTL)
+
+
+def remember(state, game_id, kind, url):
+    """Keep the url of a game's `kind` of page for next time."""
+    store().set("links", _key(state, game_id, kind), url)
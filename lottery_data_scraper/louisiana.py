@@ -1,6 +1,7 @@
 import logging
 from bs4 import BeautifulSoup as bs
 import pandas as pd
+from lottery_data_scraper.cache import memoize_parse
 from lottery_data_scraper.schemas import GameSchema
 from lottery_data_scraper.util import fetch_html
 
@@ -11,6 +12,8 @@ logger = logging.getLogger(__name__)
 BASE_URL = "http://www.louisianalottery.com"
 INDEX_URL = "https://louisianalottery.com/scratch-offs/top-prizes-remaining"
 
+PARSER_VERSION = 1
+
 
 def parse_index(html):
     soup = bs(html, "lxml")
@@ -21,6 +24,7 @@ def parse_index(html):
 
 
 # TODO: convert pandas to beautiful soup
+@memoize_parse(PARSER_VERSION)
 def parse_game(url, html):
     soup = bs(html, "lxml")
     price = soup.select('div[id="scratch-off-prize-info"] td')[1].text.replace("$", "")
@@ -72,7 +76,7 @@ def main():
         try:
             game = parse_game(url, html)
         except Exception as e:
-            logger.error("Unable to parse {}.\n{}".format(url, e))
+            logger.error("Unable to parse %s.\n%s", url, e)
             continue
         games.append(game)
     return games
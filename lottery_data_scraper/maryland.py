@@ -3,19 +3,19 @@ import os
 import re
 from xmlrpc import client
 
-import html2text
-import requests
-from selenium import webdriver
 from bs4 import BeautifulSoup as bs
 
 from lottery_data_scraper.schemas import GameSchema 
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.util import (
+    browser,
+    fetch_html,
+    html_to_text,
+    wants,
+)
 
 
 logger = logging.getLogger(__name__)
 
-s = requests.Session()
-h = html2text.HTML2Text()
 
 BASE_URL = "https://www.mdlottery.com"
 BASE_INDEX_URL = "https://www.mdlottery.com/games/scratch-offs/"
@@ -69,14 +69,13 @@ def _prizes(game_li):
 
 
 def _how_to_play(game_li):
-    return h.handle(str(game_li.find(class_="how-to-play")))
+    return html_to_text(str(game_li.find(class_="how-to-play")))
 
 
-def games(requests, url):
+def games(url, fields=None):
+    """Every game on the index at `url`, rendered by this thread's browser."""
     # Headless needed to run on server with no display
-    options = webdriver.firefox.options.Options()
-    options.headless = True
-    driver = webdriver.Firefox(options=options)
+    driver = browser("firefox")
     driver.get(url)
     html = driver.page_source
     soup = bs(html, "lxml")
@@ -86,7 +85,6 @@ def games(requests, url):
             "name": _name(game_li),
             "game_id": _num(game_li),
             "url": BASE_INDEX_URL,
-            "how_to_play": _how_to_play(game_li),
             "price": _price(game_li),
             "state": "md",
             "num_tx_initial": _num_tx(game_li),
@@ -94,12 +92,15 @@ def games(requests, url):
         }
         for game_li in game_lis
     ]
+    if wants(fields, "how_to_play"):
+        for game, game_li in zip(games, game_lis):
+            game["how_to_play"] = _how_to_play(game_li)
     return games
 
 
-def main():
+def main(fields=None):
     result_games = []
-    for game in games(s, INDEX_URL):
+    for game in games(INDEX_URL, fields=fields):
         result_games.append(game)
     return result_games
 
@@ -1,8 +1,7 @@
 import logging
 import os
 import re
-import traceback
-from selenium import webdriver
+from concurrent.futures import ThreadPoolExecutor
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -10,8 +9,9 @@ import requests
 import json
 
 from bs4 import BeautifulSoup as bs
+from lottery_data_scraper.parsing import count, money, odds
 from lottery_data_scraper.schemas import GameSchema
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.util import browser, fetch_html, session, wants
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +19,22 @@ BASE_URL = "https://www.masslottery.com"
 INDEX_URL = "https://www.masslottery.com/games/draw-and-instants"
 API_URL = "https://www.masslottery.com/api/v1/games"
 
+# Each game's page has to be rendered by a browser. This many render at once,
+# each in its own browser.
+MAX_BROWSERS = int(os.environ.get("MAX_BROWSERS", 4))
+
+# The threads, and the browsers they start, are kept for as long as the module
+# is loaded, so running Massachusetts again doesn't start new browsers.
+_pool = ThreadPoolExecutor(max_workers=MAX_BROWSERS)
+
 #Got almost every game working. Will come back.  
 
 
 def get_game_urls(url):
-    api_response = json.loads(requests.get(API_URL).text)
+    """
+    One request to the games API gets us every game's url and id.
+    """
+    api_response = session().get(url).json()
 
     game_urls_ids = [
         [f'{INDEX_URL}/{game["identifier"]}', game['id']]
@@ -34,21 +45,18 @@ def get_game_urls(url):
     return game_urls_ids
 
 
-def process_game(game_url_id):
+def process_game(game_url_id, fields=None):
     """
     Using Selenium to run JavaScript
     """
-    options = webdriver.chrome.options.Options()
-    options.headless = True
-    driver = webdriver.Chrome(options=options)
+    driver = browser("chrome")
     driver.get(game_url_id[0])
     try:
         elem = WebDriverWait(driver, 30).until(
             EC.presence_of_element_located((By.TAG_NAME, "h3"))
         )
     except Exception as e:
-        logger.warning(e)
-        traceback.print_exception(e)
+        logger.warning(e, exc_info=True)
     
     html = driver.page_source
     soup = bs(html, "lxml")
@@ -58,98 +66,76 @@ def process_game(game_url_id):
         name = soup.find("h3").text
     else:
         name = soup.find("h3").textContent
-    print(name)
+    logger.debug(name)
 
     game_id = game_url_id[1]
 
-    how_to_play = ""
-    for elm in soup.find("div", class_="cms-text").find_all("p")[3:]:
-        how_to_play += f"{elm.string} "
-
-    price = float((soup.find("div", class_="scratch-game-detail-card-price-text").text).replace("$",""))
-
-    image_url = f'https:{soup.find("div", class_= "cms-text").find_next("img")["src"]}'
+    price = money(soup.find("div", class_="scratch-game-detail-card-price-text").text)
 
     prizes = [
         {
             "prize": row_array.find(
                 "p", class_="game-prizes-remaining-prize-value"
             ).text.strip(),
-            "value": (
+            # "$1 Million" and "$5,000,000 ($250K/YR/20YRS)" both come out
+            # right; the first amount is the whole prize.
+            "value": money(
                 row_array.find("p", class_="game-prizes-remaining-prize-value").text
-            )
-            .replace("$", "")
-            .replace(",", ""),
-            "available": int(
-                re.search(
-                    "\d*",
-                    (
-                        row_array.find(
-                            "p", class_="game-prizes-remaining-remaining"
-                        ).text
-                    ).replace(",", ""),
-                ).group(0)
             ),
-            "claimed": int(
-                re.search(
-                    "\d*",
-                    (
-                        row_array.find(
-                            "p", class_="game-prizes-remaining-claimed"
-                        ).text
-                    ).replace(",", ""),
-                ).group(0)
-            )
+            "available": count(
+                row_array.find("p", class_="game-prizes-remaining-remaining").text
+            ),
+            "claimed": count(
+                row_array.find("p", class_="game-prizes-remaining-claimed").text
+            ),
         }
         for row_array in soup.find_all("tr")[1:]
     ]
 
-    odds = float(re.search(r"\d+.\d+", soup.find('div', class_='game-prizes-remaining-odds').text).group(0))
+    overall_odds = odds(soup.find('div', class_='game-prizes-remaining-odds').text)
 
-    num_of_tix = int(sum(row["available"] + row["claimed"] for row in prizes) * odds)
+    num_of_tix = int(sum(row["available"] + row["claimed"] for row in prizes) * overall_odds)
 
     game = {
         "name": name,
         "game_id": game_id,
         "url": game_url_id[0],
         "state": "ma",
-        "how_to_play": how_to_play,
         "price": price,
         "prizes": prizes,
-        "num_of_tix_initial":num_of_tix,
-        "image_urls": [image_url],
+        "num_tx_initial": num_of_tix,
     }
 
+    if wants(fields, "how_to_play"):
+        how_to_play = ""
+        for elm in soup.find("div", class_="cms-text").find_all("p")[3:]:
+            how_to_play += f"{elm.string} "
+        game["how_to_play"] = how_to_play
+
+    if wants(fields, "image_urls"):
+        image_url = f'https:{soup.find("div", class_= "cms-text").find_next("img")["src"]}'
+        game["image_urls"] = [image_url]
+
     # One off game situations
     for tier in game['prizes']:
-        if 'million' in tier['prize'].lower():
-            value = int(tier['prize'].split(' ')[0])
-            tier['value'] = value * 1000000
         if 'a month for 10 years' in tier['prize'].lower():
-            value = float(tier['prize'].split(' a')[0].replace('$', '').replace(',',''))
-            tier['value'] = value * 12 * 10
-        if '/YR/20YRS' in tier['prize']:
-            value = float(tier['prize'].split(' ')[0].replace('$','').replace(',',''))
-            tier['value'] = value
-        else:
-            tier['value'] = float(tier['value'])
+            tier['value'] = tier['value'] * 12 * 10
 
     return game
 
 
-def main():
+def main(fields=None):
     game_urls_ids = get_game_urls(API_URL)
-    games = []
 
-    for game in game_urls_ids:
+    def process(game):
         try:
-            processed_game = process_game(game)
-        except Exception as e:
-            logger.error(f"Unable to process game: {game}")
-            logger.warning(e)
-            traceback.print_exception(e)
-        games.append(processed_game)
-    return games
+            return process_game(game, fields=fields)
+        except Exception:
+            logger.exception("Unable to process game: %s", game)
+            return None
+
+    games = _pool.map(process, game_urls_ids)
+    return [game for game in games if game is not None]
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ import requests
 from requests import adapters
 
 from lottery_data_scraper.schemas import GameSchema
+from lottery_data_scraper.util import iter_json
 
 logger = logging.getLogger(__name__)
 
@@ -42,8 +43,15 @@ class TLSAdapter(adapters.HTTPAdapter):
 
 
 def fetch_games(games_url):
-    response = requests.get(games_url).json()
-    return response["games"]
+    return list(iter_games(games_url))
+
+
+def iter_games(games_url):
+    """
+    The response has every game New Jersey has ever sold, with all of their
+    prize tiers. We decode them one at a time rather than all at once.
+    """
+    return iter_json(games_url, "games")
 
 
 def parse_game(game_data):
@@ -52,11 +60,14 @@ def parse_game(game_data):
         "game_id": game_data["gameId"],
         "url": GAME_URL_FMT.format(game_data["gameId"]),
         "price": float(game_data["ticketPrice"] / 100),
+        # The API gives money in cents already. Keep them exact.
+        "price_cents": game_data["ticketPrice"],
         "state": "nj",
         "num_tx_initial": game_data["totalTicketsPrinted"],
         "prizes": [
             {
                 "value": p["prizeAmount"] / 100,
+                "value_cents": p["prizeAmount"],
                 "prize": p["prizeDescription"],
                 "available": (p["winningTickets"] - p["paidTickets"]),
                 "claimed": p["paidTickets"],
@@ -68,10 +79,12 @@ def parse_game(game_data):
     return game
 
 
-def main():
-    games_data = fetch_games(GAMES_URL)
+def main(fields=None):
+    # Everything comes from one API response. There's nothing to skip.
     games = [
-        parse_game(game) for game in games_data if game["validationStatus"] == "ACTIVE"
+        parse_game(game)
+        for game in iter_games(GAMES_URL)
+        if game["validationStatus"] == "ACTIVE"
     ]
     return games
 
@@ -2,11 +2,10 @@ import logging
 import os
 import re
 from xmlrpc import client
-import traceback
 
 from bs4 import BeautifulSoup as bs
 from lottery_data_scraper.schemas import GameSchema
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.util import fetch_html, fetch_soup, wants
 
 
 logger = logging.getLogger(__name__)
@@ -24,8 +23,7 @@ def get_games(site_url):
     parses page for game ids and game info
     returns and list of tuples with the id and game info for each game
     """
-    html = fetch_html(site_url)
-    soup = bs(html, "html.parser")
+    soup = fetch_soup(site_url, "html.parser")
 
     games_html = soup.find_all("div", class_="filter-block")
 
@@ -39,7 +37,7 @@ def get_games(site_url):
     return list(zip(ids, game_names, games_html))
 
 
-def process_game(game_info):
+def process_game(game_info, fields=None):
     """
     function takes game info: [game id, game_name, game_html_data]
 
@@ -57,8 +55,6 @@ def process_game(game_info):
 
     price = float(game_html.find("p", class_="price").text.replace("$", ""))
 
-    how_to_play = game_html.find("p", class_="how-to-play").find_next("span").text
-
     prizes = [
         {
             "prize": row[0].strip(),
@@ -77,33 +73,37 @@ def process_game(game_info):
 
     num_of_tix = int(prizes[0]["odds"] * prizes[0]["total"])
 
-    image_url = game_html.find("div", class_="scratcher-image").find_next("img")["src"]
-
     game = {
         "name": name,
         "game_id": game_id,
         "price": price,
-        "how_to_play": how_to_play,
         "prizes": prizes,
         "num_tx_initial": num_of_tix,
         "state": "nm",
-        "image_urls": f'["{image_url}"]',
     }
 
+    if wants(fields, "how_to_play"):
+        how_to_play = game_html.find("p", class_="how-to-play").find_next("span").text
+        game["how_to_play"] = how_to_play
+
+    if wants(fields, "image_urls"):
+        image_url = game_html.find("div", class_="scratcher-image").find_next("img")["src"]
+        game["image_urls"] = f'["{image_url}"]'
+
     return game
 
 
-def main():
+def main(fields=None):
     final_games = []
     games = get_games(INDEX_URL)
     for game in games:
         try:
-            game = process_game(game)
+            game = process_game(game, fields=fields)
             final_games.append(game)
-        except Exception as e:
-            logger.warning(f"Unable to process game: {game[0]}-{game[1]}")
-            logger.warning(e)
-            traceback.print_exception(e)
+        except Exception:
+            logger.warning(
+                "Unable to process game: %s-%s", game[0], game[1], exc_info=True
+            )
     return final_games
 
 
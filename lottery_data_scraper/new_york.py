@@ -1,19 +1,15 @@
 import logging
 import os
 import re
-import traceback
 
 
 from bs4 import BeautifulSoup as bs
 import requests
 import json
-import html2text
 
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.util import fetch_html, html_to_text, iter_json, wants
 from lottery_data_scraper.schemas import GameSchema
 
-h = html2text.HTML2Text()
-h.ignore_links = True
 
 logger = logging.getLogger(__name__)
 
@@ -27,14 +23,21 @@ def get_games(site_url):
     """
     Makes an API call to retrieve an array of list items of game data
 
-    Returns {rows: [array of games]}
+    Returns [array of games]
 
+    Every game's prize tiers come back in this one response,
+    so it's the only request we need to make.
     """
-    games = json.loads(requests.get(site_url).text)
+    games = json.loads(fetch_html(site_url))
 
     return games['rows']
 
 
+def iter_games(site_url):
+    """Like `get_games`, but decodes one game at a time as the response arrives."""
+    return iter_json(site_url, "rows")
+
+
 # Some of the games pay out in installments and the top prize in the 
 # nested table is expressed as the installment payment, not the lump sum
 def value_format_check(prize_amount, game_data):
@@ -43,7 +46,7 @@ def value_format_check(prize_amount, game_data):
     return prize_amount
 
 
-def process_game(game_data):
+def process_game(game_data, fields=None):
     """
     Receives Game Info:
     {
@@ -66,12 +69,6 @@ def process_game(game_data):
     name = game_data["title"].rstrip()
     game_url = f"{BASE_URL}?game={game_id}"
     price = float(game_data["ticket_price"])
-    image_url = game_data["art"][0]["uri"]
-
-    how_to_play_list = [
-        game["description"] for game in game_data["how_to_play"][0]["steps"]
-    ]
-    how_to_play = "".join(how_to_play_list)
 
     prizes = [
         {
@@ -97,28 +94,35 @@ def process_game(game_data):
         "name": name,
         "url": game_url,
         "state": "ny",
-        "how_to_play": h.handle(how_to_play),
         "price": price,
         "num_tx_initial": num_of_tix,
         "prizes": prizes,
-        "image_urls": [image_url],
     }
 
+    if wants(fields, "how_to_play"):
+        how_to_play_list = [
+            game["description"] for game in game_data["how_to_play"][0]["steps"]
+        ]
+        game["how_to_play"] = html_to_text(
+            "".join(how_to_play_list), ignore_links=True
+        )
+
+    if wants(fields, "image_urls"):
+        game["image_urls"] = [game_data["art"][0]["uri"]]
+
     return game
 
 
-def main():
-    game_info = get_games(API_URL)
+def main(fields=None):
     games = []
 
-    for game in game_info:
+    for game in iter_games(API_URL):
         try:
-            processed_game = process_game(game)
-        except Exception as e:
-            logger.error(f"Unable to process game: {GAME_URL}{game['game_number']}")
-            logger.warning(e)
-            traceback.print_exception(e)
-        games.append(processed_game)
+            games.append(process_game(game, fields=fields))
+        except Exception:
+            logger.exception(
+                "Unable to process game: %s%s", GAME_URL, game["game_number"]
+            )
     return games
 
 
@@ -2,10 +2,9 @@ import logging
 import os
 import re
 from xmlrpc import client
-import traceback
-import html2text
 from lottery_data_scraper.schemas import GameSchema
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.parsing import count, money, odds
+from lottery_data_scraper.util import fetch_html, wants
 
 from bs4 import BeautifulSoup as bs
 import requests
@@ -19,8 +18,6 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:70.0) Gecko/20100101 Firefox/70.0",
 }
 
-h = html2text.HTML2Text()
-
 
 def get_games(site_url):
     """
@@ -38,7 +35,7 @@ def get_games(site_url):
     return game_urls
 
 
-def process_game(game_url):
+def process_game(game_url, fields=None):
     """
     Takes game url. Makes request.
 
@@ -55,24 +52,20 @@ def process_game(game_url):
 
     name = game_url_split[-1].replace("-", " ").capitalize()
 
-    how_to_play = soup.find("h3").find_next("p").text
-
     # info_table {"", 'ticket price', '$price, 'top prize', odds, launch date, game number}
 
     info_table = soup.find("table", class_="juxtable details").find_all("td")
 
-    price = int(info_table[2].text.replace("$", ""))
-
-    odds = float(re.search(r"\d+.\d+", info_table[6].text).group(0))
+    price = count(info_table[2].text)
 
-    image_url = f"{BASE_URL}{soup.find('div', class_='box TicketImg').find_next('img')['src']}"
+    overall_odds = odds(info_table[6].text)
 
     prizes = [
         {
             "prize": elm[0].text.strip(),
-            "value": int(elm[0].text.strip().replace('$','').replace(',','')),
-            "claimed": int(elm[2].text.strip().replace(',',''))-int(elm[3].text.strip().replace(',','')),
-            "available": int(elm[3].text.strip().replace(',',''))
+            "value": money(elm[0].text),
+            "claimed": count(elm[2].text) - count(elm[3].text),
+            "available": count(elm[3].text),
         }
         for elm in [
             row.find_all("td")
@@ -80,33 +73,37 @@ def process_game(game_url):
         ]
     ]
 
-    num_of_tix = int(sum(row["claimed"] + row["available"] for row in prizes) * odds)
+    num_of_tix = int(sum(row["claimed"] + row["available"] for row in prizes) * overall_odds)
 
     game = {
         "name": name,
         "game_id": game_id,
-        "how_to_play": how_to_play,
         "url": game_url,
         "price": price,
         "prizes": prizes,
-        "image_urls": [image_url],
         "num_tx_initial": num_of_tix
     }
 
+    if wants(fields, "how_to_play"):
+        game["how_to_play"] = soup.find("h3").find_next("p").text
+
+    if wants(fields, "image_urls"):
+        image_url = f"{BASE_URL}{soup.find('div', class_='box TicketImg').find_next('img')['src']}"
+        game["image_urls"] = [image_url]
+
     return game
 
 
-def main():
+def main(fields=None):
     game_urls = get_games(INDEX_URL)
     games = []
     for game_url in game_urls:
         try:
-            game = process_game(game_url)
-            print(f"{game_url} succeeded")
-        except Exception as e:
-            logger.warning(e)
-            traceback.print_exception(e)
-            logger.warning(f"Unable to process game:{game_url}")
+            game = process_game(game_url, fields=fields)
+            logger.debug("%s succeeded", game_url)
+        except Exception:
+            logger.warning("Unable to process game:%s", game_url, exc_info=True)
+            continue
         games.append(game)
     return games
 
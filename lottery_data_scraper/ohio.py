@@ -1,21 +1,18 @@
 import logging
 import os
 import re
-import traceback
 from selenium import webdriver
 from datetime import datetime, date
 
 
 from bs4 import BeautifulSoup as bs
-import html2text
 import requests
 import json
 
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.util import fetch_html, fetch_soup
 from lottery_data_scraper.schemas import GameSchema
 
 logger = logging.getLogger(__name__)
-h = html2text.HTML2Text()
 
 BASE_URL = 'https://www.ohiolottery.com'
 INDEX_URL = 'https://www.ohiolottery.com/Games/ScratchOffs'
@@ -23,15 +20,13 @@ INDEX_URL = 'https://www.ohiolottery.com/Games/ScratchOffs'
 # Missing initial number of tickets per prize!
 
 def get_games(site_url):
-    html = fetch_html(site_url)
-    soup = bs(html, "lxml")
+    soup = fetch_soup(site_url)
     
     game_urls = [f"{BASE_URL}{game_soup.find('a')['href']}" for game_soup in soup.find_all('li', class_='igLandListItem')] 
     return game_urls
 
 def process_game(game_url):
-    html = fetch_html(game_url)
-    soup = bs(html, "lxml")
+    soup = fetch_soup(game_url)
 
     name = soup.find('h1').text.strip()
 
@@ -61,10 +56,8 @@ def main():
     for game in game_urls[:1]:
         try:
             processed_game = process_game(game)
-        except Exception as e:
-            logger.error(f"Unable to process game: {game}")
-            logger.warning(e)
-            traceback.print_exception(e)
+        except Exception:
+            logger.exception("Unable to process game: %s", game)
         games.append(processed_game)
     return games
 
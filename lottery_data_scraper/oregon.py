@@ -1,16 +1,22 @@
 import logging
 import os
 import re
-import traceback
-from selenium import webdriver
-from datetime import datetime, date
-
+from concurrent.futures import ThreadPoolExecutor
 
 from bs4 import BeautifulSoup as bs
-import requests
 import json
 
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper import crawl, lifecycle, links
+from lottery_data_scraper.credentials import Credential
+from lottery_data_scraper.store import store
+from lottery_data_scraper.util import (
+    MAX_WORKERS,
+    browser,
+    fetch_html,
+    fetch_many,
+    session,
+    wants,
+)
 from lottery_data_scraper.schemas import GameSchema
 
 logger = logging.getLogger(__name__)
@@ -29,20 +35,56 @@ SINGLE_GAME_API_URL = (
 )
 SINGLE_GAME_URL = "https://www.oregonlottery.org/scratch-its/"
 
+# How long to trust what we scraped from a game's web page, in seconds.
+PAGE_FIELDS_TTL = 7 * 24 * 60 * 60
+
 
 # Oregon uses API to store game data
 # API requires api key for access
 def get_api_key(site_url):
-    response = requests.get(site_url, headers=HEADERS).text
+    response = session().get(site_url, headers=HEADERS).text
     api_key = re.search(r"\"apikey\":\"(.+)\"", response).group(1)
 
     return api_key
 
 
-api_headers = {
-    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:70.0) Gecko/20100101 Firefox/70.0",
-    "Ocp-Apim-Subscription-Key": get_api_key(INDEX_URL),
-}
+# The key is embedded in the grid page. Getting it costs a page fetch,
+# so it's cached between runs and only fetched again when it expires
+# or the API stops accepting it.
+api_key = Credential("oregon", lambda: get_api_key(INDEX_URL))
+
+
+def api_headers(key):
+    return {
+        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:70.0) Gecko/20100101 Firefox/70.0",
+        "Ocp-Apim-Subscription-Key": key,
+    }
+
+
+def api_get(url):
+    """
+    GET some JSON from the Oregon API.
+
+    If the API rejects our key, it's probably been rotated.
+    Get a new one and try again, once.
+    """
+    key = api_key.get()
+    response = session().get(url, headers=api_headers(key))
+    if response.status_code in (401, 403):
+        logger.warning("Oregon API rejected our key. Refreshing it.")
+        key = api_key.refresh(stale=key)
+        response = session().get(url, headers=api_headers(key))
+    response.raise_for_status()
+    return response.json()
+
+
+def slug(name):
+    """
+    Oregon's game pages are at a kebab-case version of the game's name.
+
+    "$50 or $100" -> "50-or-100"
+    """
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
 
 
 def get_api_game_list(api_url):
@@ -69,14 +111,20 @@ def get_api_game_list(api_url):
 
         returns a list of game info [[game_ID, 'game's_name', game end date]...]
     """
-    response = requests.get(api_url, headers=api_headers).text
-    games_json = json.loads(response)
+    games_json = api_get(api_url)
     game_list = {}
 
     for game in games_json:
+        lifecycle.record_dates(
+            "or",
+            game["GameNumber"],
+            start=game.get("DateAvailable"),
+            end=game["GameEndDate"],
+            validation_end=game.get("ValidationEndDate"),
+        )
         game_list[game["GameNumber"]] = [
             game["GameEndDate"],
-            game["GameNameTitle"].lower().replace(" ", "-"),
+            slug(game["GameNameTitle"]),
         ]
 
     return game_list
@@ -86,9 +134,7 @@ def get_game_list(site_url):
     '''
     Using Selenium to run JavaScript
     '''
-    options = webdriver.chrome.options.Options()
-    options.headless = True
-    driver = webdriver.Chrome(options=options)
+    driver = browser("chrome")
     driver.get(site_url)
     html = driver.page_source
     soup = bs(html, "lxml")
@@ -112,44 +158,59 @@ def filter_games_by_expired(api_games_list):
     returns a lists of games that are dated older than the present day
     """
 
-    today_date = str(date.today().isoformat())
     filtered_games = {}
 
     for key in api_games_list:
-        if api_games_list[key][0] == None or datetime.strptime(
-            api_games_list[key][0], "%Y-%m-%dT%H:%M:%S"
-        ) >= datetime.strptime(today_date, "%Y-%m-%d"):
+        if not lifecycle.ended(api_games_list[key][0]):
             filtered_games[key] = api_games_list[key]
 
-
     return filtered_games
 
 
-def get_full_game_list():
-    # list of urls
-    games_list = get_game_list(INDEX_URL)
-    # dictionary using game_id as key {gameId = [], ....}
-    api_games_list = filter_games_by_expired(get_api_game_list(API_URL))
+def get_page_urls():
+    """
+    Find the web page for each game.
 
-    final_games_list = []
+    The grid only links to the pages, and the pages only have the game number
+    in a "data-game" attribute, so this renders the grid and fetches every page.
+    It's expensive. Only do it when you need something from the pages.
+    Which page is which game is remembered, so next time we can fetch just
+    the pages we need. See `get_page_fields`.
 
-    for game in games_list:
-        html = fetch_html(game)
+    Returns {game_id: (game_url, game_soup), ...}
+    """
+    # Rendering the grid takes a browser, so hang on to what we found for a bit.
+    games_list = crawl.cached_urls(INDEX_URL, lambda: get_game_list(INDEX_URL))
+    pages = {}
+    for game, html in fetch_many(games_list):
         soup = bs(html, "lxml")
         game_id = soup.find(
             "div", class_="ol-gamedata-scratchit ol-gamedata-scratchit--short"
         )["data-game"]
-        if api_games_list.get(game_id):
-            final_games_list.append([game_id, game, soup])
-    
-    return final_games_list
+        links.remember("or", game_id, "page", game)
+        pages[game_id] = (game, soup)
+    return pages
 
 
-def process_game(game_info):
+def get_known_pages(game_ids):
+    """
+    Returns {game_id: (game_url, game_soup), ...} like `get_page_urls`,
+    for just `game_ids`, or None if we don't know where some of their pages are.
     """
-    Takes game info [game_ID, game_url, game_soup]
+    urls = {game_id: links.get("or", game_id, "page") for game_id in game_ids}
+    if None in urls.values():
+        return None
+    pages = dict(fetch_many(urls.values()))
+    return {
+        game_id: (url, bs(pages[url], "lxml"))
+        for game_id, url in urls.items()
+        if url in pages
+    }
+
 
-    Retrieves api info
+def parse_game_api_info(game_id, game_api_info):
+    """
+    Parses a game from the GetGame api
         {
             "DateAvailable": "Date_Time_Format",
             "GameNameTitle": "Game's Name",
@@ -168,20 +229,9 @@ def process_game(game_info):
                 }]
         }
 
-    Parses game info from json info
-
-    Retrieves 'games image' and 'how to play' from game_soup
-
-    Saves game to database
+    The game has everything except what's only on the game's web page.
+    See `parse_page`.
     """
-
-    game_id = game_info[0]
-    url = game_info[1]
-    soup = game_info[2]
-    game_api_info = json.loads(
-        requests.get(f"{SINGLE_GAME_API_URL}{game_id}", headers=api_headers).text
-    )
-
     game_name = game_api_info[0]["GameNameTitle"]
 
     price = game_api_info[0]["TicketPrice"]
@@ -202,6 +252,22 @@ def process_game(game_info):
     
     num_of_tix = int(float(odds) * sum(p["total"] for p in prizes))
 
+    game = {
+        "name": game_name,
+        "game_id": game_id,
+        "url": f"{SINGLE_GAME_URL}{slug(game_name)}/",
+        "price": price,
+        "prizes": prizes,
+        "num_tx_initial": num_of_tix,
+        "state": "or",
+    }
+    return game
+
+
+def parse_page(soup):
+    """
+    Retrieves 'games image' and 'how to play' from a game's web page.
+    """
     how_to_play = soup.find('div', class_='ol-typography')
     how_to_play.h2.decompose()
     how_to_play = how_to_play.text.strip()
@@ -211,36 +277,80 @@ def process_game(game_info):
     ).find_next("img")["src"]
     image_url = f"{BASE_URL}{image_url_fetched}"
 
-    game = {
-        "name": game_name,
-        "game_id": game_id,
-        "url": url,
-        "price": price,
-        "prizes": prizes,
-        "num_tx_initial": num_of_tix,
-        "how_to_play": how_to_play,
-        "state": "or",
-        "image_urls": [image_url],
-    }
+    return {"how_to_play": how_to_play, "image_urls": [image_url]}
+
+
+def process_game(game_id, page_fields=None):
+    """
+    Fetches a game from the GetGame api and parses it.
+
+    `page_fields` are what `get_page_fields` found on the game's web page,
+    if anything. Without them, the game's url is a guess from its name.
+    """
+    game = parse_game_api_info(game_id, api_get(f"{SINGLE_GAME_API_URL}{game_id}"))
+    game.update(page_fields or {})
     return game
 
 
-def main():
-    # [[game_id, game_url, game_soup], ...]
-    games_list = get_full_game_list()
+def get_page_fields(game_ids):
+    """
+    Returns {game_id: {"url": ..., "how_to_play": ..., "image_urls": [...]}, ...}
 
-    games = []
+    How to play and the images never change once a game is out, so we keep
+    them in the shared store for `PAGE_FIELDS_TTL` seconds and only fetch
+    the game pages when some game's are missing or stale. If we know where
+    those games' pages are, we fetch just those. Otherwise it's all of them.
+    """
+    fields = {}
+    for game_id in game_ids:
+        cached = store().get("oregon-pages", game_id, max_age=PAGE_FIELDS_TTL)
+        if cached is not None:
+            fields[game_id] = json.loads(cached)
+    missing = [game_id for game_id in game_ids if game_id not in fields]
+    if not missing:
+        return fields
+    pages = get_known_pages(missing)
+    if pages is None:
+        pages = get_page_urls()
+    for game_id, (url, soup) in pages.items():
+        try:
+            page_fields = parse_page(soup)
+        except Exception as e:
+            logger.warning("Unable to parse page for game %s: %s", game_id, e)
+            continue
+        page_fields["url"] = url
+        store().set("oregon-pages", game_id, json.dumps(page_fields))
+        fields[game_id] = page_fields
+    return fields
 
-    for game in games_list:
+
+def main(fields=None):
+    """
+    Everything we need comes from the API except how to play and the game images,
+    which are on each game's web page. If `fields` doesn't include those, we
+    skip the browser and all of the page fetches.
+    """
+    # dictionary using game_id as key {gameId = [], ....}
+    api_games_list = filter_games_by_expired(get_api_game_list(API_URL))
+    game_ids = lifecycle.prune("or", list(api_games_list))
+
+    page_fields = any(wants(fields, field) for field in ("how_to_play", "image_urls"))
+    pages = get_page_fields(game_ids) if page_fields else {}
+
+    def fetch_game(game_id):
         try:
-            game = process_game(game)
+            game = process_game(game_id, pages.get(game_id))
         except Exception as e:
-            logger.warning(f"Unable to process game: {game[0]}-{game[1]}")
-            logger.warning(e)
-            traceback.print_exception(e)
-        games.append(game)
-    
-    return games
+            if lifecycle.gone(e):
+                lifecycle.tombstone("or", game_id, str(e))
+            logger.warning("Unable to process game %s.\n%s", game_id, e)
+            return None
+        lifecycle.revive("or", game_id)
+        return game
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        games = list(pool.map(fetch_game, game_ids))
+    return [game for game in games if game is not None]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,231 @@
+"""
+Parse the numbers out of the text on lottery sites.
+
+Every state writes money, ticket counts and odds a little differently:
+"$1,000", "$1 Million", "$500/wk for life", "1,350,500", "1 in 4.12",
+"1-in-3.50", "1:4". These helpers handle all of those, so state modules
+don't each need their own `.replace("$", "").replace(",", "")` chains.
+
+Going the other way, `format_money` writes a value the way US sites do,
+and `to_cents` turns a dollar amount into an exact whole number of cents.
+
+They run once per prize row, so they're written to be cheap. Patterns are
+compiled once, here, and the common case (a plain number) never touches a
+regex at all. Run this module to see how fast they are:
+
+    python3 -m lottery_data_scraper.parsing
+"""
+import re
+from decimal import ROUND_HALF_UP, Decimal
+
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?|\.\d+")
+_MONEY = re.compile(
+    r"(\d[\d,]*(?:\.\d+)?|\.\d+)\s*(million|mil|m|thousand|k)?\b", re.IGNORECASE
+)
+_MULTIPLIERS = {
+    "million": 1000000,
+    "mil": 1000000,
+    "m": 1000000,
+    "thousand": 1000,
+    "k": 1000,
+}
+_ODDS = re.compile(
+    r"\b1[\s-]*(?:in\b|:)[\s-]*(\d[\d,]*(?:\.\d+)?|\.\d+)", re.IGNORECASE
+)
+_PER_YEAR = [
+    (re.compile(r"week|wk", re.IGNORECASE), 52),
+    (re.compile(r"month|mo\b", re.IGNORECASE), 12),
+    (re.compile(r"year|yr|annual", re.IGNORECASE), 1),
+]
+
+
+def _plain(text):
+    """`text` without "$", "," and surrounding whitespace, if that's a plain number."""
+    plain = text.strip().lstrip("$").replace(",", "")
+    if plain.replace(".", "", 1).isdigit():
+        return plain
+    return None
+
+
+def count(text):
+    """
+    The first whole number in `text`, like a number of tickets.
+
+    >>> count("1,350,500")
+    1350500
+    >>> count("12 of 40")
+    12
+    """
+    plain = _plain(text)
+    if plain is not None and "." not in plain:
+        return int(plain)
+    match = _NUMBER.search(text)
+    if match is None:
+        raise ValueError("no number in {!r}".format(text))
+    return int(float(match.group().replace(",", "")))
+
+
+def money(text):
+    """
+    The first dollar amount in `text`, with "Million" or "K" multiplied out.
+
+    This is the face value of the prize. Annuities aren't multiplied out here;
+    see `prize_value` for that.
+
+    >>> money("$1,000")
+    1000.0
+    >>> money("$1 Million")
+    1000000.0
+    >>> money("$500/wk for life")
+    500.0
+    """
+    plain = _plain(text)
+    if plain is not None:
+        return float(plain)
+    match = _MONEY.search(text)
+    if match is None:
+        raise ValueError("no dollar amount in {!r}".format(text))
+    number, multiplier = match.groups()
+    value = float(number.replace(",", ""))
+    if multiplier:
+        value *= _MULTIPLIERS[multiplier.lower()]
+    return value
+
+
+def payments_per_year(text):
+    """
+    How many times a year a prize like "$500/wk for life" pays,
+    or None if it's paid all at once.
+    """
+    for pattern, n in _PER_YEAR:
+        if pattern.search(text):
+            return n
+    return None
+
+
+def prize_value(text, years=20):
+    """
+    The total value of a prize.
+
+    Prizes paid weekly, monthly or yearly are multiplied out over `years`
+    years. Most states count "for life" as 20 years.
+
+    >>> prize_value("$1,000")
+    1000.0
+    >>> prize_value("$500/wk for life")
+    520000.0
+    """
+    value = money(text)
+    if _plain(text) is not None:
+        return value
+    n = payments_per_year(text)
+    if n is not None:
+        value *= n * years
+    return value
+
+
+def odds(text):
+    """
+    The "N" in odds of "1 in N".
+
+    >>> odds("1 in 4.12")
+    4.12
+    >>> odds("1-in-3,200")
+    3200.0
+    >>> odds("1:4")
+    4.0
+    >>> odds("4.12")
+    4.12
+    """
+    plain = _plain(text)
+    if plain is not None:
+        return float(plain)
+    match = _ODDS.search(text) or _NUMBER.search(text)
+    if match is None:
+        raise ValueError("no odds in {!r}".format(text))
+    return float(match.group(match.lastindex or 0).replace(",", ""))
+
+
+def format_money(value, cents=True):
+    """
+    Format a dollar amount the way `locale.currency(value, grouping=True)`
+    does in the en_US locale, without needing that locale.
+
+    Setting a locale is process-wide, not thread-safe, and fails on machines
+    that don't have en_US installed. This gives byte-for-byte the same strings.
+
+    >>> format_money(3000000)
+    '$3,000,000.00'
+    >>> format_money(-1)
+    '-$1.00'
+    >>> format_money(1000.5, cents=False)
+    '$1,000'
+    """
+    if value < 0:
+        formatted = "-${:,.2f}".format(-value)
+    else:
+        formatted = "${:,.2f}".format(value)
+    # Rounding happens before the cents are dropped, like slicing
+    # `locale.currency`'s result.
+    return formatted if cents else formatted[:-3]
+
+
+def to_cents(value):
+    """
+    A dollar amount as a whole number of cents.
+
+    Floats are converted from their shortest repr, so 0.1 + 0.2 is 30 cents,
+    not 30.000000000000004. Half cents round up, like money usually does.
+
+    >>> to_cents(3000000)
+    300000000
+    >>> to_cents(0.1 + 0.2)
+    30
+    >>> to_cents("$1,000.505")
+    100051
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value * 100
+    if isinstance(value, str):
+        value = value.strip().lstrip("$").replace(",", "")
+    cents = Decimal(str(value)).scaleb(2)
+    return int(cents.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+if __name__ == "__main__":
+    import locale
+    import random
+    import timeit
+
+    samples = [
+        (count, "1,350,500"),
+        (count, "12 of 40"),
+        (money, "$1,000"),
+        (money, "$1 Million"),
+        (prize_value, "$500/wk for life"),
+        (odds, "1 in 4.12"),
+        (odds, "1-in-3,200"),
+    ]
+    for f, text in samples:
+        n, seconds = timeit.Timer(lambda: f(text)).autorange()
+        print(
+            "{:>12}({!r}) = {!r:<12} {:.0f}ns".format(
+                f.__name__, text, f(text), seconds / n * 1e9
+            )
+        )
+
+    values = [random.choice([1, 2.5, 1000, 250000, 3000000]) for _ in range(1000000)]
+    seconds = timeit.timeit(lambda: [format_money(v) for v in values], number=1)
+    print("format_money over {} tiers: {:.2f}s".format(len(values), seconds))
+    try:
+        locale.setlocale(locale.LC_MONETARY, "en_US.UTF-8")
+    except locale.Error:
+        print("en_US.UTF-8 isn't installed, so there's no locale.currency to compare")
+    else:
+        seconds = timeit.timeit(
+            lambda: [locale.currency(v, grouping=True) for v in values], number=1
+        )
+        print("locale.currency over {} tiers: {:.2f}s".format(len(values), seconds))
+        assert all(format_money(v) == locale.currency(v, grouping=True) for v in values)
@@ -1,21 +1,23 @@
-import sys
-import traceback
 from copy import deepcopy
-import locale
 import logging
 import re
 from bs4 import BeautifulSoup as bs
+from lottery_data_scraper import links
+from lottery_data_scraper.cache import memoize_parse
+from lottery_data_scraper.parsing import count, format_money, money, odds
 from lottery_data_scraper.schemas import GameSchema
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.strainer import strain, with_class
+from lottery_data_scraper.util import fetch_html, prefetch
 
 logger = logging.getLogger(__name__)
-locale.setlocale(locale.LC_MONETARY, "en_US.UTF-8")
 
 # It's worth assigning to constants values that are used in many
 # places throughout a script.
 BASE_URL = "https://www.palottery.state.pa.us"
 INDEX_URL = f"{BASE_URL}/Scratch-Offs/Active-Games.aspx"
 
+PARSER_VERSION = 3
+
 
 def find_game_names(html):
     """
@@ -23,7 +25,7 @@ def find_game_names(html):
     in the text of anchor elements
     which have the class "activeGame_li".
     """
-    soup = bs(html, "lxml")
+    soup = bs(strain(html, with_class("activeGame_li", "a")), "lxml")
     game_elements = soup.find_all("a", class_="activeGame_li")
     return [
         re.sub(r"\s+", " ", g.find("div", class_="info").text) for g in game_elements
@@ -37,7 +39,7 @@ def find_game_urls(html):
 
     The links are "href" attributes of anchor tags with the class "activeGame_li".
     """
-    soup = bs(html, "lxml")
+    soup = bs(strain(html, with_class("activeGame_li", "a")), "lxml")
     game_elements = soup.find_all("a", class_="activeGame_li")
     return ["{}{}".format(BASE_URL, e.attrs["href"]) for e in game_elements]
 
@@ -50,19 +52,51 @@ def find_complete_game_rules_url(html):
     The link to the game rules page is in an anchor tag
     nested under a div with the class "instant-games-games-info".
     """
-    soup = bs(html, "lxml")
+    soup = bs(strain(html, with_class("instant-games-games-info", "div")), "lxml")
     games_info_div = soup.find("div", class_="instant-games-games-info")
     games_info_anchor = games_info_div.find_all("a")[1]
     games_info_url = games_info_anchor.attrs["href"]
     return games_info_url
 
 
+def game_id(url):
+    return re.match(r".*?(\d+$)", url).group(1)
+
+
+def game_rules_url(game_url):
+    """
+    The url of a game's rules page.
+
+    It's only linked from the game page, but it never changes, so we only
+    fetch the game page to find it the first time. See lottery_data_scraper.links.
+    """
+    url = links.get("pa", game_id(game_url), "rules")
+    if url is None:
+        url = find_complete_game_rules_url(fetch_html(game_url))
+        links.remember("pa", game_id(game_url), "rules", url)
+    return url
+
+
+def fetch_game(url):
+    """
+    The html of a game page.
+
+    If we know where the game's rules page is from an earlier run, it's
+    fetched at the same time, so it's ready by the time `parse_game_html`
+    asks for it.
+    """
+    rules_url = links.get("pa", game_id(url), "rules")
+    if rules_url is not None:
+        prefetch(rules_url)
+    return fetch_html(url)
+
+
 def find_rows(html):
     """
     From a game rules page, find the rows of the table
     that have the number of tickets and the value of each prize.
     """
-    soup = bs(html, "lxml")
+    soup = bs(strain(html, "(//table)[1]"), "lxml")
 
     # Some game rules pages have multiple tables.
     # The first table has the prizes.
@@ -86,7 +120,7 @@ def find_rows(html):
     # giving us the number of losing tickets.
     header_row = row_elements[0]
     header_columns = header_row.find_all("th")
-    total_number_tickets = int(re.sub(r"\D", "", header_columns[-1].text))
+    total_number_tickets = count(header_columns[-1].text)
 
     row_elements = row_elements[1:]
 
@@ -107,7 +141,7 @@ def find_rows(html):
         try:
             value_element = columns[-3]
             value_text = value_element.text
-            return int(re.sub(r"\D", "", value_text))
+            return count(value_text)
         except Exception:
             # This is an exception we can handle.
             # We can simply return a value of 0 if
@@ -124,12 +158,12 @@ def find_rows(html):
         try:
             num_tickets_element = columns[-1]
             num_tickets_text = num_tickets_element.text
-            return int(num_tickets_text.replace(",", ""))
+            return count(num_tickets_text)
         except:
             # Same as above, we can handle this.
             # Logging and returning 0 is better than blowing up.
             logger.warning(
-                "Exception parsing num_tickets for a row.\n{}".format(row_element.text)
+                "Exception parsing num_tickets for a row.\n%s", row_element.text
             )
             return 0
 
@@ -155,7 +189,7 @@ def find_price(html):
     soup = bs(html, "lxml")
     price_element = soup.find(string="Price")
     price_text = price_element.parent.parent.text.split(" ")[-1]
-    price = int(re.sub(r"\D", "", price_text))
+    price = count(price_text)
     return price
 
 
@@ -175,9 +209,7 @@ def calculate_original_ev(game_url):
     For every $1 spent on the game, you'll get back $0.75
     for an average loss of $0.25.
     """
-    game_html = fetch_html(game_url)
-    game_rules_url = find_complete_game_rules_url(game_html)
-    game_rules_html = fetch_html(game_rules_url)
+    game_rules_html = fetch_html(game_rules_url(game_url))
     price = find_price(game_rules_html)
     rows = find_rows(game_rules_html)
     total_number_tickets = sum(r[1] for r in rows)
@@ -201,14 +233,25 @@ def combine_prizes(prizes):
 
 
 def parse_game_html(name, url, html):
+    """
+    Parses a game from its page and the complete game rules page it links to,
+    which this fetches.
+    """
+    rules_url = find_complete_game_rules_url(html)
+    links.remember("pa", game_id(url), "rules", rules_url)
+    return parse_game_pages(name, url, html, fetch_html(rules_url))
+
+
+@memoize_parse(PARSER_VERSION)
+def parse_game_pages(name, url, html, game_rules_html):
     game = {}
-    game_soup = bs(html, "lxml")
+    game_soup = bs(strain(html, with_class("table-global", "table")), "lxml")
     game["name"] = name.strip()
     game["url"] = url
-    game["game_id"] = re.match(r".*?(\d+$)", url).group(1)
-    game_rules_url = find_complete_game_rules_url(html)
-    game_rules_html = fetch_html(game_rules_url)
-    game_rules_soup = bs(game_rules_html, "lxml")
+    game["game_id"] = game_id(url)
+    game_rules_soup = bs(
+        strain(game_rules_html, with_class("miscr", "table")), "lxml"
+    )
     game["price"] = find_price(game_rules_html)
     prize_table = game_rules_soup.find("table", class_="miscr")
 
@@ -217,14 +260,13 @@ def parse_game_html(name, url, html):
         if re.search(r"FREE", p):
             return price
         else:
-            return p.replace("$", "").replace(",", "")
+            return money(p)
 
     prize_tuples = [
         [
-            int(tds[-1].text.replace(",", "").strip()),
-            float(tds[-2].text.replace(",", "").strip()),
+            count(tds[-1].text),
+            odds(tds[-2].text),
             float(prize_value(tds[-3], game["price"])),
-            # float(tds[-3].text.replace("$", "").replace(",", "").strip()),
         ]
         for tds in [tr.find_all("td") for tr in prize_table.find_all("tr")[1:]]
     ]
@@ -236,8 +278,8 @@ def parse_game_html(name, url, html):
     )
     prizes_remaining = [
         [
-            int(tds[1].text.strip()),
-            float(tds[0].text.replace("$", "").replace(",", "").strip()),
+            count(tds[1].text),
+            money(tds[0].text),
         ]
         for tds in [tr.find_all("td") for tr in prizes_remaining_table.find_all("tr")]
     ]
@@ -257,7 +299,7 @@ def parse_game_html(name, url, html):
         prize["available"] = p[0]
         prize["claimed"] = orig[0] - p[0]
         prize["value"] = p[1]
-        prize["prize"] = locale.currency(p[1], grouping=True)
+        prize["prize"] = format_money(p[1])
         game_prizes.append(prize)
     game["prizes"] = game_prizes
     return game
@@ -267,30 +309,18 @@ def main():
     index_html = fetch_html(INDEX_URL)
     game_urls = find_game_urls(index_html)
     game_names = find_game_names(index_html)
-    # Data will be a list of tuples that looks like:
-    # [(Ticket Price, Game Name, Expected Value), ...]
-    #
-    # The first element of the tuple of the list comprehension below
-    # is kind of confusing. We are iterating over game urls.
-    # We first fetch the html for the game url. Then we find the
-    # game rules url in that page. Then we fetch the html of the game rules
-    # page, then we find the price from that html.
-    # Hence:
-    #     `find_price(fetch_html(find_complete_game_rules_url(fetch_html(url))))`
     games = []
 
     for name, url in list(zip(game_names, game_urls)):
         try:
-            game_html = fetch_html(url)
+            game_html = fetch_game(url)
         except Exception as e:
             logger.error("Error fetching %s: %s", url, e)
             continue
         try:
             games.append(parse_game_html(name, url, game_html))
-        except Exception as e:
-            t, b, tb = sys.exc_info()
-            tb_msg = "\n".join(traceback.format_tb(tb))
-            logger.error("Unable to parse game {}.\n{}\n{}".format(name, e, tb_msg))
+        except Exception:
+            logger.exception("Unable to parse game %s.", name)
 
     return games
 
@@ -0,0 +1,70 @@
+"""
+Strip the parts of a page no scraper reads before it goes in the cache.
+
+Most of the bytes on a lottery site's game page are scripts, stylesheets and
+inline SVG icons. With `USE_CACHE`, every one of them is
+stored, read back and tokenized again each time the page is parsed from the
+cache. Set `PRUNE_CACHE=True` to prune pages before they're cached:
+
+    <script>, <style>, <noscript> and <svg> elements are removed,
+    and so are <!-- comments -->.
+
+Everything else, tags, attributes and every bit of text and whitespace, is
+left exactly as it was, so every selector a state module uses still finds
+what it did and every string it reads is the same. Anything that doesn't
+look like HTML, like a JSON response, is cached as it is.
+
+Pruning is only safe as long as no scraper reads what's removed. To check,
+set `PRUNE_VERIFY=True` and run lottery_data_scraper.runner. Pages are then
+cached whole, and every game is parsed twice, from the whole page and from
+the pruned one. Any game that comes out differently is logged as a warning.
+That covers pages fetched by `fetch_many`, `crawl` and Texas's worker threads
+too. A state that fetches pages from threads of its own has to hand its
+functions to them through `util.with_pruning` to be checked.
+
+See how much a page shrinks and how much faster it parses:
+
+    python3 -m lottery_data_scraper.prune https://www.ctlottery.org/ScratchGames/1740/
+"""
+import re
+
+_HTML = re.compile(rb"(?:\xef\xbb\xbf)?\s*<")
+_ELEMENTS = re.compile(
+    rb"<(script|style|noscript|svg)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+_COMMENTS = re.compile(rb"<!--.*?-->", re.DOTALL)
+
+
+def prune(content, encoding):
+    """
+    `content`, the bytes of a page in `encoding`, without what no scraper reads.
+
+    Pages in encodings that don't write "<" and ">" as ASCII, like UTF-16,
+    are returned as they are.
+    """
+    if not _HTML.match(content) or not "<a>".encode(encoding).endswith(b"<a>"):
+        return content
+    content = _ELEMENTS.sub(b"", content)
+    return _COMMENTS.sub(b"", content)
+
+
+if __name__ == "__main__":
+    import sys
+    import timeit
+
+    from bs4 import BeautifulSoup
+
+    from lottery_data_scraper.util import fetch_page
+
+    for url in sys.argv[1:]:
+        content, encoding = fetch_page(url)
+        pruned = prune(content, encoding)
+        sizes = []
+        for page in (content, pruned):
+            n, seconds = timeit.Timer(
+                lambda: BeautifulSoup(page, "lxml", from_encoding=encoding)
+            ).autorange()
+            sizes.append(
+                "{:,} bytes, parsed in {:.1f}ms".format(len(page), seconds / n * 1000)
+            )
+        print("{}\n  whole:  {}\n  pruned: {}".format(url, *sizes))
@@ -0,0 +1,367 @@
+"""
+Run scrapers for one or more states and print every game as one JSON list.
+
+    python3 -m lottery_data_scraper.runner pa tx ar 2> /tmp/errors.log | jq
+
+Each state module has a `main()` that does everything. But for most states,
+scraping is really two steps: discover the games (usually by walking an
+index), then fetch and parse each game. `SCRAPERS` describes those two steps
+for each state so that the runner, and the work queue in
+lottery_data_scraper.workqueue, can drive them one game at a time.
+
+A game's "key" is whatever the state's parse step needs to find the game,
+usually its url. Keys have to be JSON-serializable so they can be put on a
+work queue.
+
+When a site changes its layout, every one of its games fails to parse.
+Rather than keep fetching pages we can't use, `run` gives up on a state
+once a `CircuitBreaker` trips and raises `StateFailed`, which describes what
+went wrong. See `CircuitBreaker` for when that happens.
+
+Games that are known to have ended, or whose pages went missing recently,
+are skipped before anything is fetched. See lottery_data_scraper.lifecycle.
+
+Every game is written to a journal as it's scraped. If a run dies partway,
+run it again with `--resume` to scrape only what's left.
+See lottery_data_scraper.journal.
+
+Pass `--fields how_to_play,image_urls` (or `fields=` to the functions below)
+to say which optional fields you want. States skip the work of finding any
+optional field you don't ask for. Fields every game has are always included.
+"""
+import argparse
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+
+from lottery_data_scraper import lifecycle, util
+from lottery_data_scraper.journal import Journal, JournalInUse, JournalMismatch
+from lottery_data_scraper.schemas import GameSchema
+from lottery_data_scraper.util import fetch_html, fetch_page
+
+logger = logging.getLogger(__name__)
+
+# Give up on a state after this many games in a row fail to parse,
+MAX_CONSECUTIVE_FAILURES = int(os.environ.get("MAX_CONSECUTIVE_FAILURES", 5))
+# or once more than this fraction of its games have failed,
+# after at least MIN_ATTEMPTS of them,
+MAX_FAILURE_RATIO = float(os.environ.get("MAX_FAILURE_RATIO", 0.5))
+MIN_ATTEMPTS = 10
+# or after this many seconds. Empty means no limit.
+STATE_TIMEOUT = float(os.environ.get("STATE_TIMEOUT") or "inf")
+
+# State code -> (module, discover, parse)
+#
+# `discover(module)` returns a list of game keys.
+# `parse(module, key, fields)` returns a game.
+#
+# States that get all of their games from a single page or API response
+# don't have separate steps. Those have `None` for both and we call `main()`.
+#
+# Modules are imported lazily. Some of them start browsers or make
+# requests when they're imported.
+SCRAPERS = {
+    "ar": (
+        "arkansas",
+        lambda m: m.game_urls(),
+        lambda m, url, fields: m.parse_game(url, *fetch_page(url)),
+    ),
+    "az": (
+        "arizona",
+        lambda m: m.get_games(m.INDEX_URL),
+        lambda m, url, fields: m.process_game(url, fields=fields),
+    ),
+    "ca": ("california", None, None),
+    "ct": (
+        "connecticut",
+        lambda m: m.get_games_urls(m.INDEX),
+        lambda m, url, fields: m.parse_game(url, fields=fields),
+    ),
+    "fl": (
+        "florida",
+        lambda m: m.get_game_urls(m.INDEX),
+        lambda m, url, fields: m.parse_game(url, fields=fields),
+    ),
+    "id": (
+        "idaho",
+        lambda m: m.get_games(m.INDEX),
+        lambda m, url, fields: m.parse_game(url, fields=fields),
+    ),
+    "la": (
+        "louisiana",
+        lambda m: m.parse_index(fetch_html(m.INDEX_URL)),
+        lambda m, url, fields: m.parse_game(url, fetch_html(url)),
+    ),
+    "ma": (
+        "massachusetts",
+        lambda m: m.get_game_urls(m.API_URL),
+        lambda m, url_id, fields: m.process_game(url_id, fields=fields),
+    ),
+    "md": ("maryland", None, None),
+    "nc": (
+        "north_carolina",
+        lambda m: m.get_games(m.INDEX_URL),
+        lambda m, url, fields: m.process_game(url, fields=fields),
+    ),
+    "nj": ("new_jersey", None, None),
+    "nm": ("new_mexico", None, None),
+    "ny": ("new_york", None, None),
+    "or": ("oregon", None, None),
+    "pa": (
+        "pennsylvania",
+        lambda m: [
+            [name, url]
+            for name, url in zip(
+                m.find_game_names(fetch_html(m.INDEX_URL)),
+                m.find_game_urls(fetch_html(m.INDEX_URL)),
+            )
+        ],
+        lambda m, name_url, fields: m.parse_game_html(
+            name_url[0], name_url[1], m.fetch_game(name_url[1])
+        ),
+    ),
+    "tx": (
+        "texas",
+        lambda m: list(m.iter_game_urls(m.INDEX_URL)),
+        lambda m, url, fields: m.parse_game(url, *fetch_page(url)),
+    ),
+}
+
+
+def module(state):
+    return importlib.import_module("lottery_data_scraper.{}".format(SCRAPERS[state][0]))
+
+
+def discover(state):
+    """
+    Returns the keys of every game for a state,
+    or None if the state can only be scraped all at once.
+    """
+    _, discover_, _ = SCRAPERS[state]
+    if discover_ is None:
+        return None
+    return discover_(module(state))
+
+
+def scrape(state, key, fields=None):
+    """
+    Returns a list of games for one key from `discover`.
+
+    A `None` key scrapes the whole state.
+
+    With `PRUNE_VERIFY`, the games are scraped again from pruned pages and
+    any differences are logged. See lottery_data_scraper.prune.
+
+    A game whose page 404s is tombstoned, so it isn't fetched again for a
+    while. See lottery_data_scraper.lifecycle.
+    """
+    try:
+        games = _scrape(state, key, fields)
+    except Exception as e:
+        if key is not None and lifecycle.gone(e):
+            lifecycle.tombstone(state, key, str(e))
+        raise
+    if key is not None:
+        lifecycle.revive(state, key)
+    if util.PRUNE_VERIFY:
+        with util.pruned():
+            pruned_games = _scrape(state, key, fields)
+        if pruned_games != games:
+            logger.warning(
+                "Pruning changes %s game %s.\nWhole page: %s\nPruned page: %s",
+                state,
+                key,
+                json.dumps(games, default=str),
+                json.dumps(pruned_games, default=str),
+            )
+    return games
+
+
+def _scrape(state, key, fields):
+    _, _, parse = SCRAPERS[state]
+    if key is None:
+        return module(state).main(fields=fields)
+    return [parse(module(state), key, fields)]
+
+
+class StateFailed(Exception):
+    """
+    A state we gave up on. `report` says why, as a JSON-serializable dict:
+
+        {"state": "fl", "reason": "5 games in a row failed", "attempted": 12,
+         "failed": 7, "skipped": 40, "last_error": "..."}
+    """
+
+    def __init__(self, report):
+        super().__init__(report["reason"])
+        self.report = report
+
+
+class CircuitBreaker:
+    """
+    Decides when to stop scraping a state.
+
+    Call `record` after each game. Once `reason` isn't None, the breaker has
+    tripped and the state is probably broken. It trips after
+    `max_consecutive` failures in a row, after more than `max_ratio` of at
+    least `min_attempts` games have failed, or after `timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        max_consecutive=None,
+        max_ratio=None,
+        min_attempts=None,
+        timeout=None,
+    ):
+        self.max_consecutive = (
+            MAX_CONSECUTIVE_FAILURES if max_consecutive is None else max_consecutive
+        )
+        self.max_ratio = MAX_FAILURE_RATIO if max_ratio is None else max_ratio
+        self.min_attempts = MIN_ATTEMPTS if min_attempts is None else min_attempts
+        self.deadline = time.monotonic() + (
+            STATE_TIMEOUT if timeout is None else timeout
+        )
+        self.attempted = 0
+        self.failed = 0
+        self.consecutive = 0
+        self.last_error = None
+
+    def record(self, error=None):
+        """Record one game, and the exception it failed with, if it did."""
+        self.attempted += 1
+        if error is None:
+            self.consecutive = 0
+        else:
+            self.failed += 1
+            self.consecutive += 1
+            self.last_error = error
+
+    @property
+    def reason(self):
+        if self.consecutive >= self.max_consecutive:
+            return "{} games in a row failed".format(self.consecutive)
+        if (
+            self.attempted >= self.min_attempts
+            and self.failed / self.attempted > self.max_ratio
+        ):
+            return "{} of {} games failed".format(self.failed, self.attempted)
+        if time.monotonic() > self.deadline:
+            return "ran out of time"
+        return None
+
+    def report(self, state, remaining=0):
+        return {
+            "state": state,
+            "reason": self.reason,
+            "attempted": self.attempted,
+            "failed": self.failed,
+            "skipped": remaining,
+            "last_error": None if self.last_error is None else repr(self.last_error),
+        }
+
+
+def parse_fields(value):
+    """Turn "how_to_play,image_urls" into {"how_to_play", "image_urls"}."""
+    if value is None:
+        return None
+    return {field.strip() for field in value.split(",") if field.strip()}
+
+
+def run(state, fields=None, breaker=None, journal=None):
+    """
+    Scrape every game for a state. Games that fail to parse are logged and skipped.
+
+    Raises `StateFailed` if the state's `breaker` trips, or if a state
+    that's scraped all at once fails.
+
+    If there's a `journal`, every game is written to it as it's scraped, and
+    whatever it already has isn't scraped again.
+    See lottery_data_scraper.journal.
+    """
+    breaker = breaker or CircuitBreaker()
+    try:
+        keys = journal.keys(state) if journal else None
+        if keys is None:
+            keys = discover(state)
+            if keys is not None and journal:
+                journal.discovered(state, keys)
+        if keys is None:
+            return _scrape_journaled(state, None, fields, journal)
+        keys = lifecycle.prune(state, keys)
+    except Exception as e:
+        breaker.record(e)
+        report = breaker.report(state)
+        report["reason"] = "unable to scrape"
+        raise StateFailed(report) from e
+    games = []
+    for i, key in enumerate(keys):
+        try:
+            games += _scrape_journaled(state, key, fields, journal)
+            breaker.record()
+        except Exception as e:
+            logger.error("Unable to parse %s game %s.\n%s", state, key, e)
+            breaker.record(e)
+        if breaker.reason is not None:
+            raise StateFailed(breaker.report(state, remaining=len(keys) - i - 1))
+    return games
+
+
+def _scrape_journaled(state, key, fields, journal):
+    """`scrape`, unless the journal already has the games."""
+    if journal:
+        done = journal.games(state, key)
+        if done is not None:
+            return done
+    games = scrape(state, key, fields=fields)
+    if journal:
+        journal.scraped(state, key, games)
+    return games
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "states", nargs="*", default=sorted(SCRAPERS), help="state codes, like pa tx"
+    )
+    parser.add_argument(
+        "--fields",
+        type=parse_fields,
+        help="optional fields to include, like how_to_play,image_urls (default: all)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="pick up where the last run left off, instead of starting over",
+    )
+    args = parser.parse_args(argv)
+    unknown = set(args.states) - set(SCRAPERS)
+    if unknown:
+        parser.error("unknown states: {}".format(", ".join(sorted(unknown))))
+    games = []
+    try:
+        journal = Journal(resume=args.resume, states=args.states, fields=args.fields)
+    except (JournalInUse, JournalMismatch) as e:
+        parser.error(str(e))
+    failed = False
+    try:
+        for state in args.states:
+            try:
+                games += run(state, fields=args.fields, journal=journal)
+            except StateFailed as e:
+                logger.error("Gave up on %s: %s", state, json.dumps(e.report))
+                failed = True
+        if not failed:
+            journal.finished()
+    finally:
+        journal.close()
+    return games
+
+
+if __name__ == "__main__":
+    games = main(sys.argv[1:])
+    schema = GameSchema(many=True)
+    print(schema.dumps(games))
@@ -21,25 +21,52 @@ format.
     >>> game = {"game_id": "5", "price": 30, "state": "tx", "created_at": datetime.utcnow()}
     >>> schema = GameSchema()
     >>> schema.dumps(game)
-    '{"game_id": "5", "state": "tx", "created_at": "2023-04-08T05:58:49.494561", "price": 30.0, "image_urls": "[]"}'
+    '{"game_id": "5", "state": "tx", "created_at": "2023-04-08T05:58:49.494561", "price": 30.0, "price_cents": 3000, "image_urls": "[]"}'
 
 And you can load a JSON string into a Python object with `schema.loads`.
 
     >>> schema.loads(schema.dumps(game))
-    {'game_id': '5', 'state': 'tx', 'created_at': datetime.datetime(2023, 4, 8, 5, 58, 49, 494561), 'price': 30.0, 'image_urls': []}
+    {'game_id': '5', 'state': 'tx', 'created_at': datetime.datetime(2023, 4, 8, 5, 58, 49, 494561), 'price': 30.0, 'price_cents': 3000, 'image_urls': []}
 
 Some fields, like `game_id`, are required. You can validate a Python object by calling `schema.validate`.
 
     >>> game = {"price": 30, "state": "tx", "created_at": datetime.utcnow()}
     >>> schema.dumps(game)
-    '{"state": "tx", "created_at": "2023-04-08T06:02:32.126541", "price": 30.0, "image_urls": "[]"}'
+    '{"state": "tx", "created_at": "2023-04-08T06:02:32.126541", "price": 30.0, "price_cents": 3000, "image_urls": "[]"}'
     >>> schema.validate(game)
     {'created_at': ['Not a valid datetime.']}
+
+Money is dumped twice: as `value` and `price` in dollars, like the state
+modules compute them, and as `value_cents` and `price_cents`, exact whole
+numbers of cents. Prefer the cents when adding things up. A module that
+knows the exact cents (New Jersey's API gives them) can set them itself;
+otherwise they're worked out from the dollars. See lottery_data_scraper.parsing.
 """
 from datetime import datetime
 import json
 from marshmallow import Schema, fields
 
+from lottery_data_scraper.parsing import to_cents
+
+
+def cents_field(name):
+    """
+    A field for `<name>_cents`.
+
+    Uses the object's own `<name>_cents` if it has one, and converts `<name>`
+    (in dollars) if it doesn't.
+    """
+    key = name + "_cents"
+
+    def serialize(obj):
+        if obj.get(key) is not None:
+            return obj[key]
+        return to_cents(obj.get(name))
+
+    return fields.Function(
+        serialize, deserialize=lambda value: None if value is None else int(value)
+    )
+
 
 class PrizeSchema(Schema):
     class Meta:
@@ -51,6 +78,7 @@ class PrizeSchema(Schema):
     claimed = fields.Integer()
     created_at = fields.DateTime(load_default=datetime.utcnow)
     value = fields.Number()
+    value_cents = cents_field("value")
     prize = fields.Str()
 
 
@@ -70,6 +98,7 @@ class GameSchema(Schema):
     how_to_play = fields.Str()
     num_tx_initial = fields.Integer()
     price = fields.Number()
+    price_cents = cents_field("price")
     prizes = fields.Nested(PrizeSchema, many=True)
     state = fields.Str()
     updated_at = fields.DateTime()
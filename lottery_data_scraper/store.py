@@ -0,0 +1,112 @@
+"""
+A key-value store on disk that many threads and processes can share.
+
+It's a single SQLite database in write-ahead-log mode.
+Readers never block writers, writers wait their turn instead of clobbering
+each other, and every write is a transaction, so nobody ever reads
+half of a value. SQLite memory-maps the file, so hot entries are read
+straight out of the page cache.
+
+The database lives at `CACHE_DB`, which defaults to a file in the
+operating system's temp directory. Point every worker on a host at the same
+file and they'll share each other's cache hits.
+
+    >>> s = store()
+    >>> s.set("pages", "https://example.com", "<html></html>")
+    >>> s.get("pages", "https://example.com")
+    '<html></html>'
+"""
+import os
+import sqlite3
+import threading
+import time
+from tempfile import gettempdir
+
+CACHE_DB = os.environ.get(
+    "CACHE_DB", os.path.join(gettempdir(), "lottery_data_scraper.sqlite3")
+)
+
+# How long to wait on another process's write before giving up, in seconds.
+BUSY_TIMEOUT = 30
+MMAP_SIZE = 256 * 1024 * 1024
+
+
+def connect(path):
+    """Open a SQLite connection set up for sharing between processes."""
+    connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.execute("PRAGMA mmap_size={}".format(MMAP_SIZE))
+    return connection
+
+
+class Store:
+    def __init__(self, path=CACHE_DB):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        # SQLite connections can't be shared between threads.
+        # Each thread opens its own.
+        if not hasattr(self._local, "connection"):
+            connection = connect(self.path)
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS kv ("
+                    " namespace TEXT NOT NULL,"
+                    " key TEXT NOT NULL,"
+                    " value BLOB,"
+                    " updated_at REAL NOT NULL,"
+                    " PRIMARY KEY (namespace, key)"
+                    ") WITHOUT ROWID"
+                )
+            self._local.connection = connection
+        return self._local.connection
+
+    def get(self, namespace, key, max_age=None):
+        """
+        Returns the value stored under `key`, or None.
+
+        If `max_age` is given, values older than that many seconds count as missing.
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value, updated_at FROM kv WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        value, updated_at = row
+        if max_age is not None and time.time() - updated_at >= max_age:
+            return None
+        return value
+
+    def set(self, namespace, key, value):
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, updated_at)"
+                " VALUES (?, ?, ?, ?)",
+                (namespace, key, value, time.time()),
+            )
+
+    def delete(self, namespace, key):
+        with self._connection() as connection:
+            connection.execute(
+                "DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def store(path=None):
+    """Returns the shared `Store` for `path`, which defaults to `CACHE_DB`."""
+    path = path or CACHE_DB
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = Store(path)
+        return _stores[path]
@@ -1,27 +1,66 @@
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 from bs4 import BeautifulSoup as bs
 import pandas as pd
+from lottery_data_scraper.cache import memoize_parse
 from lottery_data_scraper.schemas import GameSchema
-from lottery_data_scraper.util import fetch_html
+from lottery_data_scraper.util import (
+    MAX_WORKERS,
+    fetch_page,
+    iter_html,
+    iter_html_events,
+    with_pruning,
+)
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = "http://www.txlottery.org"
 INDEX_URL = "http://www.txlottery.org/export/sites/lottery/Games/Scratch_Offs/all.html"
 
+PARSER_VERSION = 1
+
 
 def parse_index(html):
-    soup = bs(html, "lxml")
-    table = soup.find("table")
-    game_hrefs = table.select("tr > td > a")
-    game_urls = list(map(lambda x: BASE_URL + x.attrs["href"], game_hrefs))
-    return game_urls
+    events = iter_html_events([html], ("start", "end"), ("table", "a"))
+    return list(_game_urls(events))
+
+
+def iter_game_urls(url=INDEX_URL):
+    """
+    Yield the url of each game on the index as soon as it's downloaded.
+
+    The index is a big page and takes a while to download.
+    We stop downloading once we're past the table of games.
+    """
+    yield from _game_urls(iter_html(url, ("start", "end"), ("table", "a")))
+
+
+def _game_urls(events):
+    """
+    The games are the links in the cells of the first table,
+    `table tr > td > a`.
+    """
+    depth = 0
+    for event, element in events:
+        if element.tag == "table":
+            depth += 1 if event == "start" else -1
+            if depth == 0:
+                return
+        elif event == "end" and depth > 0 and _in_cell(element):
+            yield BASE_URL + element.get("href")
 
 
-def parse_game(url, html):
-    soup = bs(html, "lxml")
+def _in_cell(a):
+    td = a.getparent()
+    return td.tag == "td" and td.getparent().tag == "tr"
+
+
+@memoize_parse(PARSER_VERSION)
+def parse_game(url, html, encoding=None):
+    """`html` is str, or bytes in `encoding`."""
+    soup = bs(html, "lxml", from_encoding=encoding)
     price = int(re.match(r"\$(\d+)", soup.select("h3 > img")[0].attrs["alt"]).group(1))
     game_details = soup.select(".large-4.cell > h3")[0].parent.text.strip()
     title = soup.select(".large-12.cell > .text-center > h2")[0].text.split(" - ")
@@ -69,19 +108,32 @@ def parse_game(url, html):
     return game
 
 
-def _parse_game(url, html):
+def _parse_game(url, html, encoding=None):
+    try:
+        return parse_game(url, html, encoding)
+    except Exception as e:
+        logger.warning("Unable to parse %s.\n%s", url, e)
+    return None
+
+
+def _parse_fetched(url, html):
+    """`_parse_game`, given a future for the game's page from `fetch_page`."""
     try:
-        return parse_game(url, html)
+        return _parse_game(url, *html.result())
     except Exception as e:
-        logger.warning("Unable to parse {}.\n{}".format(url, e))
+        logger.warning("Unable to fetch %s.\n%s", url, e)
     return None
 
 
 def main():
-    index_html = fetch_html(INDEX_URL)
-    game_urls = parse_index(index_html)
-    url_htmls = zip(game_urls, [fetch_html(url) for url in game_urls])
-    games = [_parse_game(url, html) for url, html in url_htmls]
+    # Start fetching each game as soon as its link comes in,
+    # while the rest of the index is still downloading.
+    fetch = with_pruning(fetch_page)
+    with ThreadPoolExecutor(MAX_WORKERS) as pool:
+        url_htmls = [
+            (url, pool.submit(fetch, url)) for url in iter_game_urls(INDEX_URL)
+        ]
+        games = [_parse_fetched(url, html) for url, html in url_htmls]
     games = [game for game in games if game is not None]
     return games
 
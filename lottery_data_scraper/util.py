@@ -1,29 +1,276 @@
-import base64
+import atexit
+import codecs
+import functools
+import hashlib
+import itertools
+import logging
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+import html2text
 import requests
-from tempfile import gettempdir
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from lottery_data_scraper.jsonstream import iter_json_array
+from lottery_data_scraper.prune import prune
+from lottery_data_scraper.store import store
+
+logger = logging.getLogger(__name__)
+
+# How many requests we are willing to have in flight at once
+# when fetching a batch of pages.
+MAX_WORKERS = int(os.environ.get("MAX_WORKERS", 8))
+
+# How many pages `fetch_page` keeps in memory, and for how many seconds.
+RECENT_PAGES = int(os.environ.get("RECENT_PAGES", 128))
+RECENT_TTL = float(os.environ.get("RECENT_TTL", 300))
+
+# Whether to strip scripts, styles and whitespace from pages before caching
+# them, or to cache them whole and check that doing so wouldn't change any
+# games. See lottery_data_scraper.prune.
+PRUNE_CACHE = os.environ.get("PRUNE_CACHE", False)
+PRUNE_VERIFY = os.environ.get("PRUNE_VERIFY", False)
+
+_local = threading.local()
+
+# url -> Future for requests that are on their way, and
+# url -> (fetched_at, (content, encoding)) for recently fetched pages, oldest first.
+_pages_lock = threading.Lock()
+_in_flight = {}
+_recent = OrderedDict()
+
+# Runs `prefetch`es. Its threads are only started once something's prefetched.
+_background = ThreadPoolExecutor(MAX_WORKERS)
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+_HEADER_CHARSET = re.compile(r"""charset=["']?([\w.:-]+)""", re.IGNORECASE)
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w.:-]+)""", re.IGNORECASE)
+
+
+def session():
+    """
+    A `requests.Session` for the current thread.
+
+    Reusing a session keeps connections to a site open between requests,
+    which matters when we fetch dozens of pages from the same host.
+    Sessions aren't guaranteed to be thread-safe, so each thread gets its own.
+    """
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def browser(name="chrome"):
+    """
+    A headless Selenium browser ("chrome" or "firefox") for the current thread.
+
+    Starting a browser takes seconds, so we start one the first time a thread
+    asks for it and reuse it after that. They're all shut down when Python exits.
+    """
+    if not hasattr(_local, "browsers"):
+        _local.browsers = {}
+    browsers = _local.browsers
+    if name not in browsers:
+        # Most states don't need a browser. Don't make them import Selenium.
+        from selenium import webdriver
+
+        if name == "firefox":
+            options = webdriver.firefox.options.Options()
+            options.headless = True
+            driver = webdriver.Firefox(options=options)
+        else:
+            options = webdriver.chrome.options.Options()
+            options.headless = True
+            driver = webdriver.Chrome(options=options)
+        browsers[name] = driver
+        atexit.register(driver.quit)
+    return browsers[name]
+
+
+def fetch_page(url):
+    """
+    Fetch a page's raw bytes and their encoding, as `(content, encoding)`.
+
+    This is the cheapest way to get a page. Parsers like lxml read bytes
+    faster than str, so there's no need to decode the page just so the
+    parser can encode it again. See `fetch_soup`.
+
+    A page is fetched at most once at a time, and at most once every
+    `RECENT_TTL` seconds. Scrapers often need the same page more than once
+    in a run. Pennsylvania fetches each game's rules page for both the game
+    and its expected value, and several games share one rules page. If
+    another thread is already fetching `url`, we wait for its response rather
+    than make our own. The last `RECENT_PAGES` pages are kept in memory for
+    `RECENT_TTL` seconds, so asking again soon after is free. That's short
+    enough that a long-running process (see lottery_data_scraper.daemon)
+    still sees pages change between runs.
+
+    See `_fetch_page` for the cache on disk.
+
+    Inside `with pruned():`, pages come back pruned.
+    """
+    page = _shared_page(url)
+    if getattr(_local, "pruned", False):
+        content, encoding = page
+        return prune(content, encoding), encoding
+    return page
+
+
+def _shared_page(url):
+    """`fetch_page`, without pruning."""
+    with _pages_lock:
+        recent = _recent.get(url)
+        if recent is not None and time.monotonic() - recent[0] < RECENT_TTL:
+            _recent.move_to_end(url)
+            return recent[1]
+        future = _in_flight.get(url)
+        fetching = future is None
+        if fetching:
+            future = _in_flight[url] = Future()
+    if not fetching:
+        return future.result()
+    try:
+        page = _fetch_page(url)
+    except BaseException as e:
+        with _pages_lock:
+            del _in_flight[url]
+        future.set_exception(e)
+        raise
+    with _pages_lock:
+        del _in_flight[url]
+        _recent[url] = (time.monotonic(), page)
+        _recent.move_to_end(url)
+        while len(_recent) > RECENT_PAGES:
+            _recent.popitem(last=False)
+    future.set_result(page)
+    return page
+
+
+@contextmanager
+def pruned():
+    """
+    Have `fetch_page`, and everything that uses it, return pruned pages for
+    the rest of the `with` block, in this thread.
+
+    This is how `PRUNE_VERIFY` parses a game a second time from pruned
+    pages. Work handed to other threads has to go through `with_pruning`
+    to be pruned too.
+    """
+    was_pruned = getattr(_local, "pruned", False)
+    _local.pruned = True
+    try:
+        yield
+    finally:
+        _local.pruned = was_pruned
+
+
+def with_pruning(f):
+    """
+    `f`, wrapped to prune pages in whatever thread it runs in if this thread
+    is pruning them now. Wrap functions before handing them to a thread pool.
+    """
+    if not getattr(_local, "pruned", False):
+        return f
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        with pruned():
+            return f(*args, **kwargs)
+
+    return wrapper
+
+
+def prefetch(url):
+    """
+    Start fetching `url` in the background and return right away.
+
+    A `fetch_page` for the same url, in any thread, waits for this request
+    rather than making its own, or gets the page from memory if it's already
+    here. Use it to fetch a page you know you'll need while you're waiting on
+    another. Errors are left for that later `fetch_page` to run into.
+    """
+    _background.submit(fetch_page, url)
+
+
+def fetch_bytes(url):
+    """A page's raw bytes. See `fetch_page`."""
+    return fetch_page(url)[0]
 
 
 def fetch_html(url):
+    """A page as a str. See `fetch_page`."""
+    content, encoding = fetch_page(url)
+    return content.decode(encoding, errors="replace")
+
+
+def fetch_soup(url, features="lxml", **kwargs):
     """
-    Helper to fetch and cache html responses.
+    A page, parsed by BeautifulSoup straight from its bytes.
+
+    Telling BeautifulSoup the encoding keeps it from guessing.
+    Any other arguments, like `parse_only`, are passed along to it.
+    """
+    content, encoding = fetch_page(url)
+    return BeautifulSoup(content, features, from_encoding=encoding, **kwargs)
+
+
+def encoding_of(content, charset=None):
+    """
+    The encoding of a page: its byte order mark, the charset its server sent,
+    its <meta> charset, or UTF-8, whichever we find first.
+
+    requests would guess the encoding of a response without a charset by
+    running a detector over the whole body. Pages nearly always say what
+    they are in the first few hundred bytes, so we look there instead.
+    """
+    candidates = [name for bom, name in _BOMS if content.startswith(bom)]
+    candidates.append(charset)
+    match = _META_CHARSET.search(content, 0, 2048)
+    if match:
+        candidates.append(match.group(1).decode("ascii"))
+    for candidate in candidates:
+        if not candidate:
+            continue
+        try:
+            return codecs.lookup(candidate).name
+        except LookupError:
+            continue
+    return "utf-8"
+
+
+def _fetch_page(url):
+    """
+    Helper to fetch and cache responses.
 
     During development and while testing, we'll be hitting the same urls often.
     The content of the pages probably won't be changing.
     Caching the results will speed up development,
     and the servers will appreciate us for not spamming requests.
 
-    The responses are cached in the operating systems tempfile directory.
+    The responses are cached in a SQLite database in the operating systems
+    tempfile directory. See lottery_data_scraper.store.
     That's probably /tmp/ or /var/tmp/ on Unix flavors and C:/temp/ on Windows.
-    The filename is based on the URL. But since the URL might contain
-    characters that are invalid for filenames, we base64 encode the URL.
-    """
-    safe_filename = base64.urlsafe_b64encode(bytes(url, "utf-8")).decode("utf-8")
-    filepath = os.path.join(gettempdir(), safe_filename)
+    Several processes can share the cache without stepping on each other.
 
-    if os.path.isfile(filepath) and os.environ.get("USE_CACHE", False):
-        with open(filepath, "r") as f:
-            return f.read()
+    Pages are cached as the name of their encoding, a newline, and their bytes.
+    With `PRUNE_CACHE`, the bytes are pruned first, and the pruned page is what
+    we return, so a game parses the same whether its page came from the cache
+    or not. See lottery_data_scraper.prune.
+    """
+    use_cache = os.environ.get("USE_CACHE", False)
+    cached = store().get("raw-pages", url) if use_cache else None
+    if cached is not None:
+        encoding, _, content = cached.partition(b"\n")
+        return content, encoding.decode("ascii")
     else:
         # We are relying on the outside world when we make a request, so we
         # might want to wrap this in a try/except. But we'd
@@ -39,9 +286,157 @@ def fetch_html(url):
         #
         # In this case, I don't think it's worth muddying up the code
         # trying to handle exceptions here. It's easy enough to just re-run
-        # the script.
-        html = requests.get(url).text
-        if os.environ.get("USE_CACHE", False):
-            with open(filepath, "w+") as f:
-                f.write(html)
-        return html
+        # the script. We do make sure not to parse, or cache, an error page.
+        response = session().get(url)
+        response.raise_for_status()
+        content = response.content
+        charset = _HEADER_CHARSET.search(response.headers.get("content-type", ""))
+        encoding = encoding_of(content, charset and charset.group(1))
+        if use_cache and PRUNE_CACHE and not PRUNE_VERIFY:
+            content = prune(content, encoding)
+        if use_cache:
+            store().set("raw-pages", url, encoding.encode("ascii") + b"\n" + content)
+        return content, encoding
+
+
+def iter_json(url, key=None, chunk_size=64 * 1024):
+    """
+    Yield the items of the JSON array at `url` one at a time,
+    without holding the whole response in memory.
+
+    If `key` is given, the array is the value of that key in the response's
+    top-level object. See lottery_data_scraper.jsonstream.
+
+    With USE_CACHE, the response is read from (or written to) the cache in
+    one piece, like `fetch_html`, and the items are decoded from that.
+    """
+    if os.environ.get("USE_CACHE", False):
+        yield from iter_json_array([fetch_html(url)], key)
+        return
+    with session().get(url, stream=True) as response:
+        response.raise_for_status()
+        # JSON is UTF-8 unless a server says otherwise.
+        response.encoding = response.encoding or "utf-8"
+        chunks = response.iter_content(chunk_size=chunk_size, decode_unicode=True)
+        yield from iter_json_array(chunks, key)
+
+
+def iter_html(url, events=("end",), tag=None, chunk_size=64 * 1024):
+    """
+    Parse the page at `url` while it downloads, yielding lxml's
+    `(event, element)` pairs as soon as the parser gets to them.
+
+    `events` and `tag` are passed to `lxml.etree.HTMLPullParser`. With the
+    default "end" events, an element is yielded once its closing tag has
+    arrived, so its text, attributes and children are all there. Its parents
+    and later siblings aren't finished yet.
+
+    A big index page can take seconds to download. Everything we need from it
+    can be acted on as it arrives, like starting to fetch a game as soon as its
+    link comes in. Stop iterating and the rest of the page isn't downloaded.
+
+    With USE_CACHE, the page is read from (or written to) the cache in one
+    piece, like `fetch_html`, and parsed from that.
+    """
+    if os.environ.get("USE_CACHE", False):
+        content, encoding = fetch_page(url)
+        yield from iter_html_events([content], events, tag, encoding)
+        return
+    with session().get(url, stream=True) as response:
+        response.raise_for_status()
+        chunks = response.iter_content(chunk_size=chunk_size)
+        # A page says what its encoding is near the top, if anywhere.
+        first = next(chunks, b"")
+        charset = _HEADER_CHARSET.search(response.headers.get("content-type", ""))
+        encoding = encoding_of(first, charset and charset.group(1))
+        chunks = itertools.chain([first], chunks)
+        yield from iter_html_events(chunks, events, tag, encoding)
+
+
+def iter_html_events(chunks, events=("end",), tag=None, encoding=None):
+    """
+    Feed `chunks` of a page, str or bytes in `encoding`, to lxml's
+    `HTMLPullParser`, yielding its `(event, element)` pairs as they come.
+    See `iter_html`.
+    """
+    if encoding == "utf-8-sig":
+        # libxml2 skips the byte order mark itself.
+        encoding = "utf-8"
+    parser = etree.HTMLPullParser(events=events, tag=tag, encoding=encoding)
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def fetch_many(urls, max_workers=MAX_WORKERS, fetch=None):
+    """
+    Fetch a batch of pages concurrently.
+
+    Returns a list of (url, html) tuples in the same order as `urls`.
+    Pass `fetch=fetch_page` to get (url, (content, encoding)) instead.
+    Pages that can't be fetched are logged and left out, so one bad page
+    doesn't cost us the rest of the batch.
+    Most of the time spent scraping a state is waiting on the network,
+    so a handful of threads gets us most of the way to the speed of the site.
+    """
+    urls = list(urls)
+    url_htmls = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        fetch = with_pruning(fetch or fetch_html)
+        futures = [pool.submit(fetch, url) for url in urls]
+        for url, future in zip(urls, futures):
+            try:
+                url_htmls.append((url, future.result()))
+            except Exception as e:
+                logger.error("Unable to fetch %s.\n%s", url, e)
+    return url_htmls
+
+
+def content_hash(*parts):
+    """
+    A short, fast fingerprint of some page content.
+
+    Accepts any mix of str and bytes. Anything else is hashed by its `repr`.
+    blake2b is in the standard library
+    and hashes hundreds of megabytes a second, which is plenty next to
+    the cost of parsing the page.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        elif not isinstance(part, bytes):
+            part = repr(part).encode("utf-8")
+        h.update(part)
+        # Separate the parts so ("ab", "c") and ("a", "bc") hash differently.
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def html_to_text(html, **options):
+    """
+    Markdown-flavored text from some html, like a game's how-to-play section.
+
+    `options`, like `ignore_links=True`, are set on the `html2text.HTML2Text`
+    that does the work. One of those keeps its place in the document while it
+    works, so two threads sharing one garble each other's text. They're cheap
+    to make, so each call gets its own.
+    """
+    converter = html2text.HTML2Text()
+    for name, value in options.items():
+        setattr(converter, name, value)
+    return converter.handle(html)
+
+
+def wants(fields, field):
+    """
+    Whether a caller asked for `field`.
+
+    Parse functions take an optional `fields`, the set of game fields
+    the caller is going to use. None means all of them. Fields that are
+    expensive to compute and that not everyone uses, like "how_to_play",
+    are skipped unless they're wanted.
+    """
+    return fields is None or field in fields
@@ -0,0 +1,297 @@
+"""
+Spread the work of scraping across many worker processes.
+
+A coordinator runs each state's discovery step and puts one task per game on
+a queue. Workers, as many as you like, take tasks off the queue, fetch and
+parse the game, and write the result back.
+
+    python3 -m lottery_data_scraper.workqueue enqueue pa tx ar
+    python3 -m lottery_data_scraper.workqueue work &
+    python3 -m lottery_data_scraper.workqueue work &
+    python3 -m lottery_data_scraper.workqueue results pa | jq
+
+States that can only be scraped all at once (see `runner.SCRAPERS`)
+become a single task.
+
+A task that a worker has taken is invisible to other workers for
+`VISIBILITY_TIMEOUT` seconds. If the worker dies or hangs, the task shows up
+again and someone else takes it. A task that fails is retried, with a growing
+delay, up to `MAX_ATTEMPTS` times. Only the worker that last took a task can
+finish it. The result of a worker whose task timed out, or was cleared or
+queued again in the meantime, is dropped. Queuing a task again drops its old
+result, and enqueuing a state drops the tasks and results of its last run, so
+`results` only has games from the latest one.
+
+The default queue is a SQLite database at `QUEUE_DB`. That's enough for any
+number of workers on one host. Anything with the same methods as
+`SqliteQueue` (clear, put, get, done, fail, pending, results) can be passed to
+`coordinate` and `work` instead, to spread workers across hosts.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from tempfile import gettempdir
+
+from lottery_data_scraper import lifecycle, runner
+from lottery_data_scraper.schemas import GameSchema
+from lottery_data_scraper.store import connect
+from lottery_data_scraper.util import content_hash
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DB = os.environ.get(
+    "QUEUE_DB", os.path.join(gettempdir(), "lottery_data_scraper-queue.sqlite3")
+)
+VISIBILITY_TIMEOUT = 300
+MAX_ATTEMPTS = 3
+# Seconds to wait before retrying a failed task. Doubles with each attempt.
+RETRY_DELAY = 30
+
+
+def task_id(state, key):
+    return content_hash(state, json.dumps(key, sort_keys=True))
+
+
+class SqliteQueue:
+    def __init__(self, path=QUEUE_DB):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        if not hasattr(self._local, "connection"):
+            connection = connect(self.path)
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS tasks ("
+                    " id TEXT PRIMARY KEY,"
+                    " state TEXT NOT NULL,"
+                    " key TEXT NOT NULL,"
+                    " status TEXT NOT NULL,"
+                    " attempts INTEGER NOT NULL,"
+                    " visible_at REAL NOT NULL,"
+                    " error TEXT"
+                    ")"
+                )
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS tasks_pending"
+                    " ON tasks (status, visible_at)"
+                )
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    " id TEXT PRIMARY KEY,"
+                    " state TEXT NOT NULL,"
+                    " games TEXT NOT NULL,"
+                    " updated_at REAL NOT NULL"
+                    ")"
+                )
+            self._local.connection = connection
+        return self._local.connection
+
+    def clear(self, state):
+        """Forget every task and result for `state`."""
+        with self._connection() as connection:
+            connection.execute("DELETE FROM tasks WHERE state = ?", (state,))
+            connection.execute("DELETE FROM results WHERE state = ?", (state,))
+
+    def put(self, state, key):
+        """
+        Add a task. If the task is already waiting or being worked on,
+        this does nothing. If it was done or failed, it's queued again
+        and its old result is dropped.
+        """
+        id_ = task_id(state, key)
+        with self._connection() as connection:
+            connection.execute(
+                "DELETE FROM results WHERE id = ? AND EXISTS"
+                " (SELECT 1 FROM tasks WHERE id = ? AND status != 'pending')",
+                (id_, id_),
+            )
+            connection.execute(
+                "INSERT INTO tasks (id, state, key, status, attempts, visible_at)"
+                " VALUES (?, ?, ?, 'pending', 0, ?)"
+                " ON CONFLICT (id) DO UPDATE SET"
+                " status = 'pending', attempts = 0, visible_at = excluded.visible_at,"
+                " error = NULL"
+                " WHERE status != 'pending'",
+                (id_, state, json.dumps(key), time.time()),
+            )
+
+    def get(self, visibility_timeout=VISIBILITY_TIMEOUT):
+        """
+        Take the next task that's ready, or None if there isn't one.
+
+        Returns a dict with the task's "id", "state", "key" and "attempts",
+        and "lease", which says it's this worker's turn at the task.
+        """
+        connection = self._connection()
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can't
+        # both select the same task before either of them marks it taken.
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "UPDATE tasks SET status = 'failed'"
+                " WHERE status = 'pending' AND visible_at <= ? AND attempts >= ?",
+                (now, MAX_ATTEMPTS),
+            )
+            row = connection.execute(
+                "SELECT id, state, key, attempts FROM tasks"
+                " WHERE status = 'pending' AND visible_at <= ?"
+                " ORDER BY visible_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE tasks SET attempts = attempts + 1, visible_at = ?"
+                    " WHERE id = ?",
+                    (now + visibility_timeout, row[0]),
+                )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        id_, state, key, attempts = row
+        return {
+            "id": id_,
+            "state": state,
+            "key": json.loads(key),
+            "attempts": attempts + 1,
+            "lease": now + visibility_timeout,
+        }
+
+    def done(self, task, games):
+        """Save a task's games, if it's still this worker's to finish."""
+        with self._connection() as connection:
+            finished = connection.execute(
+                "UPDATE tasks SET status = 'done', error = NULL"
+                " WHERE id = ? AND status = 'pending' AND attempts = ?"
+                " AND visible_at = ?",
+                (task["id"], task["attempts"], task["lease"]),
+            ).rowcount
+            if not finished:
+                logger.info("Dropping a stale result for %s", task["id"])
+                return
+            connection.execute(
+                "INSERT OR REPLACE INTO results (id, state, games, updated_at)"
+                " VALUES (?, ?, ?, ?)",
+                (task["id"], task["state"], json.dumps(games), time.time()),
+            )
+
+    def fail(self, task, error):
+        """Put a task back to be retried later, or give up on it."""
+        with self._connection() as connection:
+            if task["attempts"] >= MAX_ATTEMPTS:
+                connection.execute(
+                    "UPDATE tasks SET status = 'failed', error = ? WHERE id = ?",
+                    (str(error), task["id"]),
+                )
+            else:
+                delay = RETRY_DELAY * 2 ** (task["attempts"] - 1)
+                connection.execute(
+                    "UPDATE tasks SET visible_at = ?, error = ? WHERE id = ?",
+                    (time.time() + delay, str(error), task["id"]),
+                )
+
+    def pending(self):
+        """How many tasks are waiting or being worked on."""
+        return (
+            self._connection()
+            .execute("SELECT count(*) FROM tasks WHERE status = 'pending'")
+            .fetchone()[0]
+        )
+
+    def results(self, states=None):
+        """Returns every game that's been scraped for `states` (or all states)."""
+        rows = self._connection().execute(
+            "SELECT state, games FROM results ORDER BY state, id"
+        )
+        return [
+            game
+            for state, games in rows
+            if states is None or state in states
+            for game in json.loads(games)
+        ]
+
+
+def coordinate(states, queue):
+    """Run discovery for each state and put a task on the queue for every game."""
+    for state in states:
+        try:
+            keys = runner.discover(state)
+        except Exception as e:
+            logger.error("Unable to discover games for %s.\n%s", state, e)
+            continue
+        # Games that aren't in the index anymore shouldn't be in the results.
+        queue.clear(state)
+        if keys is None:
+            queue.put(state, None)
+            continue
+        keys = lifecycle.prune(state, keys)
+        for key in keys:
+            queue.put(state, key)
+        logger.info("Queued %s games for %s", len(keys), state)
+
+
+def work(queue, exit_when_empty=False, poll_interval=5, fields=None):
+    """Take tasks off the queue and do them, forever or until the queue is empty."""
+    while True:
+        task = queue.get()
+        if task is None:
+            if exit_when_empty and not queue.pending():
+                return
+            time.sleep(poll_interval)
+            continue
+        try:
+            games = runner.scrape(task["state"], task["key"], fields=fields)
+        except Exception as e:
+            logger.error(
+                "Attempt %s of %s %s failed.\n%s",
+                task["attempts"],
+                task["state"],
+                task["key"],
+                e,
+            )
+            queue.fail(task, e)
+            continue
+        queue.done(task, games)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    enqueue = subparsers.add_parser("enqueue", help="queue every game for states")
+    enqueue.add_argument("states", nargs="*", default=sorted(runner.SCRAPERS))
+    worker = subparsers.add_parser("work", help="do tasks from the queue")
+    worker.add_argument(
+        "--exit-when-empty",
+        action="store_true",
+        help="stop once every task is done or has failed",
+    )
+    worker.add_argument(
+        "--fields",
+        type=runner.parse_fields,
+        help="optional fields to include, like how_to_play,image_urls (default: all)",
+    )
+    results = subparsers.add_parser("results", help="print scraped games as JSON")
+    results.add_argument("states", nargs="*")
+    args = parser.parse_args(argv)
+
+    queue = SqliteQueue()
+    if args.command == "enqueue":
+        coordinate(args.states, queue)
+    elif args.command == "work":
+        work(queue, exit_when_empty=args.exit_when_empty, fields=args.fields)
+    elif args.command == "results":
+        games = queue.results(args.states or None)
+        schema = GameSchema(many=True)
+        print(schema.dumps(games))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,65 @@
+import math
+import unittest
+
+from lottery_data_scraper import analytics
+from lottery_data_scraper.schemas import GameSchema
+
+
+class TestAnalytics(unittest.TestCase):
+    games = [
+        {
+            "game_id": "1",
+            "price": 1,
+            "num_tx_initial": 10,
+            "prizes": [
+                {"value": 0.1, "available": 3, "claimed": 0},
+                {"value": 0.2, "available": 3, "claimed": 0},
+                {"value": 5, "available": 0, "claimed": 1},
+            ],
+        },
+        {"game_id": "2", "prizes": []},
+        {
+            "game_id": "3",
+            "price_cents": 500,
+            "num_tx_initial": 2,
+            "prizes": [{"value_cents": 333, "available": 1, "claimed": 1}],
+        },
+    ]
+
+    def test_sums_are_exact_cents(self):
+        self.assertEqual(
+            analytics.remaining_prize_cents(self.games).tolist(), [90, 0, 333]
+        )
+
+    def test_original_ev(self):
+        ev = analytics.original_ev(self.games)
+        self.assertAlmostEqual(ev[0], 590 / 1000)
+        self.assertTrue(math.isnan(ev[1]))
+        self.assertAlmostEqual(ev[2], 666 / 1000)
+
+    def test_prizes_without_a_value_are_worth_nothing(self):
+        games = [
+            {
+                "price": 1,
+                "num_tx_initial": 10,
+                "prizes": [
+                    {"value": None, "available": 2, "claimed": 0},
+                    {"value_cents": None, "value": None, "available": 1},
+                    {"value": 2, "available": 1, "claimed": 1},
+                ],
+            }
+        ]
+        self.assertEqual(analytics.remaining_prize_cents(games).tolist(), [200])
+        self.assertAlmostEqual(analytics.original_ev(games)[0], 400 / 1000)
+
+    def test_schema_dumps_cents(self):
+        schema = GameSchema()
+        game = schema.loads(schema.dumps(self.games[0]))
+        self.assertEqual(game["price_cents"], 100)
+        self.assertEqual(
+            [prize["value_cents"] for prize in game["prizes"]], [10, 20, 500]
+        )
+        self.assertEqual(
+            analytics.remaining_prize_cents([game]).tolist(),
+            analytics.remaining_prize_cents(self.games[:1]).tolist(),
+        )
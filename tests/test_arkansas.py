@@ -8,8 +8,7 @@ class TestArkansas(unittest.TestCase):
     def test_parse_game_html(self):
         # URL chosen arbitrarily -- first game returned in list
         url = 'https://www.myarkansaslottery.com/games/200000-jackpot-1'
-        html = arkansas.fetch_html(url)
-        game = arkansas.parse_game(url, html)
+        game = arkansas.parse_game(url, *arkansas.fetch_page(url))
         self.assertEqual(game['name'], '$200,000 Jackpot')
         self.assertEqual(game["price"], 10)
         self.assertEqual(game["game_id"], "732")
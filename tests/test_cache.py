@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+
+from lottery_data_scraper import cache
+from lottery_data_scraper.cache import memoize_parse
+
+
+class TestMemoizeParse(unittest.TestCase):
+    def test_unchanged_html_skips_parsing(self):
+        calls = []
+
+        @memoize_parse(1)
+        def parse_game(url, html):
+            calls.append(url)
+            return {"url": url, "prizes": [{"value": len(html)}]}
+
+        game = parse_game("https://example.com/1", "<html>1</html>")
+        game["prizes"].append("modified by the caller")
+        self.assertEqual(
+            parse_game("https://example.com/1", "<html>1</html>"),
+            {"url": "https://example.com/1", "prizes": [{"value": 14}]},
+        )
+        self.assertEqual(len(calls), 1)
+
+        parse_game("https://example.com/1", "<html>changed</html>")
+        self.assertEqual(len(calls), 2)
+
+    def test_version_is_part_of_the_key(self):
+        calls = []
+
+        def parse_game(url, html):
+            calls.append(url)
+            return {"url": url}
+
+        memoize_parse(1)(parse_game)("a", "b")
+        memoize_parse(2)(parse_game)("a", "b")
+        self.assertEqual(len(calls), 2)
+
+    def test_memo_is_bounded(self):
+        calls = []
+
+        @memoize_parse(1)
+        def parse_game(url, html):
+            calls.append(url)
+            return {"url": url}
+
+        with mock.patch.object(cache, "PARSE_MEMO_SIZE", 2):
+            for url in ["a", "b", "a", "c", "a", "b"]:
+                parse_game(url, "<html></html>")
+            self.assertLessEqual(len(cache._memo), 2)
+        # "b" was the least recently used when "c" came in.
+        self.assertEqual(calls, ["a", "b", "c", "b"])
+
+    def test_arguments_are_hashed_by_value(self):
+        calls = []
+
+        @memoize_parse(1)
+        def parse_game(url, fields):
+            calls.append(url)
+            return {"url": url}
+
+        parse_game("a", {"how_to_play", "image_urls"})
+        parse_game("a", {"image_urls", "how_to_play"})
+        parse_game("a", None)
+        self.assertEqual(len(calls), 2)
+        # Objects with no stable value aren't cached at all.
+        parse_game("a", object())
+        parse_game("a", object())
+        self.assertEqual(len(calls), 4)
@@ -0,0 +1,44 @@
+import unittest
+from unittest import mock
+
+from lottery_data_scraper import crawl
+
+PAGES = {
+    "index": "page-1 page-2 game-a game-b",
+    "page-1": "game-c",
+    "page-2": "game-b game-d",
+}
+
+
+def fake_fetch_html(url):
+    if url == "game-broken":
+        raise ValueError("404 Client Error")
+    return PAGES.get(url, "<html>{}</html>".format(url))
+
+
+def find_page_urls(html):
+    return [w for w in html.split() if w.startswith("page-")]
+
+
+def find_game_urls(html):
+    return [w for w in html.split() if w.startswith("game-")]
+
+
+@mock.patch.object(crawl, "fetch_html", fake_fetch_html)
+class TestCrawl(unittest.TestCase):
+    def test_crawl_fetches_games_in_index_order(self):
+        url_htmls = crawl.crawl("index", find_page_urls, find_game_urls, ttl=0)
+        self.assertEqual(
+            [url for url, _ in url_htmls], ["game-a", "game-b", "game-c", "game-d"]
+        )
+        self.assertEqual(url_htmls[0][1], "<html>game-a</html>")
+
+    def test_crawl_leaves_out_games_it_cant_fetch(self):
+        url_htmls = crawl.crawl(
+            "index", lambda html: [], lambda html: ["game-a", "game-broken"], ttl=0
+        )
+        self.assertEqual(url_htmls, [("game-a", "<html>game-a</html>")])
+
+    def test_discover(self):
+        urls = crawl.discover("index", find_page_urls, find_game_urls, ttl=0)
+        self.assertEqual(urls, ["game-a", "game-b", "game-c", "game-d"])
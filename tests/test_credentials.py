@@ -0,0 +1,33 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from lottery_data_scraper import credentials
+from lottery_data_scraper.store import Store
+
+
+class TestCredential(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        s = Store(os.path.join(self.tmpdir.name, "cache.sqlite3"))
+        patcher = mock.patch.object(credentials, "store", lambda: s)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmpdir.cleanup)
+        self.keys = iter(["key-1", "key-2", "key-3"])
+
+    def test_key_is_cached_between_instances(self):
+        fetch = mock.Mock(side_effect=self.keys)
+        self.assertEqual(credentials.Credential("test", fetch).get(), "key-1")
+        self.assertEqual(credentials.Credential("test", fetch).get(), "key-1")
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_stale_key_is_refreshed_once(self):
+        fetch = mock.Mock(side_effect=self.keys)
+        credential = credentials.Credential("test", fetch)
+        stale = credential.get()
+        self.assertEqual(credential.refresh(stale=stale), "key-2")
+        # A second request that failed with the old key gets the new one.
+        self.assertEqual(credential.refresh(stale=stale), "key-2")
+        self.assertEqual(fetch.call_count, 2)
@@ -0,0 +1,124 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from lottery_data_scraper import daemon
+
+
+class TestDaemon(unittest.TestCase):
+    def test_parse_schedule(self):
+        self.assertEqual(
+            daemon.parse_schedule(["pa=900", "tx"], default_interval=3600),
+            {"pa": 900, "tx": 3600},
+        )
+        with self.assertRaises(ValueError):
+            daemon.parse_schedule(["zz=60"])
+
+    def test_next_run_is_jittered_around_the_interval(self):
+        for _ in range(100):
+            at = daemon.next_run_at(1000, jitter=0.1, now=0)
+            self.assertGreaterEqual(at, 900)
+            self.assertLessEqual(at, 1100)
+
+
+class FakeClock:
+    """
+    Stands in for `time` in the daemon, and for `run_state`. Time only moves
+    when the daemon sleeps, and it waits for every run it started to either
+    finish or block on the clock first, so nothing depends on real timing.
+    """
+
+    def __init__(self, durations, polls):
+        self.now = 0.0
+        self.durations = durations
+        self.polls = polls
+        self.cond = threading.Condition()
+        self.submitted = self.finished = 0
+        # When each run that's waiting on the clock wants to wake up.
+        self.waiting = []
+        self.runs = []
+        self.running = 0
+        self.most_running = 0
+
+    def settled(self):
+        return self.submitted == len(self.waiting) + self.finished and all(
+            end > self.now for end in self.waiting
+        )
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self.cond:
+            self.cond.wait_for(self.settled, timeout=5)
+            self.polls -= 1
+            if self.polls < 0:
+                # Let anything still running finish so the pool can shut down.
+                self.now = float("inf")
+                self.cond.notify_all()
+                raise KeyboardInterrupt
+            self.now += seconds
+            self.cond.notify_all()
+
+    def run_state(self, state, out, fields=None):
+        with self.cond:
+            duration, error = self.durations[
+                min(len(self.runs), len(self.durations) - 1)
+            ]
+            run = {"start": self.now}
+            self.runs.append(run)
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+            end = self.now + duration
+            self.waiting.append(end)
+            self.cond.notify_all()
+            self.cond.wait_for(lambda: self.now >= end)
+            self.waiting.remove(end)
+            run["end"] = self.now
+            self.running -= 1
+            self.finished += 1
+            self.cond.notify_all()
+        if error:
+            raise error
+
+    def pool(self, max_workers):
+        clock = self
+
+        class Pool(ThreadPoolExecutor):
+            def submit(self, *args, **kwargs):
+                with clock.cond:
+                    clock.submitted += 1
+                return super().submit(*args, **kwargs)
+
+        return Pool(max_workers=max_workers)
+
+
+class TestServe(unittest.TestCase):
+    def serve(self, clock):
+        with mock.patch.object(daemon, "time", clock), mock.patch.object(
+            daemon, "run_state", clock.run_state
+        ), mock.patch.object(daemon, "ThreadPoolExecutor", clock.pool):
+            with self.assertRaises(KeyboardInterrupt), self.assertLogs(
+                daemon.logger, "ERROR"
+            ) as logs:
+                daemon.serve({"pa": 100}, "unused")
+        return logs
+
+    def test_slow_and_failed_runs_dont_overlap_and_get_rescheduled(self):
+        clock = FakeClock(
+            [(250, None), (0, RuntimeError("broken")), (0, None)], polls=600
+        )
+        logs = self.serve(clock)
+        self.assertIn("Unable to scrape pa", logs.output[0])
+        self.assertEqual(clock.most_running, 1)
+        slow, failed, after_failure = clock.runs[:3]
+        self.assertEqual(slow["end"], slow["start"] + 250)
+        # Overdue, so it starts as soon as the slow run is seen to be done.
+        self.assertGreaterEqual(failed["start"], slow["end"])
+        self.assertLessEqual(failed["start"], slow["end"] + 2)
+        # A failed run is retried on the normal schedule.
+        self.assertGreaterEqual(after_failure["start"], failed["end"] + 90)
+        self.assertLessEqual(after_failure["start"], failed["end"] + 112)
+        for previous, run in zip(clock.runs, clock.runs[1:]):
+            self.assertGreaterEqual(run["start"], previous["end"])
@@ -0,0 +1,74 @@
+import unittest
+
+from lottery_data_scraper import diff
+
+
+def game(game_id, top_claimed=0, second_available=100):
+    return {
+        "state": "tx",
+        "game_id": game_id,
+        "name": "Game {}".format(game_id),
+        "prizes": [
+            {
+                "prize": "$1,000",
+                "value": 1000,
+                "available": 2 - top_claimed,
+                "claimed": top_claimed,
+            },
+            {
+                "prize": "$5",
+                "value": 5,
+                "available": second_available,
+                "claimed": 100 - second_available,
+            },
+        ],
+    }
+
+
+class TestDiff(unittest.TestCase):
+    def test_unchanged_games_have_no_changes(self):
+        previous = diff.snapshot([game("1"), game("2")])
+        current = diff.snapshot([game("1"), game("2")])
+        self.assertEqual(diff.diff(previous, current), [])
+
+    def test_games_added_and_removed(self):
+        previous = diff.snapshot([game("1")])
+        current = diff.snapshot([game("2")])
+        changes = diff.diff(previous, current)
+        self.assertEqual(
+            [(c["change"], c["game_id"]) for c in changes],
+            [("game_added", "2"), ("game_removed", "1")],
+        )
+
+    def test_states_that_failed_keep_their_games(self):
+        pa = dict(game("3"), state="pa")
+        previous = diff.snapshot([game("1"), game("2"), pa])
+        # Pennsylvania failed to scrape this time.
+        current = diff.snapshot([game("1")])
+        changes = diff.diff(previous, current)
+        self.assertEqual(
+            changes, [{"change": "game_removed", "state": "tx", "game_id": "2"}]
+        )
+        merged = diff.carry_forward(previous, current)
+        self.assertEqual(sorted(merged), ["pa:3", "tx:1"])
+        self.assertEqual(diff.diff(merged, diff.snapshot([game("1"), pa])), [])
+
+    def test_tier_changes(self):
+        previous = diff.snapshot([game("1")])
+        current = diff.snapshot([game("1", top_claimed=1, second_available=90)])
+        changes = diff.diff(previous, current)
+        self.assertEqual(
+            [(c["change"], c["prize"]) for c in changes],
+            [
+                ("tier_changed", "$1,000"),
+                ("top_prize_claimed", "$1,000"),
+                ("tier_changed", "$5"),
+            ],
+        )
+        self.assertEqual(changes[0]["previous"], {"available": 2, "claimed": 0})
+        self.assertEqual(changes[1]["newly_claimed"], 1)
+        self.assertEqual(changes[2]["available"], 90)
+
+    def test_created_at_is_ignored(self):
+        g = game("1")
+        self.assertEqual(diff.digest(g), diff.digest(dict(g, created_at="2023-04-08")))
@@ -0,0 +1,53 @@
+import json
+import unittest
+
+from lottery_data_scraper.jsonstream import iter_json_array
+
+
+def chunked(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestIterJsonArray(unittest.TestCase):
+    document = {
+        "total": 3,
+        "filters": {"rows": ["not", "these"], "note": 'a "quoted" ] }'},
+        "empty": [],
+        "rows": [
+            {"id": 1, "name": "Brace { and bracket ]", "prizes": [1, 2.5, None]},
+            {"id": 2, "name": "Escaped \\\" quote", "active": True},
+            {"id": 3, "name": "Unicode é", "prizes": []},
+        ],
+        "after": False,
+    }
+
+    def test_items_under_a_key_in_every_chunk_size(self):
+        text = json.dumps(self.document, indent=1)
+        for size in (1, 2, 3, 7, 64, len(text)):
+            self.assertEqual(
+                list(iter_json_array(chunked(text, size), "rows")),
+                self.document["rows"],
+            )
+
+    def test_top_level_array(self):
+        text = json.dumps([1, "two", {"three": [3]}, None])
+        self.assertEqual(
+            list(iter_json_array(chunked(text, 2))), [1, "two", {"three": [3]}, None]
+        )
+
+    def test_numbers_split_across_chunks(self):
+        self.assertEqual(
+            list(iter_json_array(["[123", "45, 6", ".5e1", "0]"])), [12345, 6.5e10]
+        )
+        self.assertEqual(list(iter_json_array(["[tr", "ue, nu", "ll]"])), [True, None])
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array([' { "rows" : [ ] } '], "rows")), [])
+
+    def test_missing_key(self):
+        with self.assertRaises(KeyError):
+            list(iter_json_array(['{"games": []}'], "rows"))
+
+    def test_truncated_response(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(['{"rows": [{"id": 1}, {"id"'], "rows"))
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+
+from lottery_data_scraper import lifecycle, oregon, runner
+from lottery_data_scraper.store import Store
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError("{} error".format(status), response=response)
+
+
+def use_temporary_store(test):
+    """
+    Point lifecycle at an empty store for the rest of `test`, so what earlier
+    runs left in the shared one doesn't decide which games get scraped.
+    """
+    tmpdir = tempfile.TemporaryDirectory()
+    test.addCleanup(tmpdir.cleanup)
+    store = Store(os.path.join(tmpdir.name, "cache.sqlite3"))
+    patcher = mock.patch.object(lifecycle, "store", return_value=store)
+    patcher.start()
+    test.addCleanup(patcher.stop)
+    return store
+
+
+class TestLifecycle(unittest.TestCase):
+    def setUp(self):
+        self.store = use_temporary_store(self)
+
+    def test_ended_games_are_pruned(self):
+        lifecycle.record_dates("or", 1, end="2001-01-01T00:00:00")
+        lifecycle.record_dates("or", 2, end="2999-01-01T00:00:00")
+        self.assertEqual(lifecycle.prune("or", [1, 2, 3]), [2, 3])
+        self.assertEqual(lifecycle.get("or", 1)["end"], "2001-01-01")
+        self.assertEqual(lifecycle.prune("pa", [1]), [1])
+
+    def test_missing_games_are_retried_less_and_less_often(self):
+        day = 24 * 60 * 60
+        with mock.patch("time.time", return_value=0):
+            lifecycle.tombstone("pa", "url", "404")
+        self.assertIsNotNone(lifecycle.skip_reason("pa", "url", now=day - 1))
+        self.assertIsNone(lifecycle.skip_reason("pa", "url", now=day))
+        with mock.patch("time.time", return_value=day):
+            lifecycle.tombstone("pa", "url", "404")
+        self.assertIsNotNone(lifecycle.skip_reason("pa", "url", now=3 * day - 1))
+        self.assertIsNone(lifecycle.skip_reason("pa", "url", now=3 * day))
+        self.assertEqual(lifecycle.get("pa", "url")["missing"]["since"], 0)
+        lifecycle.revive("pa", "url")
+        self.assertIsNone(lifecycle.skip_reason("pa", "url", now=day))
+
+    def test_runner_tombstones_games_that_404(self):
+        def scrape(state, key, fields):
+            if key == "gone":
+                raise http_error(404)
+            if key == "broken":
+                raise http_error(500)
+            return [{"game_id": key}]
+
+        with mock.patch.object(
+            runner, "discover", return_value=["gone", "broken", "ok"]
+        ), mock.patch.object(runner, "_scrape", side_effect=scrape) as _scrape:
+            self.assertEqual(runner.run("pa"), [{"game_id": "ok"}])
+            self.assertEqual(runner.run("pa"), [{"game_id": "ok"}])
+        scraped = [call.args[1] for call in _scrape.call_args_list]
+        self.assertEqual(scraped, ["gone", "broken", "ok", "broken", "ok"])
+
+    def test_oregon_skips_ended_games(self):
+        api_games = [
+            {
+                "GameNumber": 1,
+                "GameNameTitle": "Old",
+                "GameEndDate": "2001-01-01T00:00:00",
+            },
+            {"GameNumber": 2, "GameNameTitle": "New", "GameEndDate": None},
+        ]
+        with mock.patch.object(oregon, "api_get", return_value=api_games):
+            games = oregon.filter_games_by_expired(oregon.get_api_game_list("url"))
+        self.assertEqual(list(games), [2])
+        self.assertEqual(lifecycle.prune("or", [1, 2]), [2])
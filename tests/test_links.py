@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from lottery_data_scraper import links, oregon, pennsylvania
+from lottery_data_scraper.store import Store
+
+
+class TestLinks(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.store = Store(os.path.join(tmpdir.name, "cache.sqlite3"))
+        for module in (links, oregon):
+            patcher = mock.patch.object(module, "store", return_value=self.store)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_get_remember(self):
+        self.assertIsNone(links.get("pa", "1234", "rules"))
+        links.remember("pa", "1234", "rules", "https://example.com/rules")
+        self.assertEqual(links.get("pa", "1234", "rules"), "https://example.com/rules")
+        self.assertIsNone(links.get("pa", "1234", "page"))
+        self.assertIsNone(links.get("or", "1234", "rules"))
+        with mock.patch.object(links, "LINKS_TTL", 0):
+            self.assertIsNone(links.get("pa", "1234", "rules"))
+
+    def test_pennsylvania_fetches_known_rules_pages_alongside_the_game(self):
+        game_url = "https://www.palottery.state.pa.us/Scratch-Offs/?id=3175"
+        with mock.patch.object(pennsylvania, "prefetch") as prefetch, mock.patch.object(
+            pennsylvania, "fetch_html", return_value="<html></html>"
+        ) as fetch_html:
+            pennsylvania.fetch_game(game_url)
+            prefetch.assert_not_called()
+            links.remember("pa", "3175", "rules", "rules-url")
+            pennsylvania.fetch_game(game_url)
+            prefetch.assert_called_once_with("rules-url")
+            # Once the rules page is known, the game page isn't needed to find it.
+            fetch_html.reset_mock()
+            self.assertEqual(pennsylvania.game_rules_url(game_url), "rules-url")
+            fetch_html.assert_not_called()
+
+    def test_pennsylvania_remembers_rules_pages_on_every_parse(self):
+        game_url = "https://www.palottery.state.pa.us/Scratch-Offs/?id=3175"
+        with mock.patch.object(
+            pennsylvania, "find_complete_game_rules_url", return_value="rules-url"
+        ), mock.patch.object(
+            pennsylvania, "fetch_html", return_value="<html>rules</html>"
+        ), mock.patch.object(
+            pennsylvania, "parse_game_pages", return_value={"game_id": "3175"}
+        ) as parse_game_pages:
+            for _ in range(2):
+                pennsylvania.parse_game_html("Game", game_url, "<html>game</html>")
+                self.assertEqual(links.get("pa", "3175", "rules"), "rules-url")
+                self.store.set("links", "pa:rules:3175", None)
+        # The rules page is part of what's parsed, so it's part of the cache key.
+        parse_game_pages.assert_called_with(
+            "Game", game_url, "<html>game</html>", "<html>rules</html>"
+        )
+
+    def test_oregon_fetches_only_the_missing_pages_it_knows(self):
+        page = """
+        <div class="ol-typography"><h2>How to play</h2>Scratch it.</div>
+        <div class="ol-gamedata-scratchit__slide"></div><img src="/ticket.png">
+        """
+        links.remember("or", "1", "page", "page-1")
+        links.remember("or", "2", "page", "page-2")
+        self.store.set("oregon-pages", "1", '{"url": "page-1"}')
+        with mock.patch.object(
+            oregon, "fetch_many", return_value=[("page-2", page)]
+        ) as fetch_many, mock.patch.object(oregon, "get_page_urls") as get_page_urls:
+            fields = oregon.get_page_fields(["1", "2"])
+        fetch_many.assert_called_once()
+        self.assertEqual(list(fetch_many.call_args[0][0]), ["page-2"])
+        get_page_urls.assert_not_called()
+        self.assertEqual(fields["2"]["how_to_play"], "Scratch it.")
+        self.assertEqual(fields["2"]["url"], "page-2")
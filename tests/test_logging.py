@@ -0,0 +1,66 @@
+import json
+import logging
+import queue
+import unittest
+from unittest import mock
+
+import lottery_data_scraper
+
+
+def record(msg, *args, level=logging.WARNING, **kwargs):
+    return logging.makeLogRecord(
+        {
+            "name": "x",
+            "levelno": level,
+            "levelname": logging.getLevelName(level),
+            "msg": msg,
+            "args": args,
+            **kwargs,
+        }
+    )
+
+
+class TestLogging(unittest.TestCase):
+    def test_repeated_warnings_are_dropped_and_counted(self):
+        limit = lottery_data_scraper.RateLimitFilter(repeats=3, window=60)
+        with mock.patch("time.monotonic", return_value=0):
+            passed = [limit.filter(record("Bad row %s", 1)) for _ in range(10)]
+            self.assertEqual(passed, [True] * 3 + [False] * 7)
+            self.assertTrue(limit.filter(record("Bad row %s", 2)))
+            self.assertTrue(limit.filter(record("Bad row %s", 1, level=logging.ERROR)))
+        with mock.patch("time.monotonic", return_value=60):
+            later = record("Bad row %s", 1)
+            self.assertTrue(limit.filter(later))
+        self.assertEqual(
+            later.getMessage(), "Bad row 1 (7 similar messages suppressed)"
+        )
+
+    def test_warnings_about_different_games_all_get_through(self):
+        limit = lottery_data_scraper.RateLimitFilter(repeats=3, window=60)
+        with mock.patch("time.monotonic", return_value=0):
+            passed = [
+                limit.filter(record("Unable to parse %s", "game/{}".format(i)))
+                for i in range(10)
+            ]
+        self.assertEqual(passed, [True] * 10)
+
+    def test_messages_are_formatted_before_queueing(self):
+        log_queue = queue.SimpleQueue()
+        handler = lottery_data_scraper.QueueHandler(log_queue)
+        arg = mock.MagicMock()
+        arg.__str__.return_value = "row"
+        original = record("Bad row %s", arg)
+        handler.handle(original)
+        queued = log_queue.get_nowait()
+        self.assertEqual(queued.msg, "Bad row row")
+        self.assertIsNone(queued.args)
+        self.assertEqual(queued.getMessage(), "Bad row row")
+        # Other handlers still get the record as it was logged.
+        self.assertEqual(original.args, (arg,))
+
+    def test_json_formatter(self):
+        formatter = lottery_data_scraper.JsonFormatter()
+        entry = json.loads(formatter.format(record("Bad row %s", 3, state="pa")))
+        self.assertEqual(entry["message"], "Bad row 3")
+        self.assertEqual(entry["level"], "WARNING")
+        self.assertEqual(entry["state"], "pa")
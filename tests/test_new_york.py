@@ -1,5 +1,6 @@
 import unittest
 import requests
+from unittest import mock
 
 from lottery_data_scraper import new_york
 from lottery_data_scraper import schemas
@@ -15,4 +16,22 @@ class TestNewYork(unittest.TestCase):
         self.assertEqual(game["game_id"], "1572")
         self.assertEqual(game["prizes"][0]["prize"], "$300,000")
         self.assertEqual(game["prizes"][0]["value"], 300000)
-        self.assertEqual(game["num_tx_initial"], 12341684)
\ No newline at end of file
+        self.assertEqual(game["num_tx_initial"], 12341684)
+
+
+class TestNewYorkMain(unittest.TestCase):
+    def test_main_skips_games_that_fail(self):
+        good = {
+            "game_number": "1",
+            "title": "GOOD ",
+            "ticket_price": "5.00",
+            "overall_odds": "1 in 3.50",
+            "odds_prizes": [
+                {"prize_amount": "$100", "prizes_remaining": "2", "prizes_paid_out": "8"}
+            ],
+        }
+        bad = {"game_number": "2", "title": "BAD"}
+        with mock.patch.object(new_york, "iter_games", return_value=[good, bad]):
+            games = new_york.main(fields=set())
+        self.assertEqual([game["game_id"] for game in games], ["1"])
+        self.assertEqual(games[0]["num_tx_initial"], 35)
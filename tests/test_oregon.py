@@ -1,9 +1,55 @@
+import os
+import tempfile
 import unittest
 import requests
+from unittest import mock
 from bs4 import BeautifulSoup as bs
 
-from lottery_data_scraper import oregon
+from lottery_data_scraper import lifecycle, oregon
 from lottery_data_scraper import schemas
+from lottery_data_scraper.store import Store
+
+GAMES = [
+    {
+        "GameNumber": "1",
+        "GameNameTitle": "$50 or $100",
+        "DateAvailable": "2020-01-01T00:00:00",
+        "GameEndDate": None,
+    },
+    {
+        "GameNumber": "2",
+        "GameNameTitle": "Ended",
+        "GameEndDate": "2001-01-01T00:00:00",
+    },
+    {"GameNumber": "3", "GameNameTitle": "Taken Down", "GameEndDate": None},
+]
+
+GAME = {
+    "GameNameTitle": "$50 or $100",
+    "TicketPrice": 10.0,
+    "OverallOdds": 3.5,
+    "PrizeTiers": [
+        {
+            "Description": "50.00",
+            "PrizeAmount": 50.0,
+            "PrizesWon": 6,
+            "PrizesRemaining": 4,
+            "PrizesTotal": 10,
+            "Odds": 100.0,
+        }
+    ],
+}
+
+
+def api_get(url):
+    if url == oregon.API_URL:
+        return GAMES
+    game_id = url[len(oregon.SINGLE_GAME_API_URL) :]
+    if game_id == "3":
+        response = requests.Response()
+        response.status_code = 404
+        raise requests.HTTPError("404 Client Error", response=response)
+    return [GAME]
 
 class TestOregon(unittest.TestCase):
     def test_parse_game_html(self):
@@ -11,10 +57,69 @@ class TestOregon(unittest.TestCase):
         url = 'https://www.oregonlottery.org//scratch-its/50-or-100/'
         html = oregon.fetch_html(url)
         soup = bs(html, 'lxml')
-        game = oregon.process_game(['1482', url, soup])
+        game = oregon.process_game('1482', oregon.parse_page(soup))
         self.assertEqual(game['name'], "$50 or $100")
         self.assertEqual(game["price"], 10.0)
         self.assertEqual(game["game_id"], "1482")
         self.assertEqual(game["num_tx_initial"], 278019)
         self.assertEqual(game["prizes"][0]["prize"], "50.00")
-        self.assertEqual(game["prizes"][0]["value"], 50.0)
\ No newline at end of file
+        self.assertEqual(game["prizes"][0]["value"], 50.0)
+
+
+class TestOregonMain(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        store = Store(os.path.join(tmpdir.name, "cache.sqlite3"))
+        for patcher in (
+            mock.patch.object(lifecycle, "store", return_value=store),
+            mock.patch.object(oregon, "api_get", api_get),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_main_without_page_fields(self):
+        with mock.patch.object(oregon, "get_page_fields") as get_page_fields:
+            games = oregon.main(fields={"prizes"})
+        get_page_fields.assert_not_called()
+        self.assertEqual(
+            games,
+            [
+                {
+                    "name": "$50 or $100",
+                    "game_id": "1",
+                    "url": "https://www.oregonlottery.org/scratch-its/50-or-100/",
+                    "price": 10.0,
+                    "prizes": [
+                        {
+                            "prize": "50.00",
+                            "value": 50.0,
+                            "claimed": 6,
+                            "available": 4,
+                            "total": 10,
+                            "odds": 100.0,
+                        }
+                    ],
+                    "num_tx_initial": 35,
+                    "state": "or",
+                }
+            ],
+        )
+        # The game that 404'd isn't asked for again right away.
+        self.assertEqual(lifecycle.prune("or", ["1", "3"]), ["1"])
+
+    def test_main_with_page_fields(self):
+        page_fields = {
+            "url": "https://www.oregonlottery.org/scratch-its/the-real-page/",
+            "how_to_play": "Scratch it.",
+            "image_urls": ["https://www.oregonlottery.org/ticket.png"],
+        }
+        with mock.patch.object(
+            oregon, "get_page_fields", return_value={"1": page_fields}
+        ) as get_page_fields:
+            games = oregon.main()
+        get_page_fields.assert_called_once_with(["1", "3"])
+        self.assertEqual(len(games), 1)
+        self.assertEqual(games[0]["name"], "$50 or $100")
+        for field, value in page_fields.items():
+            self.assertEqual(games[0][field], value)
@@ -0,0 +1,79 @@
+import locale
+import random
+import unittest
+from unittest import mock
+
+from lottery_data_scraper import parsing
+
+# What glibc's en_US.UTF-8 locale reports. Containers often don't have the
+# locale installed, so we give locale.currency its conventions directly.
+EN_US_CONV = {
+    "int_curr_symbol": "USD ",
+    "currency_symbol": "$",
+    "mon_decimal_point": ".",
+    "mon_thousands_sep": ",",
+    "mon_grouping": [3, 3, 0],
+    "positive_sign": "",
+    "negative_sign": "-",
+    "int_frac_digits": 2,
+    "frac_digits": 2,
+    "p_cs_precedes": 1,
+    "p_sep_by_space": 0,
+    "n_cs_precedes": 1,
+    "n_sep_by_space": 0,
+    "p_sign_posn": 1,
+    "n_sign_posn": 1,
+    "decimal_point": ".",
+    "thousands_sep": ",",
+    "grouping": [3, 3, 0],
+}
+
+
+class TestParsing(unittest.TestCase):
+    def test_count(self):
+        self.assertEqual(parsing.count("1,350,500"), 1350500)
+        self.assertEqual(parsing.count(" 42\n"), 42)
+        self.assertEqual(parsing.count("12 of 40"), 12)
+        self.assertEqual(parsing.count("$10."), 10)
+        self.assertEqual(parsing.count("Total Tickets: 3,600,000"), 3600000)
+        with self.assertRaises(ValueError):
+            parsing.count("FREE TICKET")
+
+    def test_money(self):
+        self.assertEqual(parsing.money("$1,000"), 1000)
+        self.assertEqual(parsing.money("$2.50"), 2.5)
+        self.assertEqual(parsing.money("$1 Million"), 1000000)
+        self.assertEqual(parsing.money("$2.5M"), 2500000)
+        self.assertEqual(parsing.money("$250K"), 250000)
+        self.assertEqual(parsing.money("$5,000,000 ($250K/YR/20YRS)"), 5000000)
+        self.assertEqual(parsing.money("$500/wk for life"), 500)
+        self.assertEqual(parsing.money("FREE $1 TICKET"), 1)
+        self.assertEqual(parsing.money("5 MONTHS"), 5)
+
+    def test_prize_value(self):
+        self.assertEqual(parsing.prize_value("$1,000"), 1000)
+        self.assertEqual(parsing.prize_value("$500/wk for life"), 500 * 52 * 20)
+        self.assertEqual(parsing.prize_value("$1,000/Week for Life"), 1000 * 52 * 20)
+        self.assertEqual(parsing.prize_value("$250,000/Year for Life"), 250000 * 20)
+        self.assertEqual(parsing.prize_value("$10,000/mo", years=10), 10000 * 12 * 10)
+        self.assertEqual(parsing.prize_value("$1 Million"), 1000000)
+
+    def test_odds(self):
+        self.assertEqual(parsing.odds("1 in 4.12"), 4.12)
+        self.assertEqual(parsing.odds("1 in\t3.50"), 3.5)
+        self.assertEqual(parsing.odds("1-in-3,200"), 3200)
+        self.assertEqual(parsing.odds("1:4"), 4)
+        self.assertEqual(parsing.odds("Overall odds: 1 in 3.42"), 3.42)
+        self.assertEqual(parsing.odds("1,200.00"), 1200)
+
+    def test_format_money_matches_locale_currency(self):
+        values = [0, 1, -1, 0.005, 2.5, 999.995, 1000, 1234567.891, -3000000]
+        values += [random.uniform(-1e7, 1e7) for _ in range(10000)]
+        values += [random.randint(0, 10**9) for _ in range(10000)]
+        with mock.patch.object(locale, "localeconv", return_value=EN_US_CONV):
+            for value in values:
+                expected = locale.currency(value, grouping=True)
+                self.assertEqual(parsing.format_money(value), expected)
+                self.assertEqual(
+                    parsing.format_money(value, cents=False), expected[:-3]
+                )
@@ -18,5 +18,8 @@ class TestPennsylvania(unittest.TestCase):
         )
         self.assertEqual(game["game_id"], "3201")
         self.assertEqual(game["prizes"][0]["prize"], "$3,000,000.00")
-        # Perhaps unfortunately in dollars. Cents would be better, eh?
+        # In dollars, like every state module computes it. The schema adds cents.
         self.assertEqual(game["prizes"][0]["value"], 3000000)
+        dumped = schemas.GameSchema().dump(game)
+        self.assertEqual(dumped["prizes"][0]["value_cents"], 300000000)
+        self.assertEqual(dumped["price_cents"], 3000)
@@ -0,0 +1,102 @@
+import unittest
+from unittest import mock
+
+from lottery_data_scraper import connecticut, runner, util
+from lottery_data_scraper.prune import prune
+
+from test_lifecycle import use_temporary_store
+
+PAGE = b"""<!DOCTYPE html>
+<html>
+  <head>
+    <script src="/analytics.js"></script>
+    <SCRIPT type="text/javascript">
+      var games = "<h2>not a game</h2>";
+    </SCRIPT>
+    <style>.heading-sub-info { color: green; }</style>
+  </head>
+  <body>
+    <!-- <h2>Old name</h2> -->
+    <h2>Extreme     Green</h2>
+    <div class="heading-sub-info">GAME #1740</div>
+    <div class="img-detail-block">
+      <svg viewBox="0 0 10 10"><path d="M0 0h10v10z"/></svg>
+      Ticket Price:$10 Total # of Tickets:2,230,800
+      <img id="ticket_image" src="/ticket.png">
+    </div>
+    <div class="unclaimed-prize-wrap">
+      <table>
+        <tbody>
+          <tr><td>$100,000</td><td>4</td><td>3</td></tr>
+          <tr><td>$10</td><td>200,000</td><td>150,000</td></tr>
+        </tbody>
+      </table>
+    </div>
+    <div class="play-text-wrap"><h3>How to play</h3>Match 3.<a href="#">More</a></div>
+    <noscript><img src="/pixel.gif"></noscript>
+  </body>
+</html>
+"""
+
+
+class TestPrune(unittest.TestCase):
+    def test_prune_removes_what_scrapers_dont_read(self):
+        pruned = prune(PAGE, "utf-8")
+        self.assertLess(len(pruned), len(PAGE) * 0.7)
+        for removed in [b"script", b"SCRIPT", b"style", b"svg", b"<!--", b"pixel"]:
+            self.assertNotIn(removed, pruned)
+        self.assertIn(b"<h2>Extreme     Green</h2>", pruned)
+        self.assertIn(b'<div class="heading-sub-info">GAME #1740</div>', pruned)
+
+    def test_prune_leaves_other_content_alone(self):
+        json = b'{"html": "<script>  </script>"}'
+        self.assertEqual(prune(json, "utf-8"), json)
+        utf16 = "<html>  <script></script></html>".encode("utf-16")
+        self.assertEqual(prune(utf16, "utf-16"), utf16)
+        text = b"<html><p>Match  3\n  to win</p><script>x</script></html>"
+        self.assertEqual(
+            prune(text, "utf-8"), b"<html><p>Match  3\n  to win</p></html>"
+        )
+
+    def test_pruned_page_parses_the_same(self):
+        whole = connecticut.parse_game_html("prune-test", PAGE.decode())
+        pruned = connecticut.parse_game_html(
+            "prune-test", prune(PAGE, "utf-8").decode()
+        )
+        self.assertEqual(pruned, whole)
+
+
+class TestPruneVerify(unittest.TestCase):
+    def setUp(self):
+        use_temporary_store(self)
+        util._recent.clear()
+        self.addCleanup(util._recent.clear)
+        patcher = mock.patch.object(util, "_fetch_page", return_value=(PAGE, "utf-8"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pruned_only_applies_inside_the_block(self):
+        with util.pruned():
+            self.assertEqual(util.fetch_bytes("a"), prune(PAGE, "utf-8"))
+        self.assertEqual(util.fetch_bytes("a"), PAGE)
+
+    def test_pruning_carries_over_to_fetch_many(self):
+        with util.pruned():
+            self.assertEqual(
+                util.fetch_many(["a", "b"]),
+                [(url, prune(PAGE, "utf-8").decode()) for url in ["a", "b"]],
+            )
+        self.assertEqual(util.fetch_many(["a"]), [("a", PAGE.decode())])
+
+    def test_verify_logs_games_that_change(self):
+        def parse(m, url, fields):
+            return {"name": util.fetch_html(url).count("script")}
+
+        scrapers = {"xx": ("texas", None, parse)}
+        with mock.patch.object(runner, "SCRAPERS", scrapers), mock.patch.object(
+            runner, "module"
+        ), mock.patch.object(util, "PRUNE_VERIFY", True):
+            with self.assertLogs(runner.logger, "WARNING") as logs:
+                games = runner.scrape("xx", "url")
+        self.assertEqual(games, [{"name": 5}])
+        self.assertIn("Pruning changes xx game url", logs.output[0])
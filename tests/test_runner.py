@@ -0,0 +1,143 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from lottery_data_scraper import runner
+from lottery_data_scraper import journal as journal_module
+from lottery_data_scraper.journal import Journal, JournalInUse, JournalMismatch
+
+from test_lifecycle import use_temporary_store
+
+
+class TestRunner(unittest.TestCase):
+    def setUp(self):
+        use_temporary_store(self)
+
+    def test_parse_fields(self):
+        self.assertIsNone(runner.parse_fields(None))
+        self.assertEqual(
+            runner.parse_fields("how_to_play, image_urls,"),
+            {"how_to_play", "image_urls"},
+        )
+        self.assertEqual(runner.parse_fields(""), set())
+
+    def test_scrape_passes_fields_to_parse(self):
+        parse = mock.Mock(return_value={"game_id": "1"})
+        scrapers = {"xx": ("texas", lambda m: ["url"], parse)}
+        with mock.patch.object(runner, "SCRAPERS", scrapers), mock.patch.object(
+            runner, "module", return_value="module"
+        ):
+            games = runner.run("xx", fields={"image_urls"})
+        self.assertEqual(games, [{"game_id": "1"}])
+        parse.assert_called_once_with("module", "url", {"image_urls"})
+
+    def test_breaker_trips_on_consecutive_failures(self):
+        breaker = runner.CircuitBreaker(max_consecutive=3, min_attempts=100)
+        for error in [None, ValueError(), ValueError(), None, ValueError()]:
+            breaker.record(error)
+        self.assertIsNone(breaker.reason)
+        breaker.record(ValueError())
+        breaker.record(ValueError("last"))
+        self.assertEqual(breaker.reason, "3 games in a row failed")
+        self.assertEqual(breaker.report("xx")["last_error"], "ValueError('last')")
+
+    def test_breaker_trips_on_failure_ratio(self):
+        breaker = runner.CircuitBreaker(
+            max_consecutive=100, max_ratio=0.5, min_attempts=4
+        )
+        for error in [ValueError(), None, ValueError()]:
+            breaker.record(error)
+        self.assertIsNone(breaker.reason)
+        breaker.record(ValueError())
+        self.assertEqual(breaker.reason, "3 of 4 games failed")
+
+    def test_breaker_trips_on_timeout(self):
+        breaker = runner.CircuitBreaker(timeout=-1)
+        self.assertEqual(breaker.reason, "ran out of time")
+
+    def test_breaker_limits_of_zero_arent_replaced_by_defaults(self):
+        breaker = runner.CircuitBreaker(max_consecutive=0)
+        self.assertEqual(breaker.reason, "0 games in a row failed")
+        breaker = runner.CircuitBreaker(max_consecutive=100, timeout=0)
+        time.sleep(0.01)
+        self.assertEqual(breaker.reason, "ran out of time")
+
+    def test_run_stops_requesting_once_the_breaker_trips(self):
+        parse = mock.Mock(side_effect=ValueError("layout changed"))
+        scrapers = {"xx": ("texas", lambda m: list(range(100)), parse)}
+        with mock.patch.object(runner, "SCRAPERS", scrapers), mock.patch.object(
+            runner, "module", return_value="module"
+        ):
+            with self.assertRaises(runner.StateFailed) as cm:
+                runner.run("xx", breaker=runner.CircuitBreaker(max_consecutive=5))
+        self.assertEqual(parse.call_count, 5)
+        self.assertEqual(cm.exception.report["state"], "xx")
+        self.assertEqual(cm.exception.report["failed"], 5)
+        self.assertEqual(cm.exception.report["skipped"], 95)
+
+    def test_resume_skips_journaled_games(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        path = os.path.join(tmpdir.name, "journal.jsonl")
+        discover = mock.Mock(return_value=["a", "b", "c"])
+
+        def parse(m, key, fields):
+            if key == "c":
+                raise ValueError("killed")
+            return {"game_id": key}
+
+        scrapers = {"xx": ("texas", discover, parse)}
+        with mock.patch.object(runner, "SCRAPERS", scrapers), mock.patch.object(
+            runner, "module", return_value="module"
+        ):
+            journal = Journal(path)
+            runner.run("xx", journal=journal)
+            journal.close()
+            # A crash can leave half a line at the end.
+            with open(path, "a") as f:
+                f.write('{"state": "xx", "key": "c", "ga')
+
+            parse = mock.Mock(return_value={"game_id": "c"})
+            scrapers["xx"] = ("texas", discover, parse)
+            journal = Journal(path, resume=True)
+            games = runner.run("xx", journal=journal)
+            journal.close()
+        self.assertEqual(games, [{"game_id": "a"}, {"game_id": "b"}, {"game_id": "c"}])
+        discover.assert_called_once()
+        parse.assert_called_once_with("module", "c", None)
+        # A new run without resume starts over.
+        journal = Journal(path)
+        self.assertIsNone(journal.keys("xx"))
+        journal.close()
+
+    def test_journals_are_per_run_and_checked_on_resume(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        with mock.patch.object(journal_module, "JOURNAL_DIR", tmpdir.name):
+            journal = Journal(states=["pa"])
+            other = Journal(states=["tx"])
+            self.assertNotEqual(journal.path, other.path)
+            other.close()
+            with self.assertRaises(JournalInUse):
+                Journal(states=["pa"])
+            journal.discovered("pa", ["a"])
+            journal.close()
+            with self.assertRaises(JournalMismatch):
+                Journal(journal.path, resume=True, states=["pa"], fields={"prizes"})
+            journal = Journal(resume=True, states=["pa"])
+            self.assertEqual(journal.keys("pa"), ["a"])
+            journal.close()
+
+    def test_resuming_a_finished_run_starts_over(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        parse = mock.Mock(return_value={"game_id": "a"})
+        scrapers = {"xx": ("texas", lambda m: ["a"], parse)}
+        with mock.patch.object(runner, "SCRAPERS", scrapers), mock.patch.object(
+            runner, "module", return_value="module"
+        ), mock.patch.object(journal_module, "JOURNAL_DIR", tmpdir.name):
+            self.assertEqual(runner.main(["xx"]), [{"game_id": "a"}])
+            self.assertEqual(runner.main(["xx", "--resume"]), [{"game_id": "a"}])
+        self.assertEqual(parse.call_count, 2)
@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from lottery_data_scraper.store import Store
+
+
+def write_many(path, worker):
+    s = Store(path)
+    for i in range(50):
+        s.set("pages", "url-{}".format(i), "worker {} ".format(worker) * 1000)
+    return worker
+
+
+class TestStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_get_set(self):
+        s = Store(self.path)
+        self.assertIsNone(s.get("pages", "https://example.com"))
+        s.set("pages", "https://example.com", "<html></html>")
+        self.assertEqual(s.get("pages", "https://example.com"), "<html></html>")
+        self.assertIsNone(s.get("games", "https://example.com"))
+        self.assertIsNone(s.get("pages", "https://example.com", max_age=0))
+
+    def test_concurrent_writers_never_corrupt_entries(self):
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(write_many, [self.path] * 4, range(4)))
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(write_many, [self.path] * 4, range(4, 8)))
+        s = Store(self.path)
+        for i in range(50):
+            value = s.get("pages", "url-{}".format(i))
+            # Whole values from exactly one writer, never a mix.
+            self.assertEqual(len(set(value.split(" ")) - {""}), 2)
+            self.assertEqual(len(value), len("worker 0 ") * 1000)
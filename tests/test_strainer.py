@@ -0,0 +1,71 @@
+import unittest
+
+from bs4 import BeautifulSoup as bs
+
+from lottery_data_scraper import connecticut
+from lottery_data_scraper.strainer import strain, with_class
+
+PAGE = """
+<html><head><script>var nav = "<h2>not this</h2>";</script></head><body>
+<nav><ul><li><a href="/">Home</a></li></ul></nav>
+<h2>Extreme Green</h2>
+<div class="heading-sub-info">GAME #1740</div>
+<div class="detail img-detail-block">
+  Ticket Price:$10 Total # of Tickets:2,230,800
+  <img id="ticket_image" src="/ticket.png">
+</div>
+<div class="unclaimed-prize-wrap"><table><tbody>
+  <tr><td>$100,000</td><td>4</td><td>3</td></tr>
+  <tr><td>$10</td><td>200,000</td><td>150,000</td></tr>
+</tbody></table></div>
+<div class="play-text-wrap"><h3>How to play</h3>Match 3.<a href="#">More</a></div>
+<footer><table><tr><td>footer</td></tr></table></footer>
+</body></html>
+"""
+
+
+class TestStrainer(unittest.TestCase):
+    def test_with_class_matches_one_of_many_classes(self):
+        soup = bs(strain(PAGE, with_class("img-detail-block")), "lxml")
+        self.assertEqual(len(soup.body.contents), 1)
+        self.assertEqual(soup.body.div["class"], ["detail", "img-detail-block"])
+        self.assertEqual(
+            strain(PAGE, with_class("img-detail")), "<html><body></body></html>"
+        )
+
+    def test_parts_keep_page_order_and_are_kept_once(self):
+        parts = [
+            "//footer//table",
+            "(//h2)[1]",
+            with_class("unclaimed-prize-wrap"),
+            "//table",
+        ]
+        soup = bs(strain(PAGE, *parts), "lxml")
+        self.assertEqual(
+            [tag.name for tag in soup.body.find_all(recursive=False)],
+            ["h2", "div", "table"],
+        )
+        self.assertEqual(soup.find("td").text, "$100,000")
+
+    def test_bytes_are_decoded_with_the_given_encoding(self):
+        html = "<html><body><h2>café</h2></body></html>".encode("cp1252")
+        soup = bs(strain(html, "//h2", encoding="cp1252"), "lxml")
+        self.assertEqual(soup.h2.text, "café")
+
+    def test_strained_page_parses_like_the_whole_page(self):
+        game = connecticut.parse_game_html("strainer-test", PAGE)
+        self.assertEqual(game["name"], "Extreme Green")
+        self.assertEqual(game["game_id"], "1740")
+        self.assertEqual(game["price"], 10)
+        self.assertEqual(game["num_tx_initial"], 2230800)
+        self.assertEqual(game["prizes"][0]["claimed"], 1)
+        self.assertEqual(game["prizes"][1]["available"], 150000)
+        self.assertEqual(game["how_to_play"].strip(), "Match 3.")
+        self.assertEqual(game["image_urls"], [connecticut.BASE + "/ticket.png"])
+
+    def test_game_pages_parse_the_same_from_bytes(self):
+        parse = connecticut.parse_game_html.__wrapped__
+        self.assertEqual(
+            parse("strainer-test", PAGE.encode("utf-16"), encoding="utf-16"),
+            parse("strainer-test", PAGE),
+        )
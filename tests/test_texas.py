@@ -1,4 +1,6 @@
 import unittest
+from unittest import mock
+
 import requests
 
 from lottery_data_scraper import texas
@@ -8,8 +10,7 @@ class TestTexas(unittest.TestCase):
     def test_parse_game_html(self):
         # URL chosen arbitrarily
         url = "http://www.txlottery.org/export/sites/lottery/Games/Scratch_Offs/details.html_252701533.html"
-        html = texas.fetch_html(url)
-        game = texas._parse_game(url, html)
+        game = texas._parse_game(url, *texas.fetch_page(url))
         self.assertEqual(game['name'], "$1,000,000 Cash Blowout")
         self.assertEqual(game["price"], 20.0)
         self.assertEqual(
@@ -20,3 +21,57 @@ class TestTexas(unittest.TestCase):
         self.assertEqual(game["prizes"][0]["prize"], "$1,000,000")
         self.assertEqual(game["prizes"][0]["value"], 1000000.0)
 
+
+INDEX = """
+<html><body>
+<a href="/nav">Home</a>
+<table>
+  <tr><th>Game</th></tr>
+  <tr><td><a href="/game/1">One</a></td><td><p><a href="/rules">Rules</a></p></td></tr>
+  <tr><td><table><tr><td><a href="/game/2">Two</a></td></tr></table></td></tr>
+  <tr><td><a href="/game/3">Three</a></td></tr>
+</table>
+<table><tr><td><a href="/closed/4">Four</a></td></tr></table>
+</body></html>
+"""
+
+
+class TestTexasIndex(unittest.TestCase):
+    def test_parse_index(self):
+        self.assertEqual(
+            texas.parse_index(INDEX),
+            [texas.BASE_URL + "/game/{}".format(i) for i in (1, 2, 3)],
+        )
+
+    def test_iter_game_urls_stops_after_the_first_table(self):
+        chunks = [INDEX[i : i + 16].encode() for i in range(0, len(INDEX), 16)]
+        read = []
+        response = mock.MagicMock()
+        response.__enter__.return_value = response
+        response.headers = {"content-type": "text/html; charset=utf-8"}
+        response.iter_content.return_value = (read.append(c) or c for c in chunks)
+        with mock.patch("lottery_data_scraper.util.session") as session, mock.patch.dict(
+            "os.environ", {"USE_CACHE": ""}
+        ):
+            session.return_value.get.return_value = response
+            urls = texas.iter_game_urls("index")
+            self.assertEqual(next(urls), texas.BASE_URL + "/game/1")
+            # Only as much of the page as it took to get to the first game.
+            self.assertLess(len(read), len(chunks) / 2)
+            self.assertEqual(len(list(urls)), 2)
+        self.assertLess(len(read), len(chunks))
+        session.return_value.get.assert_called_once_with("index", stream=True)
+
+    def test_main_skips_games_it_cant_fetch(self):
+        def fetch_page(url):
+            if url.endswith("/2"):
+                raise requests.HTTPError("404 Client Error")
+            return "<html>{}</html>".format(url).encode(), "utf-8"
+
+        urls = ["https://example.com/game/{}".format(i) for i in (1, 2)]
+        with mock.patch.object(
+            texas, "iter_game_urls", return_value=iter(urls)
+        ), mock.patch.object(texas, "fetch_page", fetch_page), mock.patch.object(
+            texas, "parse_game", side_effect=lambda url, *page: {"url": url}
+        ):
+            self.assertEqual(texas.main(), [{"url": urls[0]}])
@@ -0,0 +1,64 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from lottery_data_scraper import connecticut, florida, maryland, texas
+from lottery_data_scraper.util import html_to_text
+
+from test_strainer import PAGE as CONNECTICUT_PAGE
+from test_texas import INDEX as TEXAS_INDEX
+
+FLORIDA_PAGE = """
+<html><body><div id="scratch-offs">
+<h1>#1234 – Lucky 7s</h1>
+<div class="ticketDetailsContent">
+  <p><span><strong>Ticket Price:</strong> $5.00</span></p>
+  <p>Match <b>three</b> 7s to win <a href="/prizes">that prize</a>.</p>
+</div>
+<table class="scratchOdds"><tbody>
+  <tr><td>$1,000</td><td>1-in-100</td><td>10</td><td>4</td></tr>
+  <tr><td>$5</td><td>1-in-5</td><td>1,000</td><td>600</td></tr>
+</tbody></table>
+<img class="ticketPicture" src="/ticket.png">
+</div></body></html>
+"""
+
+MARYLAND_GAME = maryland.bs(
+    '<li class="ticket"><div class="how-to-play"><h4>How to play</h4>'
+    "<ul><li>Reveal a <em>star</em>.</li><li>Win.</li></ul></div></li>",
+    "lxml",
+)
+
+
+class TestThreading(unittest.TestCase):
+    """
+    Parse the same pages from many threads at once. Every thread should get
+    exactly what one thread gets on its own.
+    """
+
+    def assertThreadSafe(self, f, *args, threads=16, calls=200):
+        expected = f(*args)
+        with ThreadPoolExecutor(threads) as pool:
+            results = list(pool.map(lambda _: f(*args), range(calls)))
+        self.assertEqual(results, [expected] * calls)
+
+    def test_html_to_text(self):
+        self.assertThreadSafe(html_to_text, FLORIDA_PAGE * 20)
+
+    def test_connecticut(self):
+        # Skip the parse cache, so every call really parses.
+        parse = connecticut.parse_game_html.__wrapped__
+        self.assertThreadSafe(parse, "threading-test", CONNECTICUT_PAGE)
+
+    def test_florida(self):
+        parse = florida.parse_game_html.__wrapped__
+        game = parse("threading-test", FLORIDA_PAGE)
+        self.assertEqual(game["game_id"], "1234")
+        self.assertEqual(game["num_tx_initial"], 1000)
+        self.assertIn("Match **three** 7s", game["how_to_play"])
+        self.assertThreadSafe(parse, "threading-test", FLORIDA_PAGE)
+
+    def test_maryland(self):
+        self.assertThreadSafe(maryland._how_to_play, MARYLAND_GAME)
+
+    def test_texas_index(self):
+        self.assertThreadSafe(texas.parse_index, TEXAS_INDEX)
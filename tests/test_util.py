@@ -0,0 +1,101 @@
+import codecs
+import threading
+import time
+import unittest
+from unittest import mock
+
+from lottery_data_scraper import util
+
+
+class TestFetchHtml(unittest.TestCase):
+    def setUp(self):
+        util._recent.clear()
+        self.calls = []
+        self.release = threading.Event()
+
+        def fetch(url):
+            self.calls.append(url)
+            self.release.wait(5)
+            if url == "bad":
+                raise ValueError("unreachable")
+            return "<html>{}</html>".format(url).encode("utf-8"), "utf-8"
+
+        patcher = mock.patch.object(util, "_fetch_page", fetch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(util._recent.clear)
+
+    def fetch_concurrently(self, url, n=8):
+        results = [None] * n
+
+        def fetch(i):
+            try:
+                results[i] = util.fetch_html(url)
+            except Exception as e:
+                results[i] = e
+
+        threads = [threading.Thread(target=fetch, args=(i,)) for i in range(n)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_callers_share_one_request(self):
+        results = self.fetch_concurrently("a")
+        self.assertEqual(self.calls, ["a"])
+        self.assertEqual(results, ["<html>a</html>"] * 8)
+
+    def test_errors_are_shared_but_not_remembered(self):
+        results = self.fetch_concurrently("bad")
+        self.assertEqual(self.calls, ["bad"])
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        with self.assertRaises(ValueError):
+            util.fetch_html("bad")
+        self.assertEqual(self.calls, ["bad", "bad"])
+
+    def test_fetch_many_leaves_out_pages_it_cant_fetch(self):
+        self.release.set()
+        self.assertEqual(
+            util.fetch_many(["a", "bad", "b"]),
+            [("a", "<html>a</html>"), ("b", "<html>b</html>")],
+        )
+
+    def test_recent_pages_are_bounded_and_expire(self):
+        self.release.set()
+        with mock.patch.object(util, "RECENT_PAGES", 2):
+            for url in ["a", "b", "a", "c", "a", "b"]:
+                util.fetch_html(url)
+        # "b" was the least recently used when "c" came in.
+        self.assertEqual(self.calls, ["a", "b", "c", "b"])
+        with mock.patch.object(util, "RECENT_TTL", 0):
+            util.fetch_html("a")
+        self.assertEqual(self.calls, ["a", "b", "c", "b", "a"])
+
+
+class TestEncoding(unittest.TestCase):
+    def test_encoding_of(self):
+        page = "<html><head><meta charset=windows-1252></head></html>".encode()
+        self.assertEqual(util.encoding_of(page), "cp1252")
+        self.assertEqual(util.encoding_of(page, "ISO-8859-1"), "iso8859-1")
+        self.assertEqual(
+            util.encoding_of(codecs.BOM_UTF8 + page, "latin-1"), "utf-8-sig"
+        )
+        http_equiv = (
+            b'<meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS">'
+        )
+        self.assertEqual(util.encoding_of(http_equiv), "shift_jis")
+        self.assertEqual(util.encoding_of(b"<html></html>"), "utf-8")
+        self.assertEqual(util.encoding_of(b"<html></html>", "no-such-codec"), "utf-8")
+
+    def test_fetch_html_decodes_with_the_pages_encoding(self):
+        url = "https://example.com/caf\u00e9"
+        page = ("caf\u00e9".encode("cp1252"), "cp1252")
+        with mock.patch.object(util, "_fetch_page", return_value=page):
+            self.assertEqual(util.fetch_html(url), "caf\u00e9")
+            self.assertEqual(util.fetch_bytes(url), b"caf\xe9")
+            soup = util.fetch_soup(url)
+        self.assertEqual(soup.text, "caf\u00e9")
+        util._recent.clear()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from lottery_data_scraper import workqueue
+
+from test_lifecycle import use_temporary_store
+
+
+class TestSqliteQueue(unittest.TestCase):
+    def setUp(self):
+        use_temporary_store(self)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.queue = workqueue.SqliteQueue(os.path.join(self.tmpdir.name, "q.sqlite3"))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_task_is_invisible_until_timeout(self):
+        self.queue.put("tx", "https://example.com/1")
+        self.queue.put("tx", "https://example.com/1")
+        task = self.queue.get(visibility_timeout=60)
+        self.assertEqual(task["key"], "https://example.com/1")
+        self.assertIsNone(self.queue.get())
+
+        self.queue.put("tx", "https://example.com/2")
+        task = self.queue.get(visibility_timeout=0)
+        self.assertEqual(task["key"], "https://example.com/2")
+        # The worker never finished it, so it's up for grabs again.
+        self.assertEqual(self.queue.get()["attempts"], 2)
+
+    def test_results_are_idempotent(self):
+        self.queue.put("tx", "https://example.com/1")
+        task = self.queue.get()
+        self.queue.done(task, [{"game_id": "1"}])
+        self.queue.done(task, [{"game_id": "1"}])
+        self.assertEqual(self.queue.results(), [{"game_id": "1"}])
+        self.assertEqual(self.queue.pending(), 0)
+
+    def test_results_of_cleared_or_retaken_tasks_are_dropped(self):
+        self.queue.put("tx", "1")
+        cleared = self.queue.get()
+        self.queue.clear("tx")
+        self.queue.done(cleared, [{"game_id": "stale"}])
+        self.assertEqual(self.queue.results(), [])
+
+        self.queue.put("tx", "1")
+        timed_out = self.queue.get(visibility_timeout=0)
+        retaken = self.queue.get()
+        self.queue.done(timed_out, [{"game_id": "stale"}])
+        self.queue.done(retaken, [{"game_id": "1"}])
+        self.assertEqual(self.queue.results(), [{"game_id": "1"}])
+
+    def test_work_retries_then_gives_up(self):
+        self.queue.put("tx", "bad")
+        self.queue.put("tx", "good")
+
+        def scrape(state, key, fields=None):
+            if key == "bad":
+                raise ValueError("broken page")
+            return [{"state": state, "game_id": key}]
+
+        with mock.patch.object(workqueue.runner, "scrape", scrape), mock.patch.object(
+            workqueue, "RETRY_DELAY", 0
+        ):
+            workqueue.work(self.queue, exit_when_empty=True, poll_interval=0)
+        self.assertEqual(self.queue.results(), [{"state": "tx", "game_id": "good"}])
+        self.assertEqual(self.queue.pending(), 0)
+
+    def test_results_are_from_the_latest_run(self):
+        def scrape(state, key, fields=None):
+            if key == "flaky" and failing:
+                raise ValueError("broken page")
+            return [{"state": state, "game_id": key}]
+
+        def run(keys):
+            with mock.patch.object(
+                workqueue.runner, "discover", return_value=keys
+            ), mock.patch.object(workqueue.runner, "scrape", scrape), mock.patch.object(
+                workqueue, "RETRY_DELAY", 0
+            ):
+                workqueue.coordinate(["tx"], self.queue)
+                workqueue.work(self.queue, exit_when_empty=True, poll_interval=0)
+            return [game["game_id"] for game in self.queue.results()]
+
+        failing = False
+        self.assertEqual(sorted(run(["flaky", "gone"])), ["flaky", "gone"])
+        failing = True
+        # "gone" isn't in the index anymore, and "flaky" failed this time.
+        self.assertEqual(run(["flaky", "new"]), ["new"])
+        self.queue.put("tx", "new")
+        self.assertEqual(self.queue.results(), [])